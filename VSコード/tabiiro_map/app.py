@@ -13,11 +13,31 @@ from routes.event import event_bp
 from routes.bookmark import bookmark_bp
 from routes.weather import weather_bp
 from routes.api import api_bp
+from routes.connpass import connpass_bp
+from routes.assets import assets_bp
+from utils.pref_counts import rebuild_pref_counts_command
+from utils.catalog_search import rebuild_search_index_command
+from utils.weather_backfill import backfill_weather_command
+from utils.image_pipeline import build_image_variants_command, image_pipeline
+from utils.photo_store import dedupe_uploads_command
+from utils.catalog_images import build_catalog_images_command
+from utils.assets import assets, build_assets_command
+from utils.uploads import UploadRequest, upload_too_large
+from utils.prefectures import prefectures
+from utils.weather_worker import weather_worker
+from utils.forecast_cache import forecast_cache
+from utils.http_client import http
+from utils.hotel_cache import hotel_cache
+from utils.connpass import connpass_search
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # 写真アップロードは解析しながら一時ファイルへ（utils/uploads.py）
+    app.request_class = UploadRequest
+    app.register_error_handler(413, upload_too_large)
+
     # 拡張の初期化
     db.init_app(app)
     migrate.init_app(app, db)
@@ -32,6 +52,41 @@ def create_app(config_class=Config):
     app.register_blueprint(bookmark_bp)
     app.register_blueprint(weather_bp)
     app.register_blueprint(api_bp)
+    app.register_blueprint(connpass_bp)
+    app.register_blueprint(assets_bp)
+
+    # ハッシュ入りの名前の静的ファイル（テンプレートの asset_url()）
+    assets.init_app(app)
+
+    # 外部 API 用の共通クライアント（timeout・再試行・サーキットブレーカー）
+    http.init_app(app)
+
+    # 楽天トラベル検索結果のキャッシュ
+    hotel_cache.init_app(app)
+
+    # connpass 検索（キャッシュ・同時実行数）
+    connpass_search.init_app(app)
+
+    # 過去の天気を埋めるバックグラウンドワーカー
+    weather_worker.init_app(app)
+
+    # アップロード写真の縮小版を作るプロセスプール
+    image_pipeline.init_app(app)
+
+    # /weather の予報キャッシュ（最初のリクエストから定期先読み）
+    forecast_cache.init_app(app)
+
+    # 都道府県の参照データは起動時に読み込んでおく（以降は mtime が変わったときだけ読み直す）
+    prefectures()
+
+    # CLI コマンド
+    app.cli.add_command(rebuild_pref_counts_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(backfill_weather_command)
+    app.cli.add_command(build_image_variants_command)
+    app.cli.add_command(dedupe_uploads_command)
+    app.cli.add_command(build_catalog_images_command)
+    app.cli.add_command(build_assets_command)
 
     # ホームだけはここで定義（または home_bp 作っても OK）
     @app.route("/")
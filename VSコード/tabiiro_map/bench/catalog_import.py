@@ -0,0 +1,111 @@
+# bench/catalog_import.py
+#
+# カタログ一括取り込みの速度・メモリ計測
+#   python -m bench.catalog_import [--records 1000000] [--chunk-size 500] [--fts]
+#
+# 合成の spots JSON（47 都道府県に均等割り）を一時ディレクトリに書き出し、一時ファイルの SQLite に
+#   1. 新規取り込み（全件 added）
+#   2. 1% を書き換え・1% を削除した JSON で dry run
+#   3. 同じ JSON を --prune 付きで取り込み
+# を行って、rows/s と最大メモリ使用量を表示する。
+import argparse
+import json
+import os
+import random
+import resource
+import tempfile
+
+from app import create_app
+from config import Config
+from extensions import db
+from utils.catalog_import import CHUNK_SIZE, SPOTS, import_catalog
+from utils.catalog_search import rebuild_search_index
+from utils.prefectures import prefectures
+
+
+CATEGORIES = ["自然", "歴史・建造物", "温泉", "テーマパーク", "グルメ"]
+
+
+def write_catalog(path, n_records, edit_rate=0.0, drop_rate=0.0, seed=0):
+    """都道府県ごとに 1 件ずつ書き出す（JSON 全体をメモリに作らない）"""
+    rnd = random.Random(seed)
+    prefs = list(prefectures())
+    per_pref = -(-n_records // len(prefs))
+    written = 0
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, pref in enumerate(prefs):
+            head = {
+                "pref_code": pref.code,
+                "pref_name_ja": pref.name,
+                "pref_name_en": pref.name_en,
+                "region": pref.region,
+            }
+            f.write(json.dumps(head, ensure_ascii=False)[:-1] + ', "spots": [\n')
+            first = True
+            for j in range(min(per_pref, n_records - written)):
+                written += 1
+                if rnd.random() < drop_rate:
+                    continue
+                desc = f"{pref.name}の合成スポット{j}。"
+                if rnd.random() < edit_rate:
+                    desc += "（更新）"
+                spot = {
+                    "spot_id": f"{pref.code:02d}_{j:07d}",
+                    "spot_name": f"スポット{pref.code:02d}-{j}",
+                    "city": f"{pref.short}市",
+                    "category": CATEGORIES[j % len(CATEGORIES)],
+                    "description": desc,
+                    "image_url": f"static/images/spots/{pref.code:02d}_{j:07d}.jpg",
+                }
+                f.write(("" if first else ",\n") + json.dumps(spot, ensure_ascii=False))
+                first = False
+            f.write("\n]}" + (",\n" if i < len(prefs) - 1 else "\n"))
+        f.write("]\n")
+
+
+def max_rss_mb():
+    # Linux の ru_maxrss は KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(n_records, chunk_size, fts):
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tmp, "bench.db")
+
+        base = os.path.join(tmp, "spots.json")
+        edited = os.path.join(tmp, "spots_edited.json")
+        write_catalog(base, n_records)
+        write_catalog(edited, n_records, edit_rate=0.01, drop_rate=0.01, seed=0)
+        print(f"catalog: {n_records:,} records, {os.path.getsize(base) / 1e6:.1f} MB JSON")
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            if fts:
+                # 本番と同じく FTS5 の同期トリガーがある状態で測る
+                rebuild_search_index()
+
+            for label, path, kwargs in [
+                ("initial import", base, {}),
+                ("dry run (1% edited, 1% dropped)", edited, {"dry_run": True}),
+                ("apply with --prune", edited, {"prune": True}),
+            ]:
+                print(f"\n== {label}")
+                report = import_catalog(SPOTS, path, chunk_size=chunk_size, **kwargs)
+                print(report.summary())
+                print(f"   max RSS {max_rss_mb():.0f} MB")
+
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--fts", action="store_true")
+    args = parser.parse_args()
+    run(args.records, args.chunk_size, args.fts)
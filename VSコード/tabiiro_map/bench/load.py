@@ -0,0 +1,246 @@
+# bench/load.py
+#
+# 外部 API を使う画面の負荷テスト（上流は bench/stub_upstreams.py の代役）
+#   python -m bench.load [--duration 10] [--concurrency 16] [--latency-ms 80] [--jitter-ms 40]
+#                        [--error-rate 0.0] [--drop-rate 0.0] [--scenarios hotel,weather,spot_register,event_search]
+#
+# 一時ファイルの SQLite でアプリを本物の HTTP サーバー（werkzeug, threaded）として立て、
+# シナリオごとに --concurrency 本のクライアントで --duration 秒叩いて
+# p50 / p95 / p99 / 最大のレイテンシとスループット、エラー件数を表示する。
+# 最後に utils.http_client の上流ごとの統計とホテル検索キャッシュの件数も出す。
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import requests
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import create_app
+from bench.stub_upstreams import overrides, start_stubs
+from config import Config
+from extensions import db
+from models import User
+from utils.connpass import connpass_search
+from utils.forecast_cache import forecast_cache
+from utils.hotel_cache import hotel_cache
+from utils.http_client import http
+from utils.prefectures import prefectures
+from utils.weather_worker import weather_worker
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+# よく検索されるものほど多く出る（キャッシュが効く割合を本番に近づける）
+HOTEL_KEYWORDS = [f"{p.short}駅" for p in prefectures()] + ["温泉", "旅館", "ビジネスホテル", "リゾート"]
+EVENT_KEYWORDS = ["Python", "Go", "Rust", "機械学習", "Flask", "もくもく会", "AWS", "LT会"]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(q * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def zipf_choice(rnd, items, s=1.1):
+    weights = [1 / (i + 1) ** s for i in range(len(items))]
+    return rnd.choices(items, weights)[0]
+
+
+# ====================================================
+# シナリオ（1 回分のリクエストを投げてレスポンスを返す）
+# ====================================================
+def hit_hotel(client, base, rnd):
+    keyword = zipf_choice(rnd, HOTEL_KEYWORDS)
+    page = rnd.choices([1, 2, 3], [6, 3, 1])[0]
+    return client.get(f"{base}/hotel/results/{keyword}", params={"page": page})
+
+
+def hit_weather(client, base, rnd):
+    return client.get(f"{base}/weather")
+
+
+def hit_spot_register(client, base, rnd):
+    # 過去の日付 → 天気は weather_daily に無ければ pending で入り、ワーカーが archive API から埋める
+    pref = rnd.choice(prefectures().names)
+    visit = date.today() - timedelta(days=rnd.randint(30, 3 * 365))
+    return client.post(
+        f"{base}/spot/register",
+        data={"spot_name": f"bench-{rnd.random():.6f}", "prefecture": pref,
+              "visit_date": visit.isoformat(), "comment": "bench"},
+        allow_redirects=False,
+    )
+
+
+def hit_event_search(client, base, rnd):
+    # 1〜2 キーワード（2 つなら connpass へは同時に 2 本）
+    keywords = {zipf_choice(rnd, EVENT_KEYWORDS) for _ in range(rnd.choice([1, 1, 2]))}
+    return client.get(f"{base}/connpass/results", params={"keyword": ",".join(keywords)})
+
+
+SCENARIOS = {
+    "hotel": hit_hotel,
+    "weather": hit_weather,
+    "spot_register": hit_spot_register,
+    "event_search": hit_event_search,
+}
+
+
+def ok(res):
+    return res.status_code < 400
+
+
+# ====================================================
+# 実行
+# ====================================================
+def login(base):
+    client = requests.Session()
+    res = client.post(f"{base}/login", data={"email": EMAIL, "password": PASSWORD}, allow_redirects=False)
+    if res.status_code != 302 or "login" in res.headers.get("Location", ""):
+        raise SystemExit("ログインに失敗しました")
+    return client
+
+
+def drive(name, base, duration, concurrency, seed=0):
+    hit = SCENARIOS[name]
+    latencies = []
+    errors = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(i):
+        rnd = random.Random(f"{seed}-{name}-{i}")
+        client = login(base)
+        mine = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                res = hit(client, base, rnd)
+                error = None if ok(res) else f"HTTP {res.status_code}"
+            except requests.RequestException as e:
+                error = type(e).__name__
+            mine.append((time.perf_counter() - started) * 1000)
+            if error:
+                with lock:
+                    errors[error] = errors.get(error, 0) + 1
+        with lock:
+            latencies.extend(mine)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1] if latencies else None,
+    }
+
+
+def fmt_ms(value):
+    return "-" if value is None else f"{value:8.1f}"
+
+
+def run(scenarios, duration, concurrency, latency_ms, jitter_ms, error_rate, drop_rate):
+    stubs = start_stubs(latency_ms, jitter_ms, error_rate, drop_rate)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tmp, "bench.db")
+            HTTP_UPSTREAM_OVERRIDES = overrides(stubs)
+            WEATHER_RETRY_BACKOFF = 0.1
+
+        app = create_app(BenchConfig)
+
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(username="bench", email=EMAIL, password=generate_password_hash(PASSWORD)))
+            db.session.commit()
+            db.session.remove()
+
+        server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, name="bench-app", daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_port}"
+
+        # /weather は先読みしたキャッシュを返すので、最初の 1 回が取れるまで待つ
+        forecast_cache.start()
+        for _ in range(100):
+            if forecast_cache.snapshot() is not None:
+                break
+            time.sleep(0.1)
+
+        print(
+            f"upstream stubs: latency {latency_ms:.0f}+0〜{jitter_ms:.0f} ms, "
+            f"error {error_rate:.1%}, drop {drop_rate:.1%} / {concurrency} clients × {duration:.0f}s"
+        )
+        print(f"{'scenario':<15}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  errors")
+        for name in scenarios:
+            r = drive(name, base, duration, concurrency)
+            print(
+                f"{r['name']:<15}{r['requests']:>9}{r['rps']:>9.1f}"
+                f"{fmt_ms(r['p50'])} {fmt_ms(r['p95'])} {fmt_ms(r['p99'])} {fmt_ms(r['max'])}  "
+                f"{r['errors'] or '-'}"
+            )
+
+        # 裏の天気取得が終わるのを待ってから上流の統計を出す
+        for _ in range(300):
+            if not weather_worker.pending():
+                break
+            time.sleep(0.1)
+
+        print("\nupstreams (utils.http_client):")
+        names = {stub.url: name for name, stub in stubs.items()}
+        for host, s in http.stats().items():
+            lat = s["latency_ms"]
+            print(
+                f"  {names.get(host, host):<9} requests={s['requests']:<6} retries={s['retries']:<4} "
+                f"avg={lat['avg']}ms p95<={lat['p95']}ms errors={s['errors'] or '-'} circuit={s['circuit']['state']}"
+            )
+        print(f"hotel cache: {hotel_cache.stats()}")
+        print(f"connpass cache: {connpass_search.stats()}")
+
+        forecast_cache.stop()
+        server.shutdown()
+        weather_worker.shutdown()
+        with app.app_context():
+            db.engine.dispose()
+    for stub in stubs.values():
+        stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--jitter-ms", type=float, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    args = parser.parse_args()
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}（{', '.join(SCENARIOS)}）")
+    run(scenarios, args.duration, args.concurrency, args.latency_ms, args.jitter_ms,
+        args.error_rate, args.drop_rate)
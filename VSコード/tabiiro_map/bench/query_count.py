@@ -0,0 +1,174 @@
+# bench/query_count.py
+#
+# 一覧ページ 1 リクエストあたりの SQL 発行数チェック
+#   python -m bench.query_count [--foods 3000] [--spots 5000]
+#
+# 合成データを入れたメモリ上の SQLite に対してテストクライアントでページを辿り、
+# 件数に関係なく 1 ページの SQL 数が上限以内であることを assert する。
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from urllib.parse import unquote
+
+from sqlalchemy import event
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import User, Food, Photo, Spot
+from utils.prefectures import prefectures
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    FORECAST_PREFETCH = False
+    GOURMET_PAGE_SIZE = 30
+    SPOT_PAGE_SIZE = 30
+
+
+# ルートごとの 1 リクエストあたり SQL 上限
+MAX_STATEMENTS = {
+    "food.gourmet_list": 1,
+    "food.shop_detail": 2,
+    "spot.spot_list": 2,
+    "spot.spot_list_more": 2,
+}
+
+
+def seed_foods(user_id, n_foods, n_shops):
+    rnd = random.Random(0)
+    base_date = date(2024, 1, 1)
+    foods = [
+        Food(
+            user_id=user_id,
+            shop_name=f"店舗{rnd.randrange(n_shops):04d}",
+            food_name=f"料理{i}",
+            visit_date=base_date + timedelta(days=rnd.randrange(700)),
+            evaluation=rnd.randint(1, 5),
+        )
+        for i in range(n_foods)
+    ]
+    db.session.add_all(foods)
+    db.session.flush()
+    for f in foods:
+        for _ in range(rnd.randrange(3)):
+            db.session.add(Photo(user_id=user_id, food_id=f.food_id, filename=f"f{f.food_id}.jpg"))
+    db.session.commit()
+
+
+def seed_spots(user_id, n_spots):
+    rnd = random.Random(1)
+    prefs = list(prefectures().short_names)
+    base_date = date(2024, 1, 1)
+    spots = [
+        Spot(
+            user_id=user_id,
+            name=f"観光地{rnd.randrange(n_spots):05d}",
+            prefecture=rnd.choice(prefs),
+            visit_date=base_date + timedelta(days=rnd.randrange(700)),
+        )
+        for _ in range(n_spots)
+    ]
+    db.session.add_all(spots)
+    db.session.flush()
+    for s in spots:
+        for _ in range(rnd.randrange(4)):
+            db.session.add(Photo(user_id=user_id, spot_id=s.spot_id, filename=f"s{s.spot_id}.jpg"))
+    db.session.commit()
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def measure(self, fn):
+        before = self.count
+        t0 = time.perf_counter()
+        result = fn()
+        return result, self.count - before, (time.perf_counter() - t0) * 1000
+
+
+def check(route, statements, elapsed_ms, label, failed):
+    limit = MAX_STATEMENTS[route]
+    ok = statements <= limit
+    print(f"[{'OK  ' if ok else 'FAIL'}] {route:<20} {label:<24} sql={statements} (max {limit})  {elapsed_ms:7.2f} ms")
+    if not ok:
+        failed.append(f"{route} {label}")
+
+
+def run(n_foods, n_shops, n_spots):
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username="bench", email="bench@example.com", password="x"))
+        db.session.commit()
+        seed_foods(1, n_foods, n_shops)
+        seed_spots(1, n_spots)
+        counter = StatementCounter(db.engine)
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["logged_in"] = True
+        sess["user_id"] = 1
+
+    failed = []
+
+    # グルメ一覧：最後のページまでキーセットで辿る
+    page, after, shops_seen = 1, None, 0
+    while True:
+        params = {"after": after} if after else {}
+        resp, n, ms = counter.measure(lambda: client.get("/food/gourmet/list", query_string=params))
+        assert resp.status_code == 200
+        check("food.gourmet_list", n, ms, f"page {page}", failed)
+
+        html = resp.get_data(as_text=True)
+        shops_seen += html.count('class="spot-card-link"')
+        marker = "/food/gourmet/list?after="
+        if marker not in html:
+            break
+        after = unquote(html.split(marker, 1)[1].split('"', 1)[0])
+        page += 1
+
+    assert shops_seen == min(n_shops, n_foods), f"shops seen {shops_seen}"
+
+    resp, n, ms = counter.measure(lambda: client.get("/food/shop/店舗0001"))
+    assert resp.status_code == 200
+    check("food.shop_detail", n, ms, "店舗0001", failed)
+
+    # 観光地一覧：1 ページ目 + 「もっと見る」で最後まで
+    resp, n, ms = counter.measure(lambda: client.get("/spot/list"))
+    assert resp.status_code == 200
+    check("spot.spot_list", n, ms, "page 1", failed)
+
+    html = resp.get_data(as_text=True)
+    spots_seen = html.count('class="spot-card"')
+    cursor = html.split('data-after="', 1)[1].split('"', 1)[0] if 'data-after="' in html else None
+    page = 2
+    while cursor:
+        resp, n, ms = counter.measure(lambda: client.get("/spot/list/more", query_string={"after": cursor}))
+        data = resp.get_json()
+        spots_seen += len(data["items"])
+        # 途中のページは上限を超えたときだけ表示
+        if page <= 3 or not data["next"] or n > MAX_STATEMENTS["spot.spot_list_more"]:
+            check("spot.spot_list_more", n, ms, f"page {page}", failed)
+        cursor = data["next"]
+        page += 1
+
+    assert spots_seen == n_spots, f"spots seen {spots_seen}"
+
+    assert not failed, f"too many statements: {failed}"
+    print("statement counts are bounded")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--foods", type=int, default=3000)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--spots", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.foods, args.shops, args.spots)
@@ -0,0 +1,168 @@
+# bench/query_plan.py
+#
+# 個人記録テーブルのインデックス確認用ベンチマーク
+#   python -m bench.query_plan [--users 50] [--spots 2000]
+#
+# メモリ上の SQLite に合成データを入れ、主要ルートが発行するクエリの
+# EXPLAIN QUERY PLAN がインデックスを使っていることを assert し、実行時間も表示する。
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy.orm import with_parent
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import User, Spot, Food, Bookmark, Photo, TravelRecord
+from utils.prefectures import prefectures
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    FORECAST_PREFETCH = False
+
+
+def seed(n_users, n_spots, n_foods, n_bookmarks):
+    rnd = random.Random(0)
+    prefs = list(prefectures().short_names)
+    shops = [f"店舗{i:03d}" for i in range(200)]
+    base_date = date(2024, 1, 1)
+
+    for u in range(1, n_users + 1):
+        db.session.add(User(id=u, username=f"user{u}", email=f"user{u}@example.com", password="x"))
+    db.session.flush()
+
+    for u in range(1, n_users + 1):
+        for i in range(n_spots):
+            db.session.add(Spot(
+                user_id=u,
+                name=f"観光地{i}",
+                prefecture=rnd.choice(prefs),
+                visit_date=base_date + timedelta(days=rnd.randrange(700)),
+            ))
+        for i in range(n_foods):
+            db.session.add(Food(
+                user_id=u,
+                shop_name=rnd.choice(shops),
+                visit_date=base_date + timedelta(days=rnd.randrange(700)),
+                evaluation=rnd.randint(1, 5),
+            ))
+        for i in range(n_bookmarks):
+            db.session.add(Bookmark(
+                user_id=u,
+                target_type=rnd.choice(["spot", "hotel", "event"]),
+                target_id=str(i),
+                title=f"ブックマーク{i}",
+            ))
+        for p in prefs:
+            db.session.add(TravelRecord(user_id=u, prefecture=p, visit_count=0))
+    db.session.flush()
+
+    spot_ids = [r[0] for r in db.session.query(Spot.spot_id).all()]
+    food_ids = [r[0] for r in db.session.query(Food.food_id).all()]
+    for sid in rnd.sample(spot_ids, len(spot_ids) // 2):
+        db.session.add(Photo(user_id=1, spot_id=sid, filename=f"s{sid}.jpg"))
+    for fid in rnd.sample(food_ids, len(food_ids) // 2):
+        db.session.add(Photo(user_id=1, food_id=fid, filename=f"f{fid}.jpg"))
+    db.session.commit()
+
+
+def hot_queries():
+    """ルート名 → (クエリ, 使われるべきインデックス名)"""
+    spot = Spot.query.filter_by(user_id=1).first()
+    food = Food.query.filter_by(user_id=1).first()
+
+    return {
+        "spot.spot_list": (
+            Spot.query.filter_by(user_id=1).order_by(Spot.prefecture.asc(), Spot.name.asc()),
+            "ix_SPOT_user_pref_name",
+        ),
+        "spot.spot_list?prefecture": (
+            Spot.query.filter_by(user_id=1, prefecture="東京").order_by(Spot.prefecture.asc(), Spot.name.asc()),
+            "ix_SPOT_user_pref_name",
+        ),
+        "spot.pref_click": (
+            Spot.query.filter_by(user_id=1, prefecture="京都").limit(1),
+            "ix_SPOT_user_pref_name",
+        ),
+        "spot.pref_click (TravelRecord)": (
+            TravelRecord.query.filter_by(user_id=1, prefecture="京都").limit(1),
+            "ux_TRAVEL_RECORD_user_pref",
+        ),
+        "api.api_pref_counts": (
+            Spot.query.filter_by(user_id=1),
+            "ix_SPOT_user_pref_name",
+        ),
+        "food.gourmet_list": (
+            Food.query.filter_by(user_id=1),
+            "ix_FOOD_user_shop",
+        ),
+        "food.shop_detail": (
+            Food.query.filter_by(user_id=1, shop_name="店舗001"),
+            "ix_FOOD_user_shop",
+        ),
+        "bookmark.add_bookmark": (
+            Bookmark.query.filter_by(user_id=1, target_type="spot", target_id="10").limit(1),
+            "ux_BOOKMARK_user_target",
+        ),
+        "bookmark.bookmark_list": (
+            Bookmark.query.filter_by(user_id=1, target_type="hotel"),
+            "ux_BOOKMARK_user_target",
+        ),
+        "spot.photos (lazy)": (
+            Photo.query.filter(with_parent(spot, Spot.photos)),
+            "ix_PHOTO_spot_id",
+        ),
+        "food.photos (lazy)": (
+            Photo.query.filter(with_parent(food, Food.photos)),
+            "ix_PHOTO_food_id",
+        ),
+    }
+
+
+def explain(query):
+    sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    rows = db.session.execute(db.text("EXPLAIN QUERY PLAN " + sql)).all()
+    return [r[-1] for r in rows]
+
+
+def run(n_users, n_spots, n_foods, n_bookmarks, repeat):
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+
+        t0 = time.perf_counter()
+        seed(n_users, n_spots, n_foods, n_bookmarks)
+        print(f"seed: users={n_users} spots/user={n_spots} foods/user={n_foods} "
+              f"bookmarks/user={n_bookmarks} ({time.perf_counter() - t0:.2f}s)")
+
+        failed = []
+        for route, (query, index_name) in hot_queries().items():
+            plan = explain(query)
+            uses_index = any(index_name in line for line in plan)
+
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                query.all()
+            avg_ms = (time.perf_counter() - t0) / repeat * 1000
+
+            mark = "OK  " if uses_index else "FAIL"
+            print(f"[{mark}] {route:<32} {avg_ms:8.3f} ms  | " + " / ".join(plan))
+            if not uses_index:
+                failed.append(route)
+
+        assert not failed, f"index not used: {failed}"
+        print("all hot queries use their indexes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--spots", type=int, default=500)
+    parser.add_argument("--foods", type=int, default=200)
+    parser.add_argument("--bookmarks", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.users, args.spots, args.foods, args.bookmarks, args.repeat)
@@ -0,0 +1,325 @@
+# bench/stub_upstreams.py
+#
+# 外部 API の代役サーバー（ベンチ・オフライン開発用）
+#   python -m bench.stub_upstreams [--latency-ms 80] [--jitter-ms 40] [--error-rate 0.02] [--drop-rate 0]
+#
+# 楽天トラベル KeywordHotelSearch / open-meteo archive・forecast / connpass v2 と同じ形の JSON を返す。
+# 上流ごとに別ポートで立てるので、utils.http_client からは別ホスト（プール・ブレーカーも別）に見える。
+#   - latency_ms + 0〜jitter_ms のランダムな遅延
+#   - error_rate の割合で 503、drop_rate の割合で応答せずに接続を切る
+#   - 設定は動かしたまま stub.latency_ms = ... のように変えられる（障害の再現用）
+# 起動すると HTTP_UPSTREAM_OVERRIDES に入れる dict を表示する。
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from utils.connpass import CONNPASS_API_URL
+from utils.forecast_cache import FORECAST_URL
+from utils.hotel_utils import HOTEL_SEARCH_URL
+from utils.weather_daily import ARCHIVE_URL
+
+WEATHER_CODES = [0, 1, 2, 3, 45, 51, 61, 63, 71, 80, 95]
+
+
+def _base(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _rnd(*key):
+    # 同じ問い合わせには同じ値を返す（キャッシュの効果を見やすくするため）
+    seed = hashlib.md5(repr(key).encode("utf-8")).hexdigest()
+    return random.Random(seed)
+
+
+# ====================================================
+# 上流ごとの応答
+# ====================================================
+def rakuten_hotels(params):
+    keyword = params.get("keyword", "")
+    page = int(params.get("page", 1))
+    hits = int(params.get("hits", 30))
+    if not keyword or keyword.startswith("該当なし"):
+        return 404, {"error": "not_found", "error_description": "指定された検索条件に一致するデータが存在しません"}
+
+    rnd = _rnd("rakuten", keyword)
+    record_count = rnd.randint(hits, hits * 12)
+    page_count = min(-(-record_count // hits), 100)
+    if page > page_count:
+        return 404, {"error": "not_found", "error_description": "指定された検索条件に一致するデータが存在しません"}
+
+    first = (page - 1) * hits + 1
+    last = min(page * hits, record_count)
+    hotels = []
+    for n in range(first, last + 1):
+        no = 100000 + int(hashlib.md5(f"{keyword}{n}".encode()).hexdigest()[:6], 16) % 900000
+        hotels.append([
+            {"hotelBasicInfo": {
+                "hotelNo": no,
+                "hotelName": f"{keyword}ホテル{n}",
+                "hotelInformationUrl": f"https://travel.rakuten.co.jp/HOTEL/{no}/{no}.html",
+                "planListUrl": f"https://hotel.travel.rakuten.co.jp/hotelinfo/plan/{no}",
+                "hotelMinCharge": 3000 + (no % 40) * 500,
+                "latitude": 35.0 + (no % 1000) / 1000,
+                "longitude": 135.0 + (no % 997) / 1000,
+                "postalCode": "100-0001",
+                "address1": "東京都",
+                "address2": f"千代田区{n}-1-1",
+                "telephoneNo": "03-0000-0000",
+                "access": "駅から徒歩5分",
+                "nearestStation": f"{keyword}駅",
+                "hotelImageUrl": f"https://img.travel.rakuten.co.jp/share/HOTEL/{no}/{no}.jpg",
+                "hotelThumbnailUrl": f"https://img.travel.rakuten.co.jp/HIMG/90_90/{no}.jpg",
+                "reviewCount": no % 500,
+                "reviewAverage": round(3 + (no % 20) / 10, 2),
+                "hotelSpecial": "",
+            }},
+            {"hotelRatingInfo": {"serviceAverage": 4.0, "locationAverage": 4.2, "roomAverage": 3.9}},
+        ])
+    return 200, {
+        "pagingInfo": {
+            "recordCount": record_count, "pageCount": page_count, "page": page,
+            "first": first, "last": last,
+        },
+        "hotels": hotels,
+    }
+
+
+def _daily(key, variables, days):
+    rnd = _rnd(*key)
+    daily = {"time": [d.isoformat() for d in days]}
+    for var in variables:
+        if var == "weathercode":
+            daily[var] = [rnd.choice(WEATHER_CODES) for _ in days]
+        elif var == "temperature_2m_max":
+            daily[var] = [round(rnd.uniform(5, 35), 1) for _ in days]
+        elif var == "temperature_2m_min":
+            daily[var] = [round(rnd.uniform(-5, 25), 1) for _ in days]
+        elif var == "precipitation_sum":
+            daily[var] = [round(max(0.0, rnd.gauss(2, 5)), 1) for _ in days]
+        elif var == "precipitation_probability_max":
+            daily[var] = [rnd.randint(0, 100) for _ in days]
+        else:
+            daily[var] = [None for _ in days]
+    return daily
+
+
+def _location(lat, lon):
+    return {"latitude": float(lat), "longitude": float(lon), "timezone": "Asia/Tokyo", "elevation": 10.0}
+
+
+def open_meteo_archive(params):
+    try:
+        start = date.fromisoformat(params["start_date"])
+        end = date.fromisoformat(params["end_date"])
+    except (KeyError, ValueError):
+        return 400, {"error": True, "reason": "start_date / end_date が必要です"}
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    variables = params.get("daily", "").split(",")
+    body = _location(params.get("latitude", 0), params.get("longitude", 0))
+    body["daily"] = _daily(("archive", params.get("latitude"), start, end), variables, days)
+    return 200, body
+
+
+def open_meteo_forecast(params):
+    lats = params.get("latitude", "0").split(",")
+    lons = params.get("longitude", "0").split(",")
+    variables = params.get("daily", "").split(",")
+    today = date.today()
+    days = [today + timedelta(days=i) for i in range(int(params.get("forecast_days", 7)))]
+
+    results = []
+    for lat, lon in zip(lats, lons):
+        body = _location(lat, lon)
+        rnd = _rnd("current", lat, today)
+        body["current_weather"] = {
+            "time": datetime.now().strftime("%Y-%m-%dT%H:00"),
+            "temperature": round(rnd.uniform(-5, 35), 1),
+            "windspeed": round(rnd.uniform(0, 20), 1),
+            "weathercode": rnd.choice(WEATHER_CODES),
+        }
+        body["daily"] = _daily(("forecast", lat, today), variables, days)
+        results.append(body)
+    # 1 地点だけなら配列にしない（open-meteo と同じ）
+    return 200, results[0] if len(results) == 1 else results
+
+
+def connpass_events(params):
+    keyword = params.get("keyword", "")
+    count = min(int(params.get("count", 10)), 100)
+    start = int(params.get("start", 1))
+    rnd = _rnd("connpass", keyword, params.get("ymd", ""))
+    available = rnd.randint(0, 150)
+
+    events = []
+    for n in range(start, min(start + count, available + 1)):
+        event_id = 300000 + int(hashlib.md5(f"{keyword}{n}".encode()).hexdigest()[:5], 16)
+        started = datetime(2025, 1, 1, 19) + timedelta(days=(event_id % 365))
+        events.append({
+            "id": event_id,
+            "title": f"{keyword or 'もくもく会'} 勉強会 #{n}",
+            "catch": f"{keyword}について話す会",
+            "description": f"<p>{keyword}の勉強会です。</p>",
+            "url": f"https://example.connpass.com/event/{event_id}/",
+            "image_url": None,
+            "hash_tag": "stub",
+            "started_at": started.isoformat() + "+09:00",
+            "ended_at": (started + timedelta(hours=2)).isoformat() + "+09:00",
+            "limit": 30,
+            "event_type": "participation",
+            "open_status": "preopen",
+            "group": None,
+            "updated_at": "2024-12-01T12:00:00+09:00",
+            "owner_id": 1,
+            "owner_nickname": "stub",
+            "owner_display_name": "stub",
+            "place": "オンライン",
+            "address": "",
+            "lat": None,
+            "lon": None,
+            "accepted": event_id % 30,
+            "waiting": 0,
+        })
+    return 200, {
+        "results_returned": len(events),
+        "results_available": available,
+        "results_start": start,
+        "events": events,
+    }
+
+
+# ====================================================
+# サーバー
+# ====================================================
+class StubServer:
+    """1 つの上流の代役（ThreadingHTTPServer をスレッドで動かす）"""
+
+    def __init__(self, name, real_url, routes, latency_ms=0.0, jitter_ms=0.0,
+                 error_rate=0.0, drop_rate=0.0, host="127.0.0.1", port=0):
+        self.name = name
+        self.real_base = _base(real_url)
+        self.routes = routes  # パス → handler(params) → (status, body)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive（接続の使い回しを測れるように）
+            disable_nagle_algorithm = True  # ヘッダーと本文の 2 回の write で遅延 ACK を待たないように
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub._handle(self)
+
+        return Handler
+
+    def _handle(self, req):
+        with self._lock:
+            self.requests += 1
+        time.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000)
+
+        roll = random.random()
+        if roll < self.drop_rate:
+            with self._lock:
+                self.errors += 1
+            req.close_connection = True
+            return
+        parts = urlsplit(req.path)
+        handler = self.routes.get(parts.path)
+        if handler is None:
+            status, body = 404, {"error": "not_found", "path": parts.path}
+        elif roll < self.drop_rate + self.error_rate:
+            with self._lock:
+                self.errors += 1
+            status, body = 503, {"error": "service_unavailable"}
+        else:
+            params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+            status, body = handler(params)
+
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        req.send_response(status)
+        req.send_header("Content-Type", "application/json; charset=utf-8")
+        req.send_header("Content-Length", str(len(data)))
+        req.end_headers()
+        req.wfile.write(data)
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name=f"stub-{self.name}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def start_stubs(latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, drop_rate=0.0, host="127.0.0.1", ports=None):
+    """4 つの上流ぶんの代役を立てる → {名前: StubServer}"""
+    ports = ports or {}
+    specs = [
+        ("rakuten", HOTEL_SEARCH_URL, {urlsplit(HOTEL_SEARCH_URL).path: rakuten_hotels}),
+        ("archive", ARCHIVE_URL, {urlsplit(ARCHIVE_URL).path: open_meteo_archive}),
+        ("forecast", FORECAST_URL, {urlsplit(FORECAST_URL).path: open_meteo_forecast}),
+        ("connpass", CONNPASS_API_URL, {urlsplit(CONNPASS_API_URL).path: connpass_events}),
+    ]
+    return {
+        name: StubServer(
+            name, real_url, routes,
+            latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, drop_rate=drop_rate,
+            host=host, port=ports.get(name, 0),
+        ).start()
+        for name, real_url, routes in specs
+    }
+
+
+def overrides(stubs):
+    """HTTP_UPSTREAM_OVERRIDES に入れる dict"""
+    return {stub.real_base: stub.url for stub in stubs.values()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--jitter-ms", type=float, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8801, help="最初のポート（rakuten, archive, forecast, connpass の順）")
+    args = parser.parse_args()
+
+    names = ["rakuten", "archive", "forecast", "connpass"]
+    stubs = start_stubs(
+        args.latency_ms, args.jitter_ms, args.error_rate, args.drop_rate,
+        ports={name: args.port + i for i, name in enumerate(names)},
+    )
+    print("HTTP_UPSTREAM_OVERRIDES = " + json.dumps(overrides(stubs), indent=4))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for stub in stubs.values():
+            stub.stop()
@@ -11,71 +11,80 @@ class Config:
     # JSON ファイルパス
     SPOTS_JSON_PATH = os.path.join(BASE_DIR, "static", "json", "spots.json")
     EVENTS_JSON_PATH = os.path.join(BASE_DIR, "static", "json", "events.json")
+    # 都道府県の参照データ（utils/prefectures.py が読み込む）
+    PREFECTURES_JSON_PATH = os.path.join(BASE_DIR, "static", "json", "prefectures.json")
 
     # 画像アップロード用
     UPLOAD_DIR = os.path.join(BASE_DIR, "static", "uploads")
 
+    # /api/pref-counts のキャッシュ
+    DATA_VERSION_TTL = 10          # 他ワーカーの更新番号を信用する秒数
+    PREF_COUNTS_CACHE_SIZE = 1024  # (user_id, version) ごとの JSON を保持する件数
 
-# ✔ PREF_LATLON（天気API用）
-PREF_LATLON = {
-    "北海道": (43.06417, 141.34694),
-    "青森": (40.82444, 140.74),
-    "岩手": (39.70361, 141.1525),
-    "宮城": (38.26889, 140.87194),
-    "秋田": (39.71861, 140.1025),
-    "山形": (38.24056, 140.36333),
-    "福島": (37.75, 140.46778),
-    "茨城": (36.34139, 140.44667),
-    "栃木": (36.56583, 139.88361),
-    "群馬": (36.39111, 139.06083),
-    "埼玉": (35.85694, 139.64889),
-    "千葉": (35.60472, 140.12333),
-    "東京": (35.68944, 139.69167),
-    "神奈川": (35.44778, 139.6425),
-    "新潟": (37.90222, 139.02361),
-    "富山": (36.69528, 137.21139),
-    "石川": (36.59444, 136.62556),
-    "福井": (36.06528, 136.22194),
-    "山梨": (35.66389, 138.56833),
-    "長野": (36.65139, 138.18111),
-    "岐阜": (35.39111, 136.72222),
-    "静岡": (34.97694, 138.38306),
-    "愛知": (35.18028, 136.90667),
-    "三重": (34.73028, 136.50861),
-    "滋賀": (35.00444, 135.86833),
-    "京都": (35.02139, 135.75556),
-    "大阪": (34.68639, 135.52),
-    "兵庫": (34.69139, 135.18306),
-    "奈良": (34.68528, 135.83278),
-    "和歌山": (34.22611, 135.1675),
-    "鳥取": (35.50361, 134.23833),
-    "島根": (35.47222, 133.05056),
-    "岡山": (34.66167, 133.935),
-    "広島": (34.39639, 132.45944),
-    "山口": (34.18583, 131.47139),
-    "徳島": (34.06583, 134.55944),
-    "香川": (34.34028, 134.04333),
-    "愛媛": (33.84167, 132.76611),
-    "高知": (33.55972, 133.53111),
-    "福岡": (33.59028, 130.40194),
-    "佐賀": (33.24944, 130.29889),
-    "長崎": (32.74472, 129.87361),
-    "熊本": (32.78972, 130.74167),
-    "大分": (33.23806, 131.6125),
-    "宮崎": (31.91111, 131.42389),
-    "鹿児島": (31.56028, 130.55806),
-    "沖縄": (26.2125, 127.68111)
-}
-
-# 都道府県フルネーム一覧
-PREF_LIST = [
-    "北海道","青森県","岩手県","宮城県","秋田県","山形県","福島県",
-    "茨城県","栃木県","群馬県","埼玉県","千葉県","東京都","神奈川県",
-    "新潟県","富山県","石川県","福井県","山梨県","長野県",
-    "岐阜県","静岡県","愛知県","三重県",
-    "滋賀県","京都府","大阪府","兵庫県","奈良県","和歌山県",
-    "鳥取県","島根県","岡山県","広島県","山口県",
-    "徳島県","香川県","愛媛県","高知県",
-    "福岡県","佐賀県","長崎県","熊本県","大分県","宮崎県","鹿児島県",
-    "沖縄県"
-]
+    # 一覧ページの 1 ページ件数
+    GOURMET_PAGE_SIZE = 30
+    SPOT_PAGE_SIZE = 30
+
+    # 観光地・イベント検索（プロセス内の索引を使う。False なら DB の FTS / LIKE）
+    CATALOG_SEARCH_ENGINE = True
+    CATALOG_CHECK_INTERVAL = 5  # カタログ更新の確認間隔（秒）
+
+    # 過去の天気のバックグラウンド取得（utils/weather_worker.py）
+    WEATHER_ASYNC = True           # False なら登録・編集のリクエスト内で取得
+    WEATHER_WORKERS = 2            # スレッド数
+    WEATHER_RETRY_ATTEMPTS = 4     # 上流 API の試行回数
+    WEATHER_RETRY_BACKOFF = 1.0    # 最初の再試行までの秒数（以降 2 倍ずつ）
+    WEATHER_BACKFILL_RATE = 1.0    # flask backfill-weather の API 呼び出し（回/秒）
+
+    # /weather の予報キャッシュ（utils/forecast_cache.py）
+    FORECAST_PREFETCH = True          # 47 都道府県ぶんを裏で定期取得する
+    FORECAST_REFRESH_INTERVAL = 900   # 定期取得の間隔（秒）
+    FORECAST_TTL = 1800               # これより古ければ表示のついでに取り直しを起こす（表示は古い値のまま）
+
+    # 外部 API 呼び出し（utils/http_client.py）
+    HTTP_CONNECT_TIMEOUT = 3.05    # 接続の timeout（秒）
+    HTTP_READ_TIMEOUT = 10.0       # 応答待ちの timeout（秒）。呼び出し側で個別に指定したものが優先
+    HTTP_RETRIES = 2               # 接続エラー・タイムアウト・5xx・429 の再試行回数
+    HTTP_RETRY_BACKOFF = 0.5       # 最初の再試行までの秒数（以降 2 倍ずつ、揺らぎ付き）
+    HTTP_POOL_SIZE = 10            # ホストごとに保持する接続数
+    HTTP_BREAKER_THRESHOLD = 5     # 続けてこれだけ失敗したらそのホストへの呼び出しを止める
+    HTTP_BREAKER_RESET = 30        # 止めてから試しに 1 本通すまでの秒数
+    # 上流の向き先の差し替え（{"https://app.rakuten.co.jp": "http://127.0.0.1:8801"} など）
+    #   python -m bench.stub_upstreams で立てた代役サーバーに向けるとき用。空なら本物を呼ぶ
+    HTTP_UPSTREAM_OVERRIDES = {}
+    # /api/upstreams・/api/hotel-cache・/api/connpass-cache（運用向けの統計）を返すか。ログイン無しで見えるので既定は False（404）
+    EXPOSE_UPSTREAM_STATS = False
+
+    # 楽天トラベル検索結果のキャッシュ（utils/hotel_cache.py）
+    HOTEL_CACHE_TTL = 600          # 秒
+    HOTEL_CACHE_SIZE = 512         # (キーワード, page, hits) ごとに保持する件数
+    HOTEL_PAGE_SIZE = 20           # 検索結果の 1 ページ件数（楽天 API の hits、最大 30）
+    HOTEL_PREFETCH_MAX = 4         # 次ページの先読みを同時に何件まで走らせるか（0 で先読みしない）
+
+    # connpass 検索（utils/connpass.py）
+    CONNPASS_API_KEY = os.environ.get("CONNPASS_API_KEY")  # connpass API v2 の X-API-Key
+    CONNPASS_CACHE_TTL = 300       # (キーワード, 日付) ごとの応答を持つ秒数
+    CONNPASS_CACHE_SIZE = 256
+    CONNPASS_WORKERS = 4           # 複数キーワード・日付の検索を同時に投げる数
+
+    # 写真アップロードの受け取り（utils/uploads.py）
+    MAX_CONTENT_LENGTH = 64 * 1024 * 1024     # 1 リクエストの上限（バイト）。超えたら 413 → 元の画面へ
+    UPLOAD_MAX_FILE_SIZE = 20 * 1024 * 1024   # 写真 1 枚の上限（バイト）
+    UPLOAD_MAX_FILES = 10                     # 1 回に保存する枚数（超えた分は保存しない）
+
+    # アップロード写真の縮小版（utils/image_pipeline.py。Pillow が無ければ作らず元画像を表示）
+    IMAGE_ASYNC = True             # False なら登録・編集のリクエスト内で作る
+    IMAGE_WORKERS = 2              # 縮小する子プロセスの数
+    IMAGE_THUMB_SIZE = 320         # 一覧用の長辺（px）
+    IMAGE_DISPLAY_SIZE = 1280      # 表示用の長辺（px）
+    IMAGE_FORMAT = "WEBP"          # "WEBP" か "JPEG"
+    IMAGE_QUALITY = 80
+
+    # カタログ画像（static/images/spots・events）の縮小版（utils/catalog_images.py。形式は IMAGE_FORMAT）
+    CATALOG_IMAGE_WIDTHS = (320, 640, 960)  # srcset に並べる幅（px）
+    CATALOG_IMAGE_QUALITY = 75
+    CATALOG_IMAGE_PLACEHOLDER = 16          # 読み込み中に敷く極小画像の幅（px）
+
+    # ハッシュ入りの名前で配る静的ファイル（utils/assets.py。flask build-assets で static/dist へ）
+    ASSET_FINGERPRINT = True   # False なら asset_url() も素の /static/（debug のときも）
+    ASSET_SOURCES = ("css", "js", "svg", "images/favicon.png", "images/tabiiro_rogo.png")
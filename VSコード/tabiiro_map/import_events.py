@@ -1,59 +1,45 @@
 # import_events.py
-import json
+#   python import_events.py [--dry-run] [--prune] [--chunk-size 500] [--no-images] [--path static/json/events.json]
+import argparse
 from pathlib import Path
 
 from app import app
-from extensions import db
-from models import Event
+from utils.catalog_images import build_catalog_images
+from utils.catalog_import import CHUNK_SIZE, EVENTS, import_catalog
+from utils.catalog_search import rebuild_search_index
 
 # ★ JSONの場所（ここ重要）
 JSON_PATH = Path("static/json/events.json")
 
-def import_events(clear_before=False):
-    if not JSON_PATH.exists():
-        raise FileNotFoundError(f"JSON not found: {JSON_PATH.resolve()}")
-
-    with JSON_PATH.open(encoding="utf-8") as f:
-        pref_list = json.load(f)
+def import_events(path=JSON_PATH, dry_run=False, prune=False, chunk_size=CHUNK_SIZE, images=True):
+    """events.json を events テーブルへ（開催時期は month_start / period_start / month_end / period_end にも展開）"""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"JSON not found: {path.resolve()}")
 
     with app.app_context():
-        if clear_before:
-            Event.query.delete()
-            db.session.commit()
-
-        added = 0
-        updated = 0
-
-        for pref in pref_list:
-            pref_code = str(pref.get("pref_code"))
-            pref_name = pref.get("pref_name_ja")
-
-            for e in pref.get("events", []):
-                event_code = e.get("event_id")
-                if not event_code:
-                    continue
-
-                event = Event.query.get(event_code)
-                if event is None:
-                    event = Event(event_code=event_code)
-                    db.session.add(event)
-                    added += 1
-                else:
-                    updated += 1
-
-                event.title = e.get("event_name")
-                event.category = e.get("category")
-                event.description = e.get("description")
-                event.month = e.get("month")      # "2月上旬"
-                event.city = e.get("city")
-                event.url = e.get("event_url")
-                event.image_url = e.get("image_url")
-                event.pref_code = pref_code
-                event.pref_name = pref_name
-
-        db.session.commit()
-        print(f"✅ import finished: added={added}, updated={updated}")
+        report = import_catalog(EVENTS, path, dry_run=dry_run, prune=prune, chunk_size=chunk_size)
+        print(report.summary())
+
+        # 全文検索索引（トリガーで同期済みだが、件数が多い取り込み後は作り直して整える）
+        if report.written:
+            rebuild_search_index()
+
+        # 画像の縮小版（追加・画像が変わった行の分だけ。Pillow が無ければ何もしない）
+        if images and not dry_run:
+            for built, skipped in build_catalog_images(("events",)).values():
+                print(f"   images: built={built} skipped={skipped}")
+
+    return report
 
 
 if __name__ == "__main__":
-    import_events(clear_before=False)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default=JSON_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに追加・変更・削除の件数を表示")
+    parser.add_argument("--prune", action="store_true", help="JSON に無い行を削除")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--no-images", action="store_true", help="画像の縮小版を作らない（flask build-catalog-images で後から）")
+    args = parser.parse_args()
+    import_events(args.path, dry_run=args.dry_run, prune=args.prune, chunk_size=args.chunk_size,
+                  images=not args.no_images)
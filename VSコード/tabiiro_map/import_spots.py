@@ -1,65 +1,44 @@
 # import_spots.py
-import json
+#   python import_spots.py [--dry-run] [--prune] [--chunk-size 500] [--no-images] [--path static/json/spots.json]
+import argparse
 from pathlib import Path
 
 from app import app
-from extensions import db
-from models import Spots  # ★ class Spots を使う
+from utils.catalog_images import build_catalog_images
+from utils.catalog_import import CHUNK_SIZE, SPOTS, import_catalog
+from utils.catalog_search import rebuild_search_index
 
 JSON_PATH = Path("static/json/spots.json")
 
-def import_spots(clear_before: bool = False):
-    if not JSON_PATH.exists():
-        raise FileNotFoundError(f"JSON not found: {JSON_PATH.resolve()}")
-
-    with JSON_PATH.open(encoding="utf-8") as f:
-        pref_list = json.load(f)
+def import_spots(path=JSON_PATH, dry_run=False, prune=False, chunk_size=CHUNK_SIZE, images=True):
+    """spots.json を spots テーブルへ（dry_run なら差分の報告だけ、prune なら JSON に無い行を削除）"""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"JSON not found: {path.resolve()}")
 
     with app.app_context():
-        if clear_before:
-            Spots.query.delete()
-            db.session.commit()
-
-        added = 0
-        updated = 0
-        skipped = 0
-
-        for pref in pref_list:
-            pref_code = pref.get("pref_code")                 # int
-            pref_name_ja = pref.get("pref_name_ja", "")
-            pref_name_en = pref.get("pref_name_en", "")
-            region = pref.get("region", "")
-
-            for s in pref.get("spots", []):
-                spot_id = (s.get("spot_id") or "").strip()
-                if not spot_id:
-                    skipped += 1
-                    continue
-
-                spot = Spots.query.get(spot_id)
-                if spot is None:
-                    spot = Spots(spot_id=spot_id)
-                    db.session.add(spot)
-                    added += 1
-                else:
-                    updated += 1
+        report = import_catalog(SPOTS, path, dry_run=dry_run, prune=prune, chunk_size=chunk_size)
+        print(report.summary())
 
-                # JSON → DB
-                spot.name = (s.get("spot_name") or "").strip()
-                spot.city = (s.get("city") or "").strip()
-                spot.category = (s.get("category") or "").strip()
-                spot.description = (s.get("description") or "").strip()
-                spot.image_url = (s.get("image_url") or "").strip()
+        # 全文検索索引（トリガーで同期済みだが、件数が多い取り込み後は作り直して整える）
+        if report.written:
+            rebuild_search_index()
 
-                # pref情報（外側から）
-                spot.pref_code = pref_code
-                spot.pref_name_ja = pref_name_ja
-                spot.pref_name_en = pref_name_en
-                spot.region = region
+        # 画像の縮小版（追加・画像が変わった行の分だけ。Pillow が無ければ何もしない）
+        if images and not dry_run:
+            for built, skipped in build_catalog_images(("spots",)).values():
+                print(f"   images: built={built} skipped={skipped}")
 
-        db.session.commit()
-        print(f"✅ SPOTS import finished: added={added}, updated={updated}, skipped={skipped}")
+    return report
 
 
 if __name__ == "__main__":
-    import_spots(clear_before=False)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default=JSON_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに追加・変更・削除の件数を表示")
+    parser.add_argument("--prune", action="store_true", help="JSON に無い行を削除")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--no-images", action="store_true", help="画像の縮小版を作らない（flask build-catalog-images で後から）")
+    args = parser.parse_args()
+    import_spots(args.path, dry_run=args.dry_run, prune=args.prune, chunk_size=args.chunk_size,
+                  images=not args.no_images)
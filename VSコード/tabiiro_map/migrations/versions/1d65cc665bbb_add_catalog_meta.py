@@ -0,0 +1,28 @@
+"""add catalog_meta
+
+Revision ID: 1d65cc665bbb
+Revises: 5460db2b8bed
+Create Date: 2026-10-18 18:25:14.603391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1d65cc665bbb'
+down_revision = '5460db2b8bed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catalog_meta',
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('catalog_meta')
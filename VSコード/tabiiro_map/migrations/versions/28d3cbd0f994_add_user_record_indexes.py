@@ -0,0 +1,51 @@
+"""add user record indexes
+
+Revision ID: 28d3cbd0f994
+Revises: 49a184c24b82
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '28d3cbd0f994'
+down_revision = '49a184c24b82'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 既存の重複ブックマークは一番古いものだけ残す（ユニーク制約のため）
+    op.execute(
+        'DELETE FROM "BOOKMARK" WHERE bookmark_id NOT IN ('
+        ' SELECT MIN(bookmark_id) FROM "BOOKMARK"'
+        ' GROUP BY user_id, target_type, target_id)'
+    )
+    # 使われていなかった TRAVEL_RECORD も同様に (user_id, prefecture) で一意にする
+    op.execute(
+        'DELETE FROM "TRAVEL_RECORD" WHERE id NOT IN ('
+        ' SELECT MIN(id) FROM "TRAVEL_RECORD"'
+        ' GROUP BY user_id, prefecture)'
+    )
+
+    op.create_index('ix_SPOT_user_pref_name', 'SPOT', ['user_id', 'prefecture', 'name'], unique=False)
+    op.create_index('ix_FOOD_user_shop', 'FOOD', ['user_id', 'shop_name'], unique=False)
+    op.create_index('ix_STAY_user_id', 'STAY', ['user_id'], unique=False)
+    op.create_index('ux_BOOKMARK_user_target', 'BOOKMARK', ['user_id', 'target_type', 'target_id'], unique=True)
+    op.create_index('ix_PHOTO_spot_id', 'PHOTO', ['spot_id'], unique=False)
+    op.create_index('ix_PHOTO_food_id', 'PHOTO', ['food_id'], unique=False)
+    op.create_index('ix_PHOTO_stay_id', 'PHOTO', ['stay_id'], unique=False)
+    op.create_index('ux_TRAVEL_RECORD_user_pref', 'TRAVEL_RECORD', ['user_id', 'prefecture'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ux_TRAVEL_RECORD_user_pref', table_name='TRAVEL_RECORD')
+    op.drop_index('ix_PHOTO_stay_id', table_name='PHOTO')
+    op.drop_index('ix_PHOTO_food_id', table_name='PHOTO')
+    op.drop_index('ix_PHOTO_spot_id', table_name='PHOTO')
+    op.drop_index('ux_BOOKMARK_user_target', table_name='BOOKMARK')
+    op.drop_index('ix_STAY_user_id', table_name='STAY')
+    op.drop_index('ix_FOOD_user_shop', table_name='FOOD')
+    op.drop_index('ix_SPOT_user_pref_name', table_name='SPOT')
@@ -0,0 +1,63 @@
+"""add weather daily
+
+Revision ID: 38360542d47c
+Revises: 63a1b00337ee
+Create Date: 2026-10-18 07:27:23.238752
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '38360542d47c'
+down_revision = '63a1b00337ee'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('weather_daily',
+    sa.Column('prefecture', sa.String(length=20), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('weather_code', sa.Integer(), nullable=True),
+    sa.Column('weather', sa.String(length=50), nullable=True),
+    sa.Column('temp_max', sa.Float(), nullable=True),
+    sa.Column('temp_min', sa.Float(), nullable=True),
+    sa.Column('precipitation', sa.Float(), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('prefecture', 'date')
+    )
+
+    # SPOT に保存済みの天気を weather_daily へ（同じ都道府県・日付は 1 行に）
+    op.execute(
+        "INSERT OR IGNORE INTO weather_daily "
+        "(prefecture, date, weather, temp_max, temp_min, precipitation, fetched_at) "
+        "SELECT prefecture, visit_date, weather, temp_max, temp_min, precipitation, MAX(updated_at) "
+        "FROM SPOT WHERE weather IS NOT NULL "
+        "GROUP BY prefecture, visit_date"
+    )
+
+    with op.batch_alter_table('SPOT', schema=None) as batch_op:
+        batch_op.drop_column('temp_max')
+        batch_op.drop_column('precipitation')
+        batch_op.drop_column('temp_min')
+        batch_op.drop_column('weather')
+
+
+def downgrade():
+    with op.batch_alter_table('SPOT', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('weather', sa.VARCHAR(length=50), nullable=True))
+        batch_op.add_column(sa.Column('temp_min', sa.FLOAT(), nullable=True))
+        batch_op.add_column(sa.Column('precipitation', sa.FLOAT(), nullable=True))
+        batch_op.add_column(sa.Column('temp_max', sa.FLOAT(), nullable=True))
+
+    op.execute(
+        "UPDATE SPOT SET "
+        "weather = (SELECT w.weather FROM weather_daily w WHERE w.prefecture = SPOT.prefecture AND w.date = SPOT.visit_date), "
+        "temp_max = (SELECT w.temp_max FROM weather_daily w WHERE w.prefecture = SPOT.prefecture AND w.date = SPOT.visit_date), "
+        "temp_min = (SELECT w.temp_min FROM weather_daily w WHERE w.prefecture = SPOT.prefecture AND w.date = SPOT.visit_date), "
+        "precipitation = (SELECT w.precipitation FROM weather_daily w WHERE w.prefecture = SPOT.prefecture AND w.date = SPOT.visit_date)"
+    )
+
+    op.drop_table('weather_daily')
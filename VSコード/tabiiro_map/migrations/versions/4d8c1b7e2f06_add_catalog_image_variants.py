@@ -0,0 +1,73 @@
+"""add catalog image variants
+
+Revision ID: 4d8c1b7e2f06
+Revises: e3f7a0b95c12
+Create Date: 2026-10-18 13:21:08.553190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8c1b7e2f06'
+down_revision = 'e3f7a0b95c12'
+branch_labels = None
+depends_on = None
+
+
+# (FTS テーブル, 元テーブル, 索引するカラム)（5460db2b8bed と同じ）
+FTS_TABLES = [
+    ('spots_fts', 'spots', ['name', 'description', 'city', 'category']),
+    ('events_fts', 'events', ['title', 'description', 'city', 'category']),
+]
+
+
+def _recreate_fts_triggers(bind, fts, src, cols):
+    # drop_column は SQLite ではテーブルを作り直すため、FTS の同期トリガーが消える
+    has_fts = bind.execute(
+        sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts}
+    ).first()
+    if not has_fts:
+        return
+    col_list = ', '.join(cols)
+    new_vals = ', '.join(f'new.{c}' for c in cols)
+    old_vals = ', '.join(f'old.{c}' for c in cols)
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {src} BEGIN "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {src} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {src} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+    )
+    # 作り直しで rowid が変わっているので索引も作り直す
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade():
+    # 中身は flask build-catalog-images（または import_spots.py / import_events.py）で入れる
+    for table in ('spots', 'events'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('image_srcset', sa.Text(), nullable=True))
+            batch_op.add_column(sa.Column('image_width', sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column('image_height', sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column('image_placeholder', sa.Text(), nullable=True))
+
+
+def downgrade():
+    for table in ('spots', 'events'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('image_placeholder')
+            batch_op.drop_column('image_height')
+            batch_op.drop_column('image_width')
+            batch_op.drop_column('image_srcset')
+
+    bind = op.get_bind()
+    for fts, src, cols in FTS_TABLES:
+        _recreate_fts_triggers(bind, fts, src, cols)
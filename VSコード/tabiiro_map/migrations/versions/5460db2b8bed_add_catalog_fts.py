@@ -0,0 +1,72 @@
+"""add catalog fts
+
+Revision ID: 5460db2b8bed
+Revises: 5d99e4f7be53
+Create Date: 2026-10-18 16:02:47.551930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5460db2b8bed'
+down_revision = '5d99e4f7be53'
+branch_labels = None
+depends_on = None
+
+
+# (FTS テーブル, 元テーブル, 索引するカラム)
+FTS_TABLES = [
+    ('spots_fts', 'spots', ['name', 'description', 'city', 'category']),
+    ('events_fts', 'events', ['title', 'description', 'city', 'category']),
+]
+
+
+def _fts5_trigram_available(bind):
+    # trigram トークナイザは SQLite 3.34 以降の FTS5 が必要
+    try:
+        bind.exec_driver_sql("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram')")
+        bind.exec_driver_sql("DROP TABLE temp._fts5_probe")
+        return True
+    except sa.exc.OperationalError:
+        return False
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite' or not _fts5_trigram_available(bind):
+        # FTS5 が無い環境では作らない（検索は LIKE にフォールバック）
+        return
+
+    for fts, src, cols in FTS_TABLES:
+        col_list = ', '.join(cols)
+        new_vals = ', '.join(f'new.{c}' for c in cols)
+        old_vals = ', '.join(f'old.{c}' for c in cols)
+
+        op.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({col_list}, "
+            f"content='{src}', content_rowid='rowid', tokenize='trigram')"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {src} BEGIN "
+            f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {src} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {src} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); "
+            f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    for fts, src, cols in FTS_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {fts}_au")
+        op.execute(f"DROP TRIGGER IF EXISTS {fts}_ad")
+        op.execute(f"DROP TRIGGER IF EXISTS {fts}_ai")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
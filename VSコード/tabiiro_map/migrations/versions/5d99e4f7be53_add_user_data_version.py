@@ -0,0 +1,26 @@
+"""add user data_version
+
+Revision ID: 5d99e4f7be53
+Revises: 28d3cbd0f994
+Create Date: 2026-10-18 13:40:05.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d99e4f7be53'
+down_revision = '28d3cbd0f994'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('USER', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('USER', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,125 @@
+"""add event timing columns
+
+Revision ID: 63a1b00337ee
+Revises: 1d65cc665bbb
+Create Date: 2026-10-18 20:51:39.274410
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '63a1b00337ee'
+down_revision = '1d65cc665bbb'
+branch_labels = None
+depends_on = None
+
+
+# ====================================================
+# このリビジョン時点の utils.event_timing.parse_event_month の写し
+# （アプリ側が変わってもこのマイグレーションの結果は変えない）
+# ====================================================
+PERIODS = {"上旬": 1, "初旬": 1, "中旬": 2, "下旬": 3, "末": 3}
+
+_YEAR_ROUND = ("通年", "年中", "一年中", "オールシーズン")
+_RANGE_SEP = r"(?:[〜~\-−–ー]|から)"
+_TOKEN_RE = re.compile(
+    r"(?<!\d)(\d{1,2})(?:\s*月\s*(上旬|初旬|中旬|下旬|末)?|(?=\s*" + _RANGE_SEP + r"\s*\d))"
+    r"|(上旬|初旬|中旬|下旬|末)"
+)
+
+
+def parse_event_month(text):
+    if not text:
+        return None, None, None, None
+
+    text = unicodedata.normalize("NFKC", text).strip()
+    if any(word in text for word in _YEAR_ROUND):
+        return 1, None, 12, None
+
+    points = []
+    for m in _TOKEN_RE.finditer(text):
+        month, period, bare_period = m.groups()
+        if month:
+            month = int(month)
+            if not 1 <= month <= 12:
+                continue
+            points.append((month, PERIODS.get(period)))
+        elif points:
+            points.append((points[-1][0], PERIODS[bare_period]))
+
+    if not points:
+        return None, None, None, None
+
+    (ms, ps), (me, pe) = points[0], points[-1]
+    return ms, ps, me, pe
+
+
+# events_fts の同期トリガー（5460db2b8bed と同じ）
+FTS_COLUMNS = ['title', 'description', 'city', 'category']
+
+
+def _recreate_events_fts_triggers():
+    col_list = ', '.join(FTS_COLUMNS)
+    new_vals = ', '.join(f'new.{c}' for c in FTS_COLUMNS)
+    old_vals = ', '.join(f'old.{c}' for c in FTS_COLUMNS)
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN "
+        f"INSERT INTO events_fts(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN "
+        f"INSERT INTO events_fts(events_fts, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE ON events BEGIN "
+        f"INSERT INTO events_fts(events_fts, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); "
+        f"INSERT INTO events_fts(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+    )
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('month_start', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('period_start', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('month_end', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('period_end', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_events_month_range', ['month_start', 'month_end'], unique=False)
+        batch_op.create_index('ix_events_month_wrap', ['month_end'], unique=False,
+                              sqlite_where=sa.text('month_start > month_end'))
+
+    # 既存データの開催時期を構造化
+    bind = op.get_bind()
+    rows = bind.execute(sa.text('SELECT event_code, month FROM events')).all()
+    for event_code, month in rows:
+        ms, ps, me, pe = parse_event_month(month)
+        bind.execute(
+            sa.text(
+                'UPDATE events SET month_start = :ms, period_start = :ps, '
+                'month_end = :me, period_end = :pe WHERE event_code = :code'
+            ),
+            {'ms': ms, 'ps': ps, 'me': me, 'pe': pe, 'code': event_code},
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_index('ix_events_month_wrap')
+        batch_op.drop_index('ix_events_month_range')
+        batch_op.drop_column('period_end')
+        batch_op.drop_column('month_end')
+        batch_op.drop_column('period_start')
+        batch_op.drop_column('month_start')
+
+    # drop_column は SQLite ではテーブルを作り直すため、events_fts の同期トリガーも作り直す
+    bind = op.get_bind()
+    has_fts = bind.execute(
+        sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts'")
+    ).first()
+    if has_fts:
+        _recreate_events_fts_triggers()
+        op.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
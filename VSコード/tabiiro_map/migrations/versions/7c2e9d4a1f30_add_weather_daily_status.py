@@ -0,0 +1,28 @@
+"""add weather daily status
+
+Revision ID: 7c2e9d4a1f30
+Revises: 38360542d47c
+Create Date: 2026-10-18 08:02:11.514203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e9d4a1f30'
+down_revision = '38360542d47c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('weather_daily', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=10), server_default='ok', nullable=False))
+
+
+def downgrade():
+    # 取得待ち・失敗の行は値が無いので消す
+    op.execute("DELETE FROM weather_daily WHERE status != 'ok'")
+    with op.batch_alter_table('weather_daily', schema=None) as batch_op:
+        batch_op.drop_column('status')
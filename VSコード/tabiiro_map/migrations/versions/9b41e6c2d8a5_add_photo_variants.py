@@ -0,0 +1,28 @@
+"""add photo variants
+
+Revision ID: 9b41e6c2d8a5
+Revises: 7c2e9d4a1f30
+Create Date: 2026-10-18 10:14:37.208311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b41e6c2d8a5'
+down_revision = '7c2e9d4a1f30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('PHOTO', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thumb_filename', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('display_filename', sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('PHOTO', schema=None) as batch_op:
+        batch_op.drop_column('display_filename')
+        batch_op.drop_column('thumb_filename')
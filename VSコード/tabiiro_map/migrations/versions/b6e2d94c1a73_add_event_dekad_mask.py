@@ -0,0 +1,149 @@
+"""add event dekad mask
+
+Revision ID: b6e2d94c1a73
+Revises: 4d8c1b7e2f06
+Create Date: 2026-10-18 15:40:12.118305
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e2d94c1a73'
+down_revision = '4d8c1b7e2f06'
+branch_labels = None
+depends_on = None
+
+
+# ====================================================
+# このリビジョン時点の utils.event_timing（開催時期の解析）の写し
+# （アプリ側が変わってもこのマイグレーションの結果は変えない）
+# ====================================================
+PERIODS = {"上旬": 1, "初旬": 1, "中旬": 2, "下旬": 3, "末": 3}
+
+_YEAR_ROUND = ("通年", "年中", "一年中", "オールシーズン")
+_RANGE_SEP = r"(?:[〜~\-−–ー]|から)"
+_LIST_SEP = re.compile(r"[・、,/]")
+_TOKEN_RE = re.compile(
+    r"(?<!\d)(\d{1,2})(?:\s*月\s*(上旬|初旬|中旬|下旬|末)?|(?=\s*" + _RANGE_SEP + r"\s*\d))"
+    r"|(上旬|初旬|中旬|下旬|末)"
+)
+
+
+def _dekad(month, period):
+    return (month - 1) * 3 + (period - 1)
+
+
+def _first(p):
+    return _dekad(p[0], p[1] or 1)
+
+
+def _last(p):
+    return _dekad(p[0], p[1] or 3)
+
+
+def _spans(text):
+    spans = []
+    last_month = None
+    for part in _LIST_SEP.split(text):
+        points = []
+        for m in _TOKEN_RE.finditer(part):
+            month, period, bare_period = m.groups()
+            if month:
+                month = int(month)
+                if not 1 <= month <= 12:
+                    continue
+                points.append((month, PERIODS.get(period)))
+            elif points or last_month:
+                points.append((points[-1][0] if points else last_month, PERIODS[bare_period]))
+        if points:
+            spans.append((points[0], points[-1]))
+            last_month = points[-1][0]
+    return spans
+
+
+def parse_timing(text):
+    """→ (month_start, period_start, month_end, period_end, dekad_mask)"""
+    if not text:
+        return None, None, None, None, None
+    text = unicodedata.normalize("NFKC", text).strip()
+    if any(word in text for word in _YEAR_ROUND):
+        return 1, None, 12, None, (1 << 36) - 1
+
+    spans = _spans(text)
+    if not spans:
+        return None, None, None, None, None
+
+    mask = 0
+    for start, end in spans:
+        a, b = _first(start), _last(end)
+        for d in (range(a, b + 1) if a <= b else list(range(a, 36)) + list(range(0, b + 1))):
+            mask |= 1 << d
+
+    if len(spans) == 1:
+        (ms, ps), (me, pe) = spans[0]
+    elif any(_first(start) > _last(end) for start, end in spans):
+        ms, ps, me, pe = 1, None, 12, None
+    else:
+        ms, ps = min((start for start, _ in spans), key=_first)
+        me, pe = max((end for _, end in spans), key=_last)
+    return ms, ps, me, pe, mask
+
+
+# events_fts の同期トリガー（5460db2b8bed と同じ）
+FTS_COLUMNS = ['title', 'description', 'city', 'category']
+
+
+def _recreate_events_fts_triggers():
+    col_list = ', '.join(FTS_COLUMNS)
+    new_vals = ', '.join(f'new.{c}' for c in FTS_COLUMNS)
+    old_vals = ', '.join(f'old.{c}' for c in FTS_COLUMNS)
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN "
+        f"INSERT INTO events_fts(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN "
+        f"INSERT INTO events_fts(events_fts, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE ON events BEGIN "
+        f"INSERT INTO events_fts(events_fts, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); "
+        f"INSERT INTO events_fts(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+    )
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('dekad_mask', sa.BigInteger(), nullable=True))
+
+    # 既存データの開催時期を解析し直す（"3月・9月" は範囲ではなく 3 月と 9 月だけ）
+    bind = op.get_bind()
+    rows = bind.execute(sa.text('SELECT event_code, month FROM events')).all()
+    for event_code, month in rows:
+        ms, ps, me, pe, mask = parse_timing(month)
+        bind.execute(
+            sa.text(
+                'UPDATE events SET month_start = :ms, period_start = :ps, '
+                'month_end = :me, period_end = :pe, dekad_mask = :mask WHERE event_code = :code'
+            ),
+            {'ms': ms, 'ps': ps, 'me': me, 'pe': pe, 'mask': mask or None, 'code': event_code},
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('dekad_mask')
+
+    # drop_column は SQLite ではテーブルを作り直すため、events_fts の同期トリガーも作り直す
+    bind = op.get_bind()
+    has_fts = bind.execute(
+        sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts'")
+    ).first()
+    if has_fts:
+        _recreate_events_fts_triggers()
+        op.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
@@ -0,0 +1,32 @@
+"""add photo blob
+
+Revision ID: e3f7a0b95c12
+Revises: 9b41e6c2d8a5
+Create Date: 2026-10-18 11:02:54.617420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f7a0b95c12'
+down_revision = '9b41e6c2d8a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 既存の写真は元のファイル名のまま（flask dedupe-uploads で移す）
+    op.create_table('PHOTO_BLOB',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+
+
+def downgrade():
+    op.drop_table('PHOTO_BLOB')
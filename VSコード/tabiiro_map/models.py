@@ -12,6 +12,7 @@ class User(db.Model):
     username = db.Column(db.String(30), unique=True, nullable=False)  # ユーザー名
     email = db.Column(db.String(100), unique=True, nullable=False)    # メールアドレス
     password = db.Column(db.String(200), nullable=False)              # ハッシュ済みパスワード
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # 記録データの更新番号（Spot 書き込みごとに +1）
     created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)  # 作成日時
     updated_at = db.Column(
         db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False
@@ -29,6 +30,11 @@ class Spots(db.Model):
     category = db.Column(db.String(100))
     description = db.Column(db.Text)
     image_url = db.Column(db.String(500))
+    # 幅違いの縮小版（utils/catalog_images.py が作る。image_url が変わったら空に戻る）
+    image_srcset = db.Column(db.Text)                # "images/variants/spots/01_001_320.webp 320w, ..."（static からの相対パス）
+    image_width = db.Column(db.Integer)              # 一番大きい縮小版の幅・高さ（img の width / height）
+    image_height = db.Column(db.Integer)
+    image_placeholder = db.Column(db.Text)           # 読み込み中に敷く極小画像（data URI）
     pref_code = db.Column(db.Integer)
     pref_name_ja = db.Column(db.String(50))
     pref_name_en = db.Column(db.String(50))
@@ -39,6 +45,10 @@ class Spots(db.Model):
 # ============================
 class Spot(db.Model):
     __tablename__ = "SPOT"
+    __table_args__ = (
+        # 一覧・都道府県絞り込み（user_id + prefecture、prefecture/name 順）
+        db.Index("ix_SPOT_user_pref_name", "user_id", "prefecture", "name"),
+    )
 
     spot_id = db.Column(db.Integer, primary_key=True, autoincrement=True)          # 観光地ID
     user_id = db.Column(db.Integer, db.ForeignKey("USER.id"), nullable=False)      # 登録ユーザー
@@ -46,10 +56,6 @@ class Spot(db.Model):
     prefecture = db.Column(db.String(20), nullable=False)                          # 都道府県（短縮名：東京/京都など）
     visit_date = db.Column(db.Date, nullable=False)                                # 訪問日
     comment = db.Column(db.Text)                                                   # コメント
-    weather = db.Column(db.String(50))                                             # 天気アイコン（☀️など）
-    temp_max = db.Column(db.Float)                                                 # 最高気温
-    temp_min = db.Column(db.Float)                                                 # 最低気温
-    precipitation = db.Column(db.Float)                                            # 降水量
     created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)      # 作成日時
     updated_at = db.Column(
         db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False
@@ -58,11 +64,24 @@ class Spot(db.Model):
     # SPOT から Photo への参照（spot.photos で取得できる）
     photos = db.relationship("Photo", backref="spot", cascade="all, delete", lazy=True)
 
+    # 訪問日の天気（weather_daily を 都道府県 + 訪問日 で参照。Spot 側には持たない）
+    weather_daily = db.relationship(
+        "WeatherDaily",
+        primaryjoin="and_(foreign(Spot.prefecture) == WeatherDaily.prefecture, "
+                    "foreign(Spot.visit_date) == WeatherDaily.date)",
+        viewonly=True,
+        uselist=False,
+    )
+
 # ============================
 # グルメテーブル（FOOD）
 # ============================
 class Food(db.Model):
     __tablename__ = "FOOD"
+    __table_args__ = (
+        # 店舗ごとの集約・店舗ページ（user_id + shop_name）
+        db.Index("ix_FOOD_user_shop", "user_id", "shop_name"),
+    )
 
     food_id = db.Column(db.Integer, primary_key=True, autoincrement=True)          # グルメID
     user_id = db.Column(db.Integer, db.ForeignKey("USER.id"), nullable=False)      # 登録ユーザー
@@ -85,6 +104,9 @@ class Food(db.Model):
 # ============================
 class Stay(db.Model):
     __tablename__ = "STAY"
+    __table_args__ = (
+        db.Index("ix_STAY_user_id", "user_id"),
+    )
 
     stay_id = db.Column(db.Integer, primary_key=True, autoincrement=True)          # 宿泊ID
     user_id = db.Column(db.Integer, db.ForeignKey("USER.id"), nullable=False)      # 登録ユーザー
@@ -103,6 +125,10 @@ class Stay(db.Model):
 # ============================
 class Bookmark(db.Model):
     __tablename__ = "BOOKMARK"
+    __table_args__ = (
+        # 同じ対象の二重登録防止 + 追加/削除/状態確認の検索用
+        db.Index("ux_BOOKMARK_user_target", "user_id", "target_type", "target_id", unique=True),
+    )
 
     bookmark_id = db.Column(db.Integer, primary_key=True, autoincrement=True)      # ブックマークID
     user_id = db.Column(db.Integer, db.ForeignKey("USER.id"), nullable=False)      # ユーザーID
@@ -118,20 +144,54 @@ class Bookmark(db.Model):
 # ============================
 class Photo(db.Model):
     __tablename__ = "PHOTO"
+    __table_args__ = (
+        # spot.photos / food.photos の遅延ロード用
+        db.Index("ix_PHOTO_spot_id", "spot_id"),
+        db.Index("ix_PHOTO_food_id", "food_id"),
+        db.Index("ix_PHOTO_stay_id", "stay_id"),
+    )
 
     photo_id = db.Column(db.Integer, primary_key=True, autoincrement=True)         # 写真ID
     user_id = db.Column(db.Integer, db.ForeignKey("USER.id"), nullable=False)      # 所有ユーザー
     spot_id = db.Column(db.Integer, db.ForeignKey("SPOT.spot_id"))                 # 観光地紐付け
     food_id = db.Column(db.Integer, db.ForeignKey("FOOD.food_id"))                 # グルメ紐付け
     stay_id = db.Column(db.Integer, db.ForeignKey("STAY.stay_id"))                 # 宿泊紐付け
-    filename = db.Column(db.String(255), nullable=False)                           # static/uploads 内のファイル名
+    filename = db.Column(db.String(255), nullable=False)                           # static/uploads 内のファイル名（PHOTO_BLOB.filename）
+    thumb_filename = db.Column(db.String(255))                                     # 一覧用の縮小版（utils/image_pipeline.py）
+    display_filename = db.Column(db.String(255))                                   # 表示用の縮小版
     uploaded_at = db.Column(db.DateTime, default=datetime.now, nullable=False)     # アップロード日時
 
+    @property
+    def thumb(self):
+        """一覧に出すファイル名（縮小版がまだ無ければ元画像）"""
+        return self.thumb_filename or self.filename
+
+    @property
+    def display(self):
+        return self.display_filename or self.filename
+
+# ============================
+# 写真の実体（PHOTO_BLOB）
+#   アップロードは中身の SHA-256 で 1 ファイルだけ保存し、同じ中身の Photo はそれを共有する（utils/photo_store.py）
+#   ref_count が 0 になったらファイルごと消す
+# ============================
+class PhotoBlob(db.Model):
+    __tablename__ = "PHOTO_BLOB"
+
+    sha256 = db.Column(db.String(64), primary_key=True)                            # 中身のハッシュ（16 進）
+    filename = db.Column(db.String(255), nullable=False)                           # static/uploads 内（ab/ab…cd.jpg）
+    size = db.Column(db.Integer, nullable=False)                                   # バイト数
+    ref_count = db.Column(db.Integer, nullable=False, default=0)                   # これを指す Photo の数
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
 # ============================
 # 都道府県別訪問回数（TRAVEL_RECORD）
 # ============================
 class TravelRecord(db.Model):
     __tablename__ = "TRAVEL_RECORD"
+    __table_args__ = (
+        db.Index("ux_TRAVEL_RECORD_user_pref", "user_id", "prefecture", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)               # 主キー
     user_id = db.Column(db.Integer, db.ForeignKey("USER.id"), nullable=False)      # ユーザー
@@ -143,13 +203,53 @@ class TravelRecord(db.Model):
 #==============================
 class Event(db.Model):
     __tablename__ = "events"
+    __table_args__ = (
+        # 開催時期での絞り込み（月 / 日付の範囲）
+        db.Index("ix_events_month_range", "month_start", "month_end"),
+        # 年をまたぐ開催（12月〜2月 など）だけの部分インデックス
+        db.Index("ix_events_month_wrap", "month_end", sqlite_where=db.text("month_start > month_end")),
+    )
     event_code = db.Column(db.String(20), primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     category = db.Column(db.String(50))
     description = db.Column(db.Text)
-    month = db.Column(db.String(20))       
+    month = db.Column(db.String(20))                # 開催時期（元の表記："2月上旬" など）
+    month_start = db.Column(db.Integer)             # 開始月（1〜12）
+    period_start = db.Column(db.Integer)            # 開始旬（1=上旬 2=中旬 3=下旬、None=月全体）
+    month_end = db.Column(db.Integer)               # 終了月（開始月より小さければ年をまたぐ）
+    period_end = db.Column(db.Integer)              # 終了旬
+    dekad_mask = db.Column(db.BigInteger)           # 開催する旬のビット（1月上旬=bit0 〜 12月下旬=bit35。"3月・9月" の間の月は立たない）
     city = db.Column(db.String(100))
     url = db.Column(db.String(500))
     image_url = db.Column(db.String(500))
+    image_srcset = db.Column(db.Text)               # 縮小版（Spots と同じ）
+    image_width = db.Column(db.Integer)
+    image_height = db.Column(db.Integer)
+    image_placeholder = db.Column(db.Text)
     pref_code = db.Column(db.String(10))
-    pref_name = db.Column(db.String(50))
\ No newline at end of file
+    pref_name = db.Column(db.String(50))
+
+#==============================
+# カタログ更新番号（catalog_meta）
+#   spots / events が書き換わるたびに +1（検索エンジンの作り直し判定用）
+#==============================
+class CatalogMeta(db.Model):
+    __tablename__ = "catalog_meta"
+    name = db.Column(db.String(20), primary_key=True)          # "spots" / "events"
+    version = db.Column(db.Integer, nullable=False, default=0)  # 更新番号
+
+#==============================
+# 過去の天気（weather_daily）
+#   open-meteo archive API の日ごとの値。都道府県 + 日付で一度取れば変わらないので共有キャッシュにする
+#==============================
+class WeatherDaily(db.Model):
+    __tablename__ = "weather_daily"
+    prefecture = db.Column(db.String(20), primary_key=True)         # 都道府県（短縮名：Spot.prefecture と同じ）
+    date = db.Column(db.Date, primary_key=True)                     # 日付
+    status = db.Column(db.String(10), nullable=False, default="ok", server_default="ok")  # ok / pending（取得待ち）/ failed
+    weather_code = db.Column(db.Integer)                            # WMO 天気コード
+    weather = db.Column(db.String(50))                              # 天気アイコン（☀️など）
+    temp_max = db.Column(db.Float)                                  # 最高気温
+    temp_min = db.Column(db.Float)                                  # 最低気温
+    precipitation = db.Column(db.Float)                             # 降水量
+    fetched_at = db.Column(db.DateTime, default=datetime.now, nullable=False)  # 取得日時
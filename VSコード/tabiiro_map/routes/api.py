@@ -1,15 +1,55 @@
 # routes/api.py
 
-from flask import Blueprint, jsonify, session
-from models import Spot
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Blueprint, abort, current_app, jsonify, request, session
+from utils.data_version import get_data_version
+from utils.connpass import connpass_search
+from utils.hotel_cache import hotel_cache
+from utils.http_client import http
+from utils.pref_counts import get_pref_counts
 
 # /api を prefix に設定
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
+# (user_id, data_version) → シリアライズ済み JSON
+_pref_counts_cache = OrderedDict()
+_pref_counts_lock = threading.Lock()
+
+
+def _pref_counts_body(user_id, version):
+    key = (user_id, version)
+    with _pref_counts_lock:
+        body = _pref_counts_cache.get(key)
+        if body is not None:
+            _pref_counts_cache.move_to_end(key)
+            return body
+
+    body = json.dumps(get_pref_counts(user_id), ensure_ascii=False)
+
+    with _pref_counts_lock:
+        _pref_counts_cache[key] = body
+        _pref_counts_cache.move_to_end(key)
+        while len(_pref_counts_cache) > current_app.config.get("PREF_COUNTS_CACHE_SIZE", 1024):
+            _pref_counts_cache.popitem(last=False)
+    return body
+
+
+def _stats_response(stats):
+    """運用向けの統計を JSON で返す（EXPOSE_UPSTREAM_STATS が True のときだけ。それ以外は 404）"""
+    if not current_app.config.get("EXPOSE_UPSTREAM_STATS", False):
+        abort(404)
+    resp = jsonify(stats())
+    resp.cache_control.no_store = True
+    return resp
+
 
 # ====================================================
 # 都道府県別の訪問回数取得
 #   GET /api/pref-counts
+#   ETag = ユーザーの data_version。変化がなければ 304 を返す
 # ====================================================
 @api_bp.route('/pref-counts', methods=['GET'])
 def api_pref_counts():
@@ -17,11 +57,49 @@ def api_pref_counts():
     if not user_id:
         return jsonify({})
 
-    spots = Spot.query.filter_by(user_id=user_id).all()
+    version = get_data_version(user_id)
+    etag = f"u{user_id}-v{version}"
+
+    if etag in request.if_none_match:
+        resp = current_app.response_class(status=304)
+    else:
+        resp = current_app.response_class(
+            _pref_counts_body(user_id, version), mimetype="application/json"
+        )
+
+    resp.set_etag(etag)
+    # ブラウザには保存させるが、毎回 If-None-Match で確認させる
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
 
-    pref_counts = {}
-    for spot in spots:
-        pref = spot.prefecture.strip()
-        pref_counts[pref] = pref_counts.get(pref, 0) + 1
 
-    return jsonify(pref_counts)
+# ====================================================
+# 外部 API の呼び出し統計（このプロセスの分）
+#   GET /api/upstreams
+#   ホストごとのレイテンシのヒストグラム・エラー件数・サーキットブレーカーの状態
+#   EXPOSE_UPSTREAM_STATS = True のときだけ（ログイン無しで見えるので既定では 404）
+# ====================================================
+@api_bp.route('/upstreams', methods=['GET'])
+def api_upstreams():
+    return _stats_response(http.stats)
+
+
+# ====================================================
+# ホテル検索キャッシュのヒット・ミス件数（このプロセスの分）
+#   GET /api/hotel-cache
+#   EXPOSE_UPSTREAM_STATS = True のときだけ（/api/upstreams と同じ）
+# ====================================================
+@api_bp.route('/hotel-cache', methods=['GET'])
+def api_hotel_cache():
+    return _stats_response(hotel_cache.stats)
+
+
+# ====================================================
+# connpass 検索キャッシュのヒット・ミス件数（このプロセスの分）
+#   GET /api/connpass-cache
+#   EXPOSE_UPSTREAM_STATS = True のときだけ（/api/upstreams と同じ）
+# ====================================================
+@api_bp.route('/connpass-cache', methods=['GET'])
+def api_connpass_cache():
+    return _stats_response(connpass_search.stats)
@@ -0,0 +1,14 @@
+# routes/assets.py
+#
+# ハッシュ入りの名前の静的ファイル（flask build-assets で static/dist へ作ったもの。utils/assets.py）
+
+from flask import Blueprint
+
+from utils.assets import send_asset
+
+assets_bp = Blueprint("assets", __name__, url_prefix="/assets")
+
+
+@assets_bp.route("/<path:filename>")
+def asset(filename):
+    return send_asset(filename)
@@ -1,7 +1,9 @@
 # routes/bookmark.py
 
 from flask import Blueprint, render_template, request, url_for, redirect, flash, jsonify, session
+from sqlalchemy.exc import IntegrityError
 from models import db, Bookmark
+from utils.bookmark_status import MAX_ITEMS, bookmarked_keys
 
 # 🔥 すべての URL が /bookmark/... に統一される
 bookmark_bp = Blueprint("bookmark", __name__, url_prefix="/bookmark")
@@ -65,7 +67,12 @@ def add_bookmark():
     )
 
     db.session.add(new_bm)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # 同時リクエストで先に登録された（ux_BOOKMARK_user_target）
+        db.session.rollback()
+        return jsonify({"ok": True, "msg": "ALREADY_EXISTS"})
 
     return jsonify({"ok": True})
 
@@ -95,6 +102,35 @@ def remove_bookmark():
     return jsonify({"ok": True})
 
 
+# -----------------------------
+# ブックマーク状態の一括確認（検索画面用）
+#   POST /bookmark/status  {"items": [{"type": "hotel", "id": "123"}, ...]}
+#   → {"ok": true, "bookmarked": [{"type": "hotel", "id": "123"}, ...]}
+# -----------------------------
+@bookmark_bp.route('/status', methods=['POST'])
+def bookmark_status():
+    if not session.get('logged_in'):
+        return jsonify({"ok": False, "msg": "LOGIN_REQUIRED"})
+
+    payload = request.get_json(silent=True) or {}
+    items = payload.get("items")
+    if not isinstance(items, list):
+        return jsonify({"ok": False, "msg": "BAD_REQUEST"}), 400
+    if len(items) > MAX_ITEMS:
+        return jsonify({"ok": False, "msg": "TOO_MANY_ITEMS"}), 400
+
+    pairs = [
+        (item.get("type"), item.get("id"))
+        for item in items
+        if isinstance(item, dict)
+    ]
+    found = bookmarked_keys(session.get('user_id'), pairs)
+    return jsonify({
+        "ok": True,
+        "bookmarked": [{"type": t, "id": i} for t, i in sorted(found)],
+    })
+
+
 # -----------------------------
 # ブックマーク削除（一覧ページ用）
 # -----------------------------
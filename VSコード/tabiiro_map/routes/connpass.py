@@ -0,0 +1,57 @@
+# routes/connpass.py
+
+from flask import Blueprint, render_template, request, session
+from utils.bookmark_status import bookmarked_keys
+from utils.connpass import (
+    catalog_events, connpass_search, merge_results, parse_days, parse_keywords,
+)
+
+# connpass（IT 勉強会など）+ 観光カタログのイベントをまとめて探す
+connpass_bp = Blueprint("connpass", __name__, url_prefix="/connpass")
+
+
+# ====================================================
+# 検索フォーム
+# GET /connpass/search
+# ====================================================
+@connpass_bp.route("/search")
+def connpass_search_form():
+    return render_template("connpass_search.html")
+
+
+# ====================================================
+# 検索結果
+# GET /connpass/results?keyword=Python,機械学習&ymd=20250301,20250308
+#   キーワード・日付はカンマ区切りで複数（組ごとの connpass 検索は同時に走る）
+# ====================================================
+@connpass_bp.route("/results")
+def connpass_results():
+    keyword = request.args.get("keyword", "")
+    ymd = request.args.get("ymd", "")
+
+    keywords = parse_keywords(keyword)
+    days, invalid_days = parse_days(ymd)
+
+    # キーワードも日付も無ければ絞り込みなしの connpass 検索になるのでフォームに戻す
+    if not keywords and not days:
+        return render_template("connpass_search.html", invalid_days=invalid_days)
+
+    events, failed = connpass_search.search(keywords, days)
+    local = catalog_events(keywords, days)
+    results = merge_results(keywords, events, local)
+
+    # 表示する分だけブックマーク済みか確認（カタログのものは種別 "event"）
+    bookmarked = bookmarked_keys(
+        session.get("user_id"),
+        [("event" if r["source"] == "catalog" else "connpass", r["id"]) for r in results],
+    )
+
+    return render_template(
+        "connpass_results.html",
+        results=results,
+        keyword=keyword,
+        ymd=ymd,
+        invalid_days=invalid_days,
+        connpass_failed=failed,
+        bookmarked=bookmarked,
+    )
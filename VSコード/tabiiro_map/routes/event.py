@@ -1,11 +1,20 @@
 # routes/event.py
-from flask import Blueprint, render_template, request
+from flask import Blueprint, render_template, request, current_app, session
 from models import Event
-from utils.json_loader import get_prefecture_list
+from utils.prefectures import prefectures
+from utils.catalog_search import keyword_filter
+from utils.catalog_engine import catalog_engine
+from utils.bookmark_status import bookmarked_keys
+from utils.event_timing import PERIODS, dekad, month_overlaps, event_dekads, events_in_window
 
 event_bp = Blueprint("event", __name__, url_prefix="/event")
 
 
+def _bookmarked(results):
+    # 表示するイベントだけブックマーク済みか確認
+    return bookmarked_keys(session.get("user_id"), [("event", ev.event_code) for ev in results])
+
+
 @event_bp.route("/search/results")
 def event_search_results():
     prefecture = request.args.get("prefecture", "")
@@ -13,30 +22,73 @@ def event_search_results():
     period = request.args.get("period", "")
     keyword = request.args.get("keyword", "").strip()
 
-    query = Event.query
+    if current_app.config.get("CATALOG_SEARCH_ENGINE", True):
+        # プロセス内の検索エンジン（DB に行かない）
+        filters = {"pref": prefecture}
+        if month.isdigit() and period in PERIODS:
+            # 月と旬の両方 → その旬にかかるイベント（「7月」「下旬」を別々に満たすだけのものは除く）
+            filters["dekad"] = dekad(int(month), PERIODS[period])
+        else:
+            filters["month"] = int(month) if month.isdigit() else None
+            filters["period"] = period
+        found = catalog_engine.search("events", keyword, **filters)
+        results = found.docs
+        pref_counts = found.facets["pref"]
+    else:
+        query = Event.query
 
-    if prefecture:
-        query = query.filter(Event.pref_name == prefecture)
+        if prefecture:
+            query = query.filter(Event.pref_name == prefecture)
 
-    if month:
-        query = query.filter(Event.month.contains(f"{month}月"))
+        if month.isdigit():
+            # 構造化した開催時期（month_start / month_end の索引）で絞る
+            query = query.filter(month_overlaps([int(month)]))
 
-    if period:
-        query = query.filter(Event.month.contains(period))
+        # キーワードは全文検索（FTS5 trigram、関連度順）。使えないときは LIKE
+        query = keyword_filter(query, Event, keyword)
 
-    if keyword:
-        query = query.filter(
-            Event.title.contains(keyword) |
-            Event.description.contains(keyword)
-        )
+        results = query.all()
+
+        if period in PERIODS:
+            # 旬は開催期間を旬単位に展開して判定
+            if month.isdigit():
+                wanted = {dekad(int(month), PERIODS[period])}
+            else:
+                wanted = {dekad(m, PERIODS[period]) for m in range(1, 13)}
+            results = [
+                ev for ev in results
+                if event_dekads(ev) & wanted
+            ]
+        pref_counts = None
 
-    results = query.all()
     print("EVENT SEARCH RESULT COUNT:", len(results))
 
     return render_template(
         "event_search_results.html",
         results=results,
-        prefectures=get_prefecture_list(),
+        bookmarked=_bookmarked(results),
+        prefectures=prefectures().names,
+        pref_counts=pref_counts,
+        months=list(range(1, 13)),
+        periods=["上旬", "中旬", "下旬"]
+    )
+
+
+@event_bp.route("/upcoming")
+def event_upcoming():
+    # 今日から days 日以内に開催時期がかかるイベント（開催中 → 近い順）
+    days = request.args.get("days", 30, type=int)
+    days = max(1, min(days, 365))
+    prefecture = request.args.get("prefecture", "")
+
+    results = events_in_window(days=days, prefecture=prefecture or None)
+
+    return render_template(
+        "event_search_results.html",
+        results=results,
+        bookmarked=_bookmarked(results),
+        prefectures=prefectures().names,
+        pref_counts=None,
         months=list(range(1, 13)),
         periods=["上旬", "中旬", "下旬"]
     )
@@ -46,7 +98,7 @@ def event_search_results():
 def event_search():
     return render_template(
         "event_search.html",
-        prefectures=get_prefecture_list(),
+        prefectures=prefectures().names,
         months=list(range(1, 13)),
         periods=["上旬", "中旬", "下旬"]
     )
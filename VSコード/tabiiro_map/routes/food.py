@@ -1,18 +1,68 @@
 # routes/food.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
 from models import db, Food, Photo
+from utils.uploads import save_photos
 from datetime import datetime
-import os
-import uuid
 
 # 🔥 すべてのURLを /food/... に統一
 food_bp = Blueprint("food", __name__, url_prefix="/food")
 
 
+# ====================================================
+# 店舗ごとの集約クエリ
+#   店舗名・訪問回数・平均評価・最新写真を 1 本の SQL で取得
+# ====================================================
+def _latest_shop_photo(user_id, shop_name, variant=Photo.thumb_filename):
+    """その店舗の全記録の写真のうち、最新 1 枚のファイル名（相関サブクエリ）
+
+    variant の縮小版（既定は一覧用の thumb）を優先し、まだ無ければ元画像。
+    """
+    f = aliased(Food)
+    return (
+        select(func.coalesce(variant, Photo.filename))
+        .join(f, Photo.food_id == f.food_id)
+        .where(f.user_id == user_id, f.shop_name == shop_name)
+        .order_by(Photo.photo_id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def shop_summary_page(user_id, after=None, limit=None):
+    """店舗名順のキーセットページング（after より後の店舗を limit 件）"""
+    stmt = (
+        select(
+            Food.shop_name,
+            func.count(Food.food_id),
+            func.avg(Food.evaluation),
+            _latest_shop_photo(user_id, Food.shop_name),
+        )
+        .where(Food.user_id == user_id)
+        .group_by(Food.shop_name)
+        .order_by(Food.shop_name)
+    )
+    if after:
+        stmt = stmt.where(Food.shop_name > after)
+    if limit:
+        stmt = stmt.limit(limit)
+
+    return [
+        {
+            "shop_name": shop,
+            "avg": round(avg or 0, 1),
+            "count": count,
+            "thumbnail": thumbnail,
+        }
+        for shop, count, avg, thumbnail in db.session.execute(stmt)
+    ]
+
+
 # ====================================================
 # グルメ一覧（店舗ごとに集約）
-# GET /food/gourmet/list
+# GET /food/gourmet/list?after=<店舗名>
 # ====================================================
 @food_bp.route('/gourmet/list')
 def gourmet_list():
@@ -20,37 +70,22 @@ def gourmet_list():
         return redirect(url_for('auth.login'))
 
     user_id = session.get('user_id')
-    foods = Food.query.filter_by(user_id=user_id).all()
-
-    # 店舗名 → 記録一覧
-    grouped = {}
-    for f in foods:
-        grouped.setdefault(f.shop_name, []).append(f)
-
-    shop_summary = []
-    for shop, items in grouped.items():
-        avg = sum(i.evaluation for i in items) / len(items)
-
-        # 🔥 その店舗の "全写真" の中から最新1枚をサムネイルにする
-        all_photos = []
-        for f in items:
-            for ph in f.photos:
-                all_photos.append((ph.photo_id, ph.filename))
+    after = request.args.get('after', '')
+    per_page = current_app.config.get("GOURMET_PAGE_SIZE", 30)
 
-        thumbnail = None
-        if all_photos:
-            latest = sorted(all_photos, key=lambda x: x[0], reverse=True)[0]
-            thumbnail = latest[1]
+    # 1 件多く取って次ページの有無を判定
+    shop_summary = shop_summary_page(user_id, after=after, limit=per_page + 1)
+    next_after = None
+    if len(shop_summary) > per_page:
+        shop_summary = shop_summary[:per_page]
+        next_after = shop_summary[-1]["shop_name"]
 
-        shop_summary.append({
-            "shop_name": shop,
-            "items": items,
-            "avg": round(avg, 1),
-            "count": len(items),
-            "thumbnail": thumbnail
-        })
-
-    return render_template('gourmet_list.html', shop_summary=shop_summary)
+    return render_template(
+        'gourmet_list.html',
+        shop_summary=shop_summary,
+        next_after=next_after,
+        after=after
+    )
 
 
 # ====================================================
@@ -71,16 +106,8 @@ def shop_detail(shop_name):
 
     avg = round(sum(i.evaluation for i in items) / len(items), 1)
 
-    # 🔥 最新写真をサムネイルにする
-    all_photos = []
-    for f in items:
-        for ph in f.photos:
-            all_photos.append((ph.photo_id, ph.filename))
-
-    thumbnail = None
-    if all_photos:
-        latest = sorted(all_photos, key=lambda x: x[0], reverse=True)[0]
-        thumbnail = latest[1]
+    # 🔥 最新写真をサムネイルにする（写真は遅延ロードせず 1 クエリで取得）
+    thumbnail = db.session.scalar(select(_latest_shop_photo(user_id, shop_name, Photo.display_filename)))
 
     return render_template(
         'shop_detail.html',
@@ -132,27 +159,12 @@ def add_gourmet():
     db.session.add(new_food)
     db.session.flush()  # 新規 ID の取得
 
-    upload_dir = os.path.join("static", "uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-
-    # 🔥 写真衝突防止 → UUID 方式
-    photos = request.files.getlist("photos[]")
-    for p in photos:
-        if not p.filename:
-            continue
-
-        filename = f"{user_id}_{uuid.uuid4().hex}_{p.filename}"
-        p.save(os.path.join(upload_dir, filename))
-
-        new_photo = Photo(
-            user_id=user_id,
-            food_id=new_food.food_id,
-            filename=filename
-        )
-        db.session.add(new_photo)
+    rejected = save_photos(request.files.getlist("photos[]"), user_id=user_id, food_id=new_food.food_id)
 
     db.session.commit()
 
+    for reason in rejected:
+        flash(f"保存しなかった写真があります：{reason}", "error")
     flash("グルメ記録を登録しました！", "success")
     return redirect(url_for('food.gourmet_list'))
 
@@ -177,27 +189,12 @@ def gourmet_edit(food_id):
         visit_date_str = request.form.get('visit_date')
         food.visit_date = datetime.strptime(visit_date_str, "%Y-%m-%d").date()
 
-        upload_dir = os.path.join("static", "uploads")
-        os.makedirs(upload_dir, exist_ok=True)
-
-        # 🔥 UUID 方式に統一
-        photos = request.files.getlist("photos[]")
-        for p in photos:
-            if not p.filename:
-                continue
-
-            filename = f"{food.user_id}_{uuid.uuid4().hex}_{p.filename}"
-            p.save(os.path.join(upload_dir, filename))
-
-            new_photo = Photo(
-                user_id=food.user_id,
-                food_id=food.food_id,
-                filename=filename
-            )
-            db.session.add(new_photo)
+        rejected = save_photos(request.files.getlist("photos[]"), user_id=food.user_id, food_id=food.food_id)
 
         db.session.commit()
 
+        for reason in rejected:
+            flash(f"保存しなかった写真があります：{reason}", "error")
         flash("グルメ記録を更新しました！", "success")
         return redirect(url_for('food.gourmet_detail', food_id=food.food_id))
 
@@ -265,10 +262,7 @@ def delete_food_photo(photo_id):
         flash("削除権限がありません。", "error")
         return redirect(url_for('food.gourmet_list'))
 
-    filepath = os.path.join("static", "uploads", photo.filename)
-    if os.path.exists(filepath):
-        os.remove(filepath)
-
+    # ファイルは utils.photo_store が消す（同じ中身の写真が他に無ければ）
     food_id = photo.food_id
 
     db.session.delete(photo)
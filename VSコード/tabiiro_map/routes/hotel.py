@@ -1,8 +1,10 @@
 # routes/hotel.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from utils.hotel_utils import search_hotels, extract_hotel_info
-from models import db, Bookmark
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, session
+from utils.hotel_cache import hotel_cache
+from utils.hotel_utils import MAX_PAGE
+from utils.bookmark_status import bookmarked_keys
+from utils.http_client import UpstreamError
 
 # 🔥 /hotel を prefix に統一
 hotel_bp = Blueprint("hotel", __name__, url_prefix="/hotel")
@@ -29,25 +31,41 @@ def hotel_search():
 
 # ====================================================
 # ホテル検索結果  
-# GET /hotel/results/<keyword>
+# GET /hotel/results/<keyword>?page=N
+#   次のページは裏で先読みしておく（「次へ」を押したときはキャッシュから返る）
 # ====================================================
 @hotel_bp.route("/results/<keyword>")
 def hotel_results(keyword):
     user_id = session.get("user_id")
+    page = min(max(request.args.get("page", 1, type=int), 1), MAX_PAGE)
+    hits = current_app.config.get("HOTEL_PAGE_SIZE", 20)
 
-    # API から情報取得
-    raw_hotels = search_hotels(keyword)
-    hotels = extract_hotel_info(raw_hotels)
+    # API から情報取得（同じ検索はキャッシュ / 取得中の結果を共有）
+    try:
+        result = hotel_cache.search(keyword, page=page, hits=hits)
+    except (UpstreamError, ValueError) as e:
+        print("ホテル検索失敗:", e)
+        return render_template(
+            "hotel_results.html", hotels=[], keyword=keyword, page=page,
+            error="宿泊検索サービスに接続できません。しばらくしてから再度お試しください",
+        )
+    if result.has_next:
+        hotel_cache.prefetch(keyword, page=page + 1, hits=hits)
 
-    # ユーザーが既にブックマークしているホテルID一覧
-    bookmarked_ids = {
-        str(bm.target_id)
-        for bm in Bookmark.query.filter_by(user_id=user_id, target_type="hotel").all()
-    }
+    # キャッシュの dict は他のリクエストと共有なのでコピーしてからフラグを付ける
+    hotels = [dict(h) for h in result.hotels]
 
-    # 各ホテルに「ブックマーク済み」フラグを付与
+    # 表示するホテルだけブックマーク済みか確認して、フラグを付与
+    bookmarked = bookmarked_keys(user_id, [("hotel", h.get("hotelNo")) for h in hotels])
     for h in hotels:
-        hotel_id = str(h.get("hotelNo"))
-        h["is_bookmarked"] = hotel_id in bookmarked_ids
+        h["is_bookmarked"] = ("hotel", str(h.get("hotelNo"))) in bookmarked
 
-    return render_template("hotel_results.html", hotels=hotels, keyword=keyword)
+    return render_template(
+        "hotel_results.html",
+        hotels=hotels,
+        keyword=keyword,
+        page=page,
+        page_count=result.page_count,
+        record_count=result.record_count,
+        has_next=result.has_next,
+    )
@@ -1,14 +1,18 @@
 # routes/spot.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
 from datetime import datetime
-import os
-import requests
-from config import PREF_LATLON, PREF_LIST
-from utils.weather_utils import convert_weather_icon
+import base64
+import json
+from utils.prefectures import prefectures
+from utils.weather_daily import request_weather
 from sqlalchemy.exc import InvalidRequestError, OperationalError
 from models import db, Spot, Photo, TravelRecord, Spots
-from sqlalchemy import or_
+from sqlalchemy import func, select, tuple_
+from utils.catalog_search import keyword_filter
+from utils.catalog_engine import catalog_engine
+from utils.bookmark_status import bookmarked_keys
+from utils.uploads import save_photos
 
 # =============================================
 # /spot をルートに統一
@@ -42,32 +46,13 @@ def spot_register():
             flash("都道府県を選択してください。", "error")
             return redirect(url_for('spot.spot_register'))
 
-        # 北海道以外は短縮
-        pref_short = pref_full if pref_full == "北海道" else pref_full.replace("都","").replace("府","").replace("県","")
+        # Spot は短縮名で保存（北海道はそのまま）
+        pref_short = prefectures().short_name(pref_full)
 
         visit_date = datetime.strptime(visit_date_str, "%Y-%m-%d").date()
 
-        # ===== 天気API =====
-        lat, lon = PREF_LATLON.get(pref_short, (None, None))
-        weather = temp_max = temp_min = precipitation = None
-
-        if lat and lon:
-            url = (
-                "https://archive-api.open-meteo.com/v1/archive"
-                f"?latitude={lat}&longitude={lon}"
-                f"&start_date={visit_date}&end_date={visit_date}"
-                "&daily=weathercode,temperature_2m_max,temperature_2m_min,precipitation_sum"
-                "&timezone=Asia/Tokyo"
-            )
-            try:
-                res = requests.get(url).json()
-                code = res["daily"]["weathercode"][0]
-                weather = convert_weather_icon(code)
-                temp_max = res["daily"]["temperature_2m_max"][0]
-                temp_min = res["daily"]["temperature_2m_min"][0]
-                precipitation = res["daily"]["precipitation_sum"][0]
-            except Exception as e:
-                print("天気取得失敗:", e)
+        # ===== 天気（weather_daily に無ければ取得待ちにして、commit 後にバックグラウンドで取得）=====
+        request_weather(pref_short, visit_date)
 
         # ===== Spot 本体 =====
         new_spot = Spot(
@@ -76,45 +61,91 @@ def spot_register():
             prefecture=pref_short,
             visit_date=visit_date,
             comment=comment,
-            weather=weather,
-            temp_max=temp_max,
-            temp_min=temp_min,
-            precipitation=precipitation,
         )
 
         db.session.add(new_spot)
         db.session.flush()  # spot_id のため必須
 
-        # ===== 写真複数保存 =====
-        photos = request.files.getlist("photos[]")
-        upload_dir = os.path.join("static", "uploads")
-        os.makedirs(upload_dir, exist_ok=True)
+        # ===== 写真複数保存（utils.uploads：形式・枚数を確かめて保存。縮小版は commit 後に裏で）=====
+        rejected = save_photos(request.files.getlist("photos[]"), user_id=user_id, spot_id=new_spot.spot_id)
 
-        for p in photos:
-            if not p or not p.filename:
-                continue
+        db.session.commit()
 
-            filename = f"{user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{p.filename}"
-            p.save(os.path.join(upload_dir, filename))
+        for reason in rejected:
+            flash(f"保存しなかった写真があります：{reason}", "error")
+        flash("観光地を登録しました！（天気データは取得でき次第表示されます）", "success")
+        return redirect(url_for('spot.spot_list'))
 
-            new_photo = Photo(
-                user_id=user_id,
-                spot_id=new_spot.spot_id,
-                filename=filename
-            )
-            db.session.add(new_photo)
+    return render_template("spot_register.html", prefectures=prefectures().names)
 
-        db.session.commit()
 
-        flash("観光地を登録しました！（天気データ・写真も保存）", "success")
-        return redirect(url_for('spot.spot_list'))
+# ====================================================
+# 観光地一覧のページング
+#   (prefecture, name, spot_id) のキーセット + 最新写真の一括取得
+# ====================================================
+def encode_cursor(spot):
+    raw = json.dumps([spot.prefecture, spot.name, spot.spot_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        pref, name, spot_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return pref, name, int(spot_id)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def latest_photos(spot_ids):
+    """spot_id → 最新写真の一覧用ファイル名（縮小版が無ければ元画像。1 クエリでまとめて取得）"""
+    if not spot_ids:
+        return {}
+
+    newest = (
+        select(func.max(Photo.photo_id))
+        .where(Photo.spot_id.in_(spot_ids))
+        .group_by(Photo.spot_id)
+    )
+    rows = db.session.execute(
+        select(Photo.spot_id, func.coalesce(Photo.thumb_filename, Photo.filename))
+        .where(Photo.photo_id.in_(newest))
+    )
+    return dict(rows.all())
+
+
+def spot_page(user_id, pref_short=None, after=None, limit=30):
+    """1 ページ分の Spot と、その写真・次ページのカーソル"""
+    query = Spot.query.filter_by(user_id=user_id)
+    if pref_short:
+        query = query.filter_by(prefecture=pref_short)
+
+    key = decode_cursor(after) if after else None
+    if key:
+        query = query.filter(tuple_(Spot.prefecture, Spot.name, Spot.spot_id) > key)
+
+    spots = query.order_by(
+        Spot.prefecture.asc(), Spot.name.asc(), Spot.spot_id.asc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(spots) > limit:
+        spots = spots[:limit]
+        next_cursor = encode_cursor(spots[-1])
+
+    return spots, latest_photos([s.spot_id for s in spots]), next_cursor
 
-    return render_template("spot_register.html", prefectures=PREF_LIST)
+
+def _requested_page(user_id, selected_pref, after):
+    pref_short = None
+    if selected_pref:
+        pref_short = prefectures().short_name(selected_pref)
+
+    return spot_page(user_id, pref_short, after, current_app.config.get("SPOT_PAGE_SIZE", 30))
 
 
 # ====================================================
 # 観光地一覧
-#   GET /spot/list
+#   GET /spot/list?prefecture=〇〇&after=<カーソル>
 # ====================================================
 @spot_bp.route('/list', methods=['GET'])
 def spot_list():
@@ -123,25 +154,50 @@ def spot_list():
 
     user_id = session.get('user_id')
     selected_pref = request.args.get('prefecture', '')
+    after = request.args.get('after', '')
 
-    if selected_pref:
-        pref_short = selected_pref if selected_pref == "北海道" else selected_pref.replace("都","").replace("府","").replace("県","")
-        spots = Spot.query.filter_by(
-            user_id=user_id, prefecture=pref_short
-        ).order_by(Spot.prefecture.asc(), Spot.name.asc()).all()
-    else:
-        spots = Spot.query.filter_by(user_id=user_id).order_by(
-            Spot.prefecture.asc(), Spot.name.asc()
-        ).all()
+    spots, photos, next_cursor = _requested_page(user_id, selected_pref, after)
 
     return render_template(
         'spot_list.html',
         spots=spots,
-        prefectures=PREF_LIST,
+        photos=photos,
+        next_cursor=next_cursor,
+        after=after,
+        prefectures=prefectures().names,
         selected_pref=selected_pref
     )
 
 
+# ====================================================
+# 観光地一覧の続き（もっと見る）
+#   GET /spot/list/more?prefecture=〇〇&after=<カーソル>
+# ====================================================
+@spot_bp.route('/list/more', methods=['GET'])
+def spot_list_more():
+    if not session.get('logged_in'):
+        return jsonify({"ok": False, "msg": "LOGIN_REQUIRED"}), 401
+
+    user_id = session.get('user_id')
+    selected_pref = request.args.get('prefecture', '')
+    after = request.args.get('after', '')
+
+    spots, photos, next_cursor = _requested_page(user_id, selected_pref, after)
+
+    items = []
+    for spot in spots:
+        photo = photos.get(spot.spot_id)
+        items.append({
+            "spot_id": spot.spot_id,
+            "name": spot.name,
+            "visit_date": spot.visit_date.isoformat(),
+            "detail_url": url_for('spot.spot_detail', spot_id=spot.spot_id),
+            "photo_url": url_for('static', filename='uploads/' + photo) if photo else None,
+        })
+
+    return jsonify({"ok": True, "items": items, "next": next_cursor})
+
+
 # ====================================================
 # 観光地詳細
 #   GET /spot/detail/<id>
@@ -175,7 +231,7 @@ def spot_edit(spot_id):
         spot.name = request.form.get('spot_name')
 
         pref_full = request.form.get('prefecture')
-        pref_short = pref_full if pref_full == "北海道" else pref_full.replace("都", "").replace("府", "").replace("県", "")
+        pref_short = prefectures().short_name(pref_full)
         spot.prefecture = pref_short
 
         visit_date_str = request.form.get('visit_date')
@@ -183,64 +239,22 @@ def spot_edit(spot_id):
 
         spot.comment = request.form.get('comment')
 
-        # ===== 天気更新判定：日付 or 都道府県が変わったときだけ =====
-        needs_weather_update = (old_prefecture != spot.prefecture) or (old_visit_date != spot.visit_date)
-
-        if needs_weather_update:
-            lat, lon = PREF_LATLON.get(spot.prefecture, (None, None))
-
-            if lat and lon:
-                url = (
-                    "https://archive-api.open-meteo.com/v1/archive"
-                    f"?latitude={lat}&longitude={lon}"
-                    f"&start_date={spot.visit_date}&end_date={spot.visit_date}"
-                    "&daily=weathercode,temperature_2m_max,temperature_2m_min,precipitation_sum"
-                    "&timezone=Asia/Tokyo"
-                )
-                try:
-                    res = requests.get(url, timeout=5).json()
-
-                    # daily が無い/空のときは上書きしない
-                    daily = res.get("daily")
-                    if daily and daily.get("weathercode"):
-                        code = daily["weathercode"][0]
-                        spot.weather = convert_weather_icon(code)
-                        spot.temp_max = daily["temperature_2m_max"][0]
-                        spot.temp_min = daily["temperature_2m_min"][0]
-                        spot.precipitation = daily["precipitation_sum"][0]
-                    else:
-                        print("天気データなし:", res)
-
-                except Exception as e:
-                    print("天気取得失敗:", e)
-            else:
-                print("lat/lon が見つからない prefecture:", spot.prefecture)
-
-        # ===== 写真追加（既存のまま）=====
-        photos = request.files.getlist("photos[]")
-        upload_dir = os.path.join("static", "uploads")
-        os.makedirs(upload_dir, exist_ok=True)
-
-        for p in photos:
-            if not p.filename:
-                continue
-
-            filename = f"{spot.user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{p.filename}"
-            p.save(os.path.join(upload_dir, filename))
-
-            new_photo = Photo(
-                user_id=spot.user_id,
-                spot_id=spot.spot_id,
-                filename=filename
-            )
-            db.session.add(new_photo)
+        # ===== 天気：日付 or 都道府県が変わったとき、または前回の取得に失敗していたとき =====
+        weather = spot.weather_daily
+        if (old_prefecture != spot.prefecture) or (old_visit_date != spot.visit_date) or weather is None or weather.status != "ok":
+            request_weather(spot.prefecture, spot.visit_date)
+
+        # ===== 写真追加（utils.uploads：形式・枚数を確かめて保存。縮小版は commit 後に裏で）=====
+        rejected = save_photos(request.files.getlist("photos[]"), user_id=spot.user_id, spot_id=spot.spot_id)
 
         db.session.commit()
 
+        for reason in rejected:
+            flash(f"保存しなかった写真があります：{reason}", "error")
         flash("観光地情報を更新しました。", "success")
         return redirect(url_for('spot.spot_detail', spot_id=spot.spot_id))
 
-    return render_template('spot_edit.html', spot=spot, prefectures=PREF_LIST)
+    return render_template('spot_edit.html', spot=spot, prefectures=prefectures().names)
 
 # ====================================================
 # 写真削除
@@ -253,10 +267,7 @@ def delete_spot_photo(photo_id):
 
     photo = Photo.query.get_or_404(photo_id)
 
-    filepath = os.path.join("static", "uploads", photo.filename)
-    if os.path.exists(filepath):
-        os.remove(filepath)
-
+    # ファイルは utils.photo_store が消す（同じ中身の写真が他に無ければ）
     db.session.delete(photo)
     db.session.commit()
 
@@ -268,14 +279,7 @@ def delete_spot_photo(photo_id):
 @spot_bp.route("/search", methods=["GET"])
 def spot_search():
     selected_pref = request.args.get("prefecture", "").strip()
-    prefectures = [
-        r[0] for r in db.session.query(Spots.pref_name_ja)
-        .distinct()
-        .order_by(Spots.pref_code)
-        .all()
-        if r[0]
-    ]
-    return render_template("spot_search.html", prefectures=prefectures, selected_pref=selected_pref)
+    return render_template("spot_search.html", prefectures=prefectures().names, selected_pref=selected_pref)
 
 
 # ============================================
@@ -286,34 +290,32 @@ def spot_search_results():
     prefecture = request.args.get("prefecture", "").strip()
     keyword = request.args.get("keyword", "").strip()
 
-    query = Spots.query
+    if current_app.config.get("CATALOG_SEARCH_ENGINE", True):
+        # プロセス内の検索エンジン（DB に行かない）
+        found = catalog_engine.search("spots", keyword, pref=prefecture)
+        results = found.docs
+        pref_counts = found.facets["pref"]
+    else:
+        query = Spots.query
 
-    if prefecture:
-        query = query.filter(Spots.pref_name_ja == prefecture)
+        if prefecture:
+            query = query.filter(Spots.pref_name_ja == prefecture)
 
-    if keyword:
-        query = query.filter(
-            or_(
-                Spots.name.contains(keyword),
-                Spots.description.contains(keyword),
-            )
-        )
+        # キーワードは全文検索（FTS5 trigram、関連度順）。使えないときは LIKE
+        query = keyword_filter(query, Spots, keyword)
 
-    results = query.all()
+        results = query.all()
+        pref_counts = None
 
-    # プルダウン用：都道府県一覧（DBから）
-    prefectures = [
-        r[0] for r in db.session.query(Spots.pref_name_ja)
-        .distinct()
-        .order_by(Spots.pref_code)
-        .all()
-        if r[0]
-    ]
+    # 表示する観光地だけブックマーク済みか確認（検索画面のブックマークは種別 "spots"）
+    bookmarked = bookmarked_keys(session.get("user_id"), [("spots", s.spot_id) for s in results])
 
     return render_template(
         "spot_search_results.html",
         results=results,
-        prefectures=prefectures,
+        bookmarked=bookmarked,
+        prefectures=prefectures().names,
+        pref_counts=pref_counts,
         selected_pref=prefecture,
         keyword=keyword
     )
@@ -333,7 +335,7 @@ def pref_click(pref_name):
     user_id = session.get("user_id")
 
     # Spotは短縮で保存されてるので短縮に合わせる
-    pref_short = pref_full if pref_full == "北海道" else pref_full.replace("都", "").replace("府", "").replace("県", "")
+    pref_short = prefectures().short_name(pref_full)
 
     try:
         exists = Spot.query.filter_by(user_id=user_id, prefecture=pref_short).first() is not None
@@ -1,9 +1,8 @@
 # routes/weather.py
 
-from flask import Blueprint, render_template, request, flash
-from config import PREF_LATLON
-from utils.weather_utils import convert_weather_icon
-import requests
+from flask import Blueprint, render_template, request
+from utils.forecast_cache import forecast_cache
+from utils.prefectures import prefectures
 
 weather_bp = Blueprint("weather", __name__)
 
@@ -13,54 +12,71 @@ def weather():
     weather_data = None
     weekly = None
     error = None
+    fetched_at = None
 
-    if request.method == "POST":
-        pref = request.form.get("prefecture")
+    pref = request.values.get("prefecture")
 
-        if pref not in PREF_LATLON:
+    if request.method == "POST" or pref:
+        # 予報はキャッシュからだけ読む（API は utils/forecast_cache.py が裏で呼ぶ）
+        snapshot = forecast_cache.snapshot()
+
+        if prefectures().get(pref) is None:
             error = "都道府県を選択してください。"
+        elif snapshot is None or snapshot.get(pref) is None:
+            error = "天気データを準備中です。しばらくしてから再度お試しください。"
         else:
-            lat, lon = PREF_LATLON[pref]
+            forecast = snapshot.get(pref)
+            fetched_at = snapshot.fetched_at
 
-            url = (
-                "https://api.open-meteo.com/v1/forecast"
-                f"?latitude={lat}&longitude={lon}"
-                "&current_weather=true"
-                "&daily=weathercode,temperature_2m_max,temperature_2m_min,precipitation_probability_max"
-                "&timezone=Asia/Tokyo"
-            )
+            weather_data = {
+                "city_name": pref,
+                "description": "現在の天気",
+                "temp": forecast["current"]["temp"],
+                "humidity": "-",
+                "icon": forecast["current"]["icon"],
+            }
+            weekly = forecast["daily"]
 
-            try:
-                res = requests.get(url).json()
+    return render_template(
+        "weather.html",
+        weather=weather_data,
+        weekly=weekly,
+        error=error,
+        fetched_at=fetched_at,
+        prefectures=prefectures().short_names
+    )
 
-                code = res["current_weather"]["weathercode"]
 
-                weather_data = {
-                    "city_name": pref,
-                    "description": "現在の天気",
-                    "temp": res["current_weather"]["temperature"],
-                    "humidity": "-",
-                    "icon": convert_weather_icon(code),
-                }
+# ====================================================
+# 都道府県の天気くらべ（キャッシュだけを読む）
+#   GET /weather/compare?day=0&sort=max
+# ====================================================
+@weather_bp.route('/weather/compare')
+def weather_compare():
+    day = request.args.get("day", 0, type=int)
+    sort = request.args.get("sort", "")
 
-                weekly = []
-                for i in range(7):
-                    w_code = res["daily"]["weathercode"][i]
-                    weekly.append({
-                        "date": res["daily"]["time"][i],
-                        "icon": convert_weather_icon(w_code),
-                        "max": res["daily"]["temperature_2m_max"][i],
-                        "min": res["daily"]["temperature_2m_min"][i],
-                        "precip": res["daily"]["precipitation_probability_max"][i],
-                    })
+    snapshot = forecast_cache.snapshot()
+    rows = []
+    dates = []
+    if snapshot is not None:
+        for p in prefectures():
+            forecast = snapshot.forecasts.get(p.short)
+            if not forecast or not forecast["daily"]:
+                continue
+            dates = [d["date"] for d in forecast["daily"]]
+            daily = forecast["daily"][min(max(day, 0), len(forecast["daily"]) - 1)]
+            rows.append({"pref": p, "current": forecast["current"], "day": daily})
 
-            except Exception:
-                error = "天気データの取得に失敗しました。"
+    if sort in ("max", "min", "precip"):
+        # 値の無い地点は最後に
+        rows.sort(key=lambda r: (r["day"][sort] is None, -(r["day"][sort] or 0)))
 
     return render_template(
-        "weather.html",
-        weather=weather_data,
-        weekly=weekly,
-        error=error,
-        prefectures=list(PREF_LATLON.keys())
+        "weather_compare.html",
+        rows=rows,
+        dates=dates,
+        day=day,
+        sort=sort,
+        fetched_at=snapshot.fetched_at if snapshot else None,
     )
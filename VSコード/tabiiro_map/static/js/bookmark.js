@@ -52,3 +52,29 @@ document.addEventListener("click", async (e) => {
         if (data.ok) btn.textContent = "☆ ブックマーク";
     }
 });
+
+// ===== 戻る / 進むでキャッシュから表示されたときは、表示中のボタンだけ状態を取り直す =====
+window.addEventListener("pageshow", async (e) => {
+    if (!e.persisted) return;
+
+    const buttons = [...document.querySelectorAll(".bookmark-btn")];
+    if (buttons.length === 0) return;
+
+    let res = await fetch("/bookmark/status", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+            items: buttons.map((btn) => ({ type: btn.dataset.type, id: btn.dataset.id }))
+        })
+    });
+
+    let data = await res.json();
+    if (!data.ok) return;
+
+    const bookmarked = new Set(data.bookmarked.map((b) => `${b.type}:${b.id}`));
+    buttons.forEach((btn) => {
+        btn.textContent = bookmarked.has(`${btn.dataset.type}:${btn.dataset.id}`)
+            ? "★ 登録済み"
+            : "☆ ブックマーク";
+    });
+});
@@ -1,10 +1,10 @@
 document.addEventListener("DOMContentLoaded", async () => {
 
-  // SVG を inline で読み込み
-    const res = await fetch("/static/svg/map-full.svg");
+  // SVG を inline で読み込み（URL はハッシュ入りの名前：home.html の data-svg）
+    const container = document.getElementById("japan-map-container");
+    const res = await fetch(container.dataset.svg || "/static/svg/map-full.svg");
     const svgText = await res.text();
 
-    const container = document.getElementById("japan-map-container");
     container.innerHTML = svgText;
 
     const svg = container.querySelector("svg");
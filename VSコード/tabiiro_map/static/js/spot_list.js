@@ -0,0 +1,81 @@
+// ============================
+// 観光地一覧「もっと見る」
+//   /spot/list/more から次のページを取得してカードを追加
+// ============================
+
+document.addEventListener("DOMContentLoaded", () => {
+    const list = document.getElementById("spot-list");
+    const moreBtn = document.getElementById("spot-load-more");
+
+    if (!list || !moreBtn) return;
+
+    function createCard(item) {
+        const card = document.createElement("div");
+        card.className = "spot-card";
+        card.addEventListener("click", () => {
+            location.href = item.detail_url;
+        });
+
+        if (item.photo_url) {
+            const img = document.createElement("img");
+            img.src = item.photo_url;
+            img.alt = item.name;
+            card.appendChild(img);
+        } else {
+            const noPhoto = document.createElement("div");
+            noPhoto.className = "no-photo";
+            noPhoto.textContent = "写真なし";
+            card.appendChild(noPhoto);
+        }
+
+        const info = document.createElement("div");
+        info.className = "spot-info";
+
+        const title = document.createElement("h2");
+        title.textContent = item.name;
+
+        const date = document.createElement("p");
+        const label = document.createElement("strong");
+        label.textContent = "訪問日:";
+        date.appendChild(label);
+        date.appendChild(document.createTextNode(" " + item.visit_date));
+
+        info.appendChild(title);
+        info.appendChild(date);
+        card.appendChild(info);
+        return card;
+    }
+
+    let loading = false;
+
+    moreBtn.addEventListener("click", async (e) => {
+        e.preventDefault();
+        if (loading) return;
+        loading = true;
+
+        const params = new URLSearchParams({ after: moreBtn.dataset.after });
+        if (moreBtn.dataset.prefecture) {
+            params.set("prefecture", moreBtn.dataset.prefecture);
+        }
+
+        try {
+            const res = await fetch(`${moreBtn.dataset.moreUrl}?${params}`);
+            const data = await res.json();
+            if (!data.ok) throw new Error(data.msg);
+
+            data.items.forEach(item => list.appendChild(createCard(item)));
+
+            if (data.next) {
+                moreBtn.dataset.after = data.next;
+            } else {
+                moreBtn.parentElement.remove();
+            }
+        } catch (err) {
+            console.error("続きの取得に失敗", err);
+            // JS で取れなければ通常のページ遷移にまかせる
+            location.href = moreBtn.href;
+        } finally {
+            loading = false;
+        }
+    });
+});
@@ -0,0 +1,221 @@
+# utils/assets.py
+#
+# CSS / JS / SVG などの静的ファイルに中身のハッシュ入りの名前を付けて配る（ブラウザに 1 年キャッシュさせる）
+#   - flask build-assets で ASSET_SOURCES（static からの相対パス）を static/dist/ へ
+#     css/style.css → dist/css/style.<ハッシュ 10 桁>.css とコピーし、文字系のものは .br（brotli が入っていれば）と
+#     .gz も作っておく。対応表は static/dist/manifest.json。前の版のファイルは消す
+#   - テンプレートでは asset_url("css/style.css")。manifest に無い・ASSET_FINGERPRINT=False・debug なら
+#     素の /static/ の URL（ビルドしなくても動く）
+#   - /assets/<名前>（routes/assets.py）は Cache-Control: public, max-age=1 年, immutable で返す。
+#     中身が変われば名前が変わるので、再訪問でも問い合わせ（304 の確認）は起きない
+#   - 返すのは manifest に載っている名前だけ（manifest.json 自体・前の版・"./" を挟んだ別名などは 404）
+#   - Accept-Encoding を見て .br → .gz → 元のファイルの順に返す（その場では圧縮しない）
+#   - manifest は mtime が変わったら読み直す（アプリを再起動しなくてもビルドし直せば切り替わる）
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+
+import click
+from flask import abort, current_app, request, send_from_directory, url_for
+from flask.cli import with_appcontext
+
+try:
+    import brotli
+except ImportError:  # brotli が無ければ .gz だけ作る
+    brotli = None
+
+DIST_DIR = "dist"
+MANIFEST = "manifest.json"
+HASH_LENGTH = 10
+CHECK_INTERVAL = 2.0  # manifest の mtime を確かめる間隔（秒）
+MAX_AGE = 365 * 24 * 3600
+
+# 圧縮しておく拡張子（画像は圧縮済みなので元のまま）
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".map"}
+# (Content-Encoding, 拡張子)。上から順に選ぶ
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def dist_path(app):
+    return os.path.join(app.static_folder, DIST_DIR)
+
+
+def fingerprint(rel, data):
+    """"css/style.css" → "css/style.3f2a9c1b0d.css\""""
+    stem, ext = os.path.splitext(rel)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+# ====================================================
+# ビルド（flask build-assets）
+# ====================================================
+def _sources(static_dir, sources):
+    """ASSET_SOURCES（ディレクトリなら中のファイル全部）→ static からの相対パス"""
+    for source in sources:
+        path = os.path.join(static_dir, source)
+        if os.path.isfile(path):
+            yield source.replace(os.sep, "/")
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if not name.startswith("."):
+                    yield os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, "/")
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _compress(encoding, data):
+    if encoding == "br":
+        return brotli.compress(data, quality=11) if brotli else None
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def build_assets(static_dir, sources, echo=print):
+    """sources を dist へハッシュ名でコピーし、圧縮版と manifest.json を書く → manifest"""
+    dist = os.path.join(static_dir, DIST_DIR)
+    manifest = {}
+    keep = {MANIFEST}
+    for rel in _sources(static_dir, sources):
+        with open(os.path.join(static_dir, rel), "rb") as f:
+            data = f.read()
+        name = fingerprint(rel, data)
+        manifest[rel] = name
+        keep.add(name)
+
+        out = os.path.join(dist, name)
+        if not os.path.exists(out):  # 同じ名前なら中身も同じ
+            _write(out, data)
+        sizes = []
+        if os.path.splitext(rel)[1] in COMPRESSIBLE:
+            for encoding, suffix in ENCODINGS:
+                if os.path.exists(out + suffix):
+                    keep.add(name + suffix)
+                    sizes.append(f"{encoding} {os.path.getsize(out + suffix):,}")
+                    continue
+                packed = _compress(encoding, data)
+                if packed is not None and len(packed) < len(data):
+                    _write(out + suffix, packed)
+                    keep.add(name + suffix)
+                    sizes.append(f"{encoding} {len(packed):,}")
+        echo(f"  {rel} → {DIST_DIR}/{name} ({len(data):,}{''.join(', ' + s for s in sizes)})")
+
+    _write(os.path.join(dist, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+    # 前の版（manifest に無くなったもの）
+    for root, _dirs, files in os.walk(dist):
+        for file in files:
+            rel = os.path.relpath(os.path.join(root, file), dist).replace(os.sep, "/")
+            if rel not in keep:
+                os.remove(os.path.join(root, file))
+    return manifest
+
+
+@click.command("build-assets")
+@with_appcontext
+def build_assets_command():
+    """CSS / JS / SVG をハッシュ入りの名前で static/dist へ（.br / .gz 付き）"""
+    manifest = build_assets(
+        current_app.static_folder, current_app.config.get("ASSET_SOURCES", ()), echo=click.echo
+    )
+    click.echo(f"✅ assets: files={len(manifest)}{'' if brotli else '（brotli が無いので .gz だけ）'}")
+
+
+# ====================================================
+# manifest・asset_url()
+# ====================================================
+class AssetManifest:
+    def __init__(self):
+        self.app = None
+        self._manifest = {}
+        self._names = frozenset()  # manifest の値（/assets/ で返してよい名前）
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self._mtime = None
+        self._checked = 0.0
+        app.add_template_global(asset_url)
+
+    def lookup(self, rel):
+        self._refresh()
+        return self._manifest.get(rel)
+
+    def serves(self, name):
+        """/assets/<name> で返してよいか（今の manifest に載っているハッシュ入りの名前か）"""
+        self._refresh()
+        return name in self._names
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked >= CHECK_INTERVAL:
+            with self._lock:
+                if now - self._checked >= CHECK_INTERVAL:
+                    self._reload()
+                    self._checked = now
+
+    def _reload(self):
+        path = os.path.join(dist_path(self.app), MANIFEST)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self._manifest, self._names, self._mtime = {}, frozenset(), None
+            return
+        if mtime != self._mtime:
+            with open(path, encoding="utf-8") as f:
+                self._manifest = json.load(f)
+            self._names = frozenset(self._manifest.values())
+            self._mtime = mtime
+
+
+assets = AssetManifest()
+
+
+def asset_url(rel):
+    """static からの相対パス → ハッシュ入りの URL（ビルドしていなければ素の /static/）"""
+    config = current_app.config
+    if config.get("ASSET_FINGERPRINT", True) and not current_app.debug:
+        name = assets.lookup(rel)
+        if name is not None:
+            return url_for("assets.asset", filename=name)
+    return url_for("static", filename=rel)
+
+
+# ====================================================
+# 配信（/assets/<名前>）
+# ====================================================
+def send_asset(filename):
+    if not assets.serves(filename):
+        # manifest.json（名前が変わらないので immutable では返せない）や別名・前の版は返さない
+        abort(404)
+    dist = dist_path(current_app)
+    mimetype = mimetypes.guess_type(filename)[0]
+    compressible = os.path.splitext(filename)[1] in COMPRESSIBLE
+
+    res = None
+    if compressible:
+        for encoding, suffix in ENCODINGS:
+            if request.accept_encodings[encoding] and os.path.isfile(os.path.join(dist, filename + suffix)):
+                res = send_from_directory(dist, filename + suffix, mimetype=mimetype, max_age=MAX_AGE)
+                res.headers["Content-Encoding"] = encoding
+                break
+    if res is None:
+        res = send_from_directory(dist, filename, max_age=MAX_AGE)
+    if compressible:
+        res.vary.add("Accept-Encoding")
+    res.cache_control.public = True
+    res.cache_control.immutable = True
+    return res
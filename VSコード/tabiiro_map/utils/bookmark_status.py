@@ -0,0 +1,36 @@
+# utils/bookmark_status.py
+#
+# 検索結果に「ブックマーク済み」を付けるための一括確認
+#   - 表示している (種別, ID) だけを ux_BOOKMARK_user_target の IN で 1 回引く
+#     （ユーザーのブックマーク全件は読まない：コストは 1 ページの件数に比例）
+#   - 種別 IN (...) AND ID IN (...) で引いて、組み合わせが違うものは Python 側で落とす
+#     （1 ページはたいてい 1 種別なので余分な行はほぼ出ない）
+
+from sqlalchemy import select
+
+from extensions import db
+from models import Bookmark
+
+MAX_ITEMS = 500   # POST /bookmark/status で一度に受け付ける件数
+ID_CHUNK = 500    # 1 クエリに入れる ID の数（SQLite のプレースホルダ上限より十分小さく）
+
+
+def bookmarked_keys(user_id, items):
+    """[(種別, ID)] のうちブックマーク済みのものを {(種別, ID 文字列)} で返す"""
+    wanted = {(str(t), str(i)) for t, i in items if t and i is not None and str(i) != ""}
+    if not user_id or not wanted:
+        return set()
+
+    types = sorted({t for t, _ in wanted})
+    ids = sorted({i for _, i in wanted})
+    found = set()
+    for start in range(0, len(ids), ID_CHUNK):
+        rows = db.session.execute(
+            select(Bookmark.target_type, Bookmark.target_id).where(
+                Bookmark.user_id == user_id,
+                Bookmark.target_type.in_(types),
+                Bookmark.target_id.in_(ids[start:start + ID_CHUNK]),
+            )
+        ).all()
+        found.update((t, i) for t, i in rows if (t, i) in wanted)
+    return found
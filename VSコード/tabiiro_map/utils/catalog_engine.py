@@ -0,0 +1,274 @@
+# utils/catalog_engine.py
+#
+# 観光地・イベントカタログのプロセス内検索エンジン
+#   - spots / events テーブルを 1 度読み込み、文字 bigram の転置索引を作る
+#   - 都道府県・カテゴリ・開催月などのファセットは値を整数コード化し、ビットセット（int）で保持
+#   - 検索は「キーワードのビットセット AND ファセットのビットセット」だけで DB に行かない
+#   - catalog_meta の更新番号が変わったら作り直して丸ごと差し替える（検索中の側は古い索引のまま）
+
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import Spots, Event, CatalogMeta
+from utils.event_timing import PERIOD_NAMES, event_dekads, event_months
+
+catalog_meta = CatalogMeta.__table__
+
+
+def _norm(value):
+    # SQLite の LIKE と同じく英字は大文字小文字を区別しない
+    return (value or "").casefold()
+
+
+def _grams(text):
+    """1 文字と 2 文字の n-gram（フィールド区切り \\x00 をまたぐものは除く）"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return {g for g in grams if "\x00" not in g}
+
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+
+def _iter_bits(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class SearchResult:
+    def __init__(self, ids, docs, facets):
+        self.ids = ids        # 結果の主キー（表示順）
+        self.docs = docs      # 結果の行（テンプレート用スナップショット）
+        self.facets = facets  # ファセット名 → {値: 件数}
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class CatalogIndex:
+    """1 カタログ分の転置索引とファセット"""
+
+    def __init__(self, rows, key, title_field, text_fields, facet_fields):
+        self.docs = rows
+        self.ids = [getattr(r, key) for r in rows]
+        self.all_bits = (1 << len(rows)) - 1
+
+        self._texts = []
+        self._titles = []
+        postings = defaultdict(list)
+        for i, row in enumerate(rows):
+            text = "\x00".join(_norm(getattr(row, f)) for f in text_fields)
+            self._texts.append(text)
+            self._titles.append(_norm(getattr(row, title_field)))
+            for g in _grams(text):
+                postings[g].append(i)
+        self._postings = {g: sum(1 << i for i in idx) for g, idx in postings.items()}
+
+        # ファセット：値 → コード、コード → 値 / ビットセット
+        self.facet_codes = {}
+        self.facet_values = {}
+        self.facet_bits = {}
+        for facet, values_of in facet_fields.items():
+            codes, values, members = {}, [], defaultdict(list)
+            for i, row in enumerate(rows):
+                for value in values_of(row):
+                    if value is None or value == "":
+                        continue
+                    if value not in codes:
+                        codes[value] = len(values)
+                        values.append(value)
+                    members[codes[value]].append(i)
+            self.facet_codes[facet] = codes
+            self.facet_values[facet] = values
+            self.facet_bits[facet] = [sum(1 << i for i in members[c]) for c in range(len(values))]
+
+    def _keyword_bits(self, keyword):
+        grams = [keyword[i:i + 2] for i in range(len(keyword) - 1)] or [keyword]
+        candidates = self.all_bits
+        for g in set(grams):
+            candidates &= self._postings.get(g, 0)
+            if not candidates:
+                return 0
+
+        # bigram がすべて含まれていても連続しているとは限らないので確認する
+        return sum(1 << i for i in _iter_bits(candidates) if keyword in self._texts[i])
+
+    def _value_bits(self, facet, value):
+        code = self.facet_codes[facet].get(value)
+        return 0 if code is None else self.facet_bits[facet][code]
+
+    def search(self, keyword="", **filters):
+        keyword = _norm(keyword.strip())
+        matched = self._keyword_bits(keyword) if keyword else self.all_bits
+
+        filter_bits = {
+            facet: self._value_bits(facet, value)
+            for facet, value in filters.items()
+            if value not in (None, "")
+        }
+
+        result = matched
+        for bits in filter_bits.values():
+            result &= bits
+
+        # 各ファセットの件数は「そのファセット以外の条件」で数える
+        facets = {}
+        for facet, value_bits in self.facet_bits.items():
+            base = matched
+            for other, bits in filter_bits.items():
+                if other != facet:
+                    base &= bits
+            counts = {}
+            for code, bits in enumerate(value_bits):
+                n = _popcount(base & bits)
+                if n:
+                    counts[self.facet_values[facet][code]] = n
+            facets[facet] = counts
+
+        order = list(_iter_bits(result))
+        if keyword:
+            # 名前に含むものを先に（それ以外はカタログ順）
+            order.sort(key=lambda i: keyword not in self._titles[i])
+
+        return SearchResult(
+            ids=[self.ids[i] for i in order],
+            docs=[self.docs[i] for i in order],
+            facets=facets,
+        )
+
+
+# ====================================================
+# カタログごとの索引の作り方
+# ====================================================
+def _snapshot(model, rows):
+    cols = [c.key for c in model.__mapper__.column_attrs]
+    return [SimpleNamespace(**{c: getattr(r, c) for c in cols}) for r in rows]
+
+
+def _event_periods(ev):
+    # 開催期間にかかる旬（どの月かは問わない）
+    return sorted({PERIOD_NAMES[d % 3 + 1] for d in event_dekads(ev)})
+
+
+def build_spots_index():
+    rows = Spots.query.order_by(Spots.pref_code, Spots.spot_id).all()
+    return CatalogIndex(
+        _snapshot(Spots, rows),
+        key="spot_id",
+        title_field="name",
+        text_fields=("name", "description", "city", "category"),
+        facet_fields={
+            "pref": lambda s: [s.pref_name_ja],
+            "category": lambda s: [s.category],
+        },
+    )
+
+
+def build_events_index():
+    rows = Event.query.order_by(Event.pref_code, Event.event_code).all()
+    return CatalogIndex(
+        _snapshot(Event, rows),
+        key="event_code",
+        title_field="title",
+        text_fields=("title", "description", "city", "category"),
+        facet_fields={
+            "pref": lambda e: [e.pref_name],
+            "category": lambda e: [e.category],
+            "month": event_months,
+            "period": _event_periods,
+            "dekad": event_dekads,  # 月 + 旬の組み合わせ（1月上旬=0 〜 12月下旬=35）
+        },
+    )
+
+
+BUILDERS = {
+    "spots": build_spots_index,
+    "events": build_events_index,
+}
+
+
+# ====================================================
+# カタログ更新番号
+# ====================================================
+def bump_catalog_version(conn, names):
+    for name in names:
+        stmt = insert(catalog_meta).values(name=name, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"version": catalog_meta.c.version + 1},
+        )
+        conn.execute(stmt)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_catalog_write(session, flush_context):
+    names = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, Spots):
+            names.add("spots")
+        elif isinstance(obj, Event):
+            names.add("events")
+    if names:
+        bump_catalog_version(session.connection(), sorted(names))
+
+
+# ====================================================
+# プロセス内エンジン
+# ====================================================
+class CatalogEngine:
+    def __init__(self):
+        self._indexes = {}    # カタログ名 → CatalogIndex（差し替えは代入 1 回）
+        self._built = {}      # カタログ名 → 作ったときの更新番号
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _current_versions(self):
+        rows = db.session.execute(select(catalog_meta.c.name, catalog_meta.c.version)).all()
+        return {name: version for name, version in rows}
+
+    def _refresh(self, force=False):
+        interval = current_app.config.get("CATALOG_CHECK_INTERVAL", 5)
+        now = time.monotonic()
+        if not force and self._indexes and self._checked_at is not None and now - self._checked_at < interval:
+            return
+
+        # 誰かが作り直している間は、既にある索引で検索を続ける
+        if not self._lock.acquire(blocking=not self._indexes or force):
+            return
+        try:
+            versions = self._current_versions()
+            indexes = dict(self._indexes)
+            built = dict(self._built)
+            for name, build in BUILDERS.items():
+                version = versions.get(name, 0)
+                if force or name not in indexes or built.get(name) != version:
+                    indexes[name] = build()
+                    built[name] = version
+            self._indexes, self._built = indexes, built
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def index(self, name):
+        self._refresh()
+        return self._indexes[name]
+
+    def search(self, name, keyword="", **filters):
+        return self.index(name).search(keyword, **filters)
+
+    def rebuild(self):
+        self._refresh(force=True)
+
+
+catalog_engine = CatalogEngine()
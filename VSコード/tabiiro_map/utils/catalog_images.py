@@ -0,0 +1,190 @@
+# utils/catalog_images.py
+#
+# 観光地（spots）・イベント（events）カタログ画像の縮小版（ビルド時に作る）
+#   - static/images/spots/01_001.jpg → static/images/variants/spots/01_001_{幅}.webp を CATALOG_IMAGE_WIDTHS の幅ごとに
+#     （元より大きい幅は作らない）。縮小・再圧縮はプロセスプールで
+#   - spots / events の image_srcset・image_width / image_height（一番大きい縮小版）・image_placeholder
+#     （CATALOG_IMAGE_PLACEHOLDER px 幅の極小画像の data URI）に入れ、検索結果のテンプレートが
+#     srcset / sizes / width / height と読み込み中の背景に使う（templates/_catalog_image.html）
+#   - 作るのは image_srcset が空の行だけ。取り込み（utils.catalog_import）で image_url が変わった行は空に戻る
+#   - import_spots.py / import_events.py の取り込み後と flask build-catalog-images（--rebuild で全部）から呼ぶ
+#     子プロセスは spawn なので、呼ぶスクリプトは if __name__ == "__main__" で守ること
+#   - Pillow が入っていなければ何もしない（元画像を表示）
+
+import base64
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, select, update
+
+from extensions import db
+from utils.catalog_engine import bump_catalog_version
+from utils.catalog_import import EVENTS, SPOTS
+from utils.image_pipeline import EXTENSIONS
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow が無い環境では縮小版を作らない
+    Image = None
+
+VARIANT_DIR = "images/variants"  # static からの相対パス
+SPECS = {"spots": SPOTS, "events": EVENTS}
+
+
+def static_path(image_url):
+    """image_url（"static/images/spots/01_001.jpg"）→ static からの相対パス "images/spots/01_001.jpg"
+
+    images/ の外・外部 URL なら None。
+    """
+    rel = (image_url or "").replace("\\", "/").lstrip("/")
+    if rel.startswith("static/"):
+        rel = rel[len("static/"):]
+    if not rel.startswith("images/") or "://" in rel or ".." in rel.split("/"):
+        return None
+    return rel
+
+
+def variant_stem(src):
+    """"images/spots/01_001.jpg" → "images/variants/spots/01_001"（後ろに _{幅}.webp が付く）"""
+    return f"{VARIANT_DIR}/{os.path.splitext(src[len('images/'):])[0]}"
+
+
+# ====================================================
+# 縮小（子プロセスで動く。引数・戻り値は pickle できるものだけ）
+# ====================================================
+def _fresh(path, src_mtime):
+    return os.path.exists(path) and os.path.getmtime(path) >= src_mtime
+
+
+def make_catalog_variants(static_dir, src, stem, widths, placeholder, fmt="WEBP", quality=75, rebuild=False):
+    """src（static からの相対パス）を widths の幅に縮めて保存 → 行に入れる値（image_srcset など）
+
+    できているファイルが元画像より新しければ書き直さない（rebuild なら書き直す）。
+    """
+    src_path = os.path.join(static_dir, src)
+    src_mtime = os.path.getmtime(src_path)
+    ext = EXTENSIONS[fmt]
+    os.makedirs(os.path.dirname(os.path.join(static_dir, stem)), exist_ok=True)
+
+    with Image.open(src_path) as im:
+        im.draft("RGB", (max(widths), max(widths)))  # JPEG は縮小しながら読む
+        im = ImageOps.exif_transpose(im)
+        if im.mode != "RGB":
+            im = im.convert("RGB")
+
+        # 元より大きい幅は作らない（元が一番小さい幅より小さければ元の幅で 1 枚）
+        sizes = sorted({min(w, im.width) for w in widths}, reverse=True)
+        candidates = []
+        for width in sizes:
+            height = max(1, round(im.height * width / im.width))
+            rel = f"{stem}_{width}.{ext}"
+            path = os.path.join(static_dir, rel)
+            if rebuild or not _fresh(path, src_mtime):
+                im = im.resize((width, height), Image.LANCZOS)  # 大きい方から順に縮める
+                tmp = f"{path}.{os.getpid()}.tmp"
+                if fmt == "WEBP":
+                    im.save(tmp, fmt, quality=quality, method=4)
+                else:
+                    im.save(tmp, fmt, quality=quality, optimize=True, progressive=True)
+                os.replace(tmp, path)
+            candidates.append((rel, width, height))
+
+        # 極小画像（ぼかして背景に敷く。数百バイト）
+        tiny = im.resize((placeholder, max(1, round(im.height * placeholder / im.width))), Image.BILINEAR)
+        buf = io.BytesIO()
+        tiny.save(buf, "WEBP", quality=30)
+
+    _, width, height = candidates[0]
+    return {
+        "image_srcset": ", ".join(f"{rel} {w}w" for rel, w, _h in reversed(candidates)),
+        "image_width": width,
+        "image_height": height,
+        "image_placeholder": "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii"),
+    }
+
+
+# ====================================================
+# ビルド
+# ====================================================
+def _options():
+    config = current_app.config
+    return {
+        "widths": tuple(config.get("CATALOG_IMAGE_WIDTHS", (320, 640, 960))),
+        "placeholder": config.get("CATALOG_IMAGE_PLACEHOLDER", 16),
+        "fmt": config.get("IMAGE_FORMAT", "WEBP"),
+        "quality": config.get("CATALOG_IMAGE_QUALITY", 75),
+    }
+
+
+def build_catalog_images(names=("spots", "events"), rebuild=False, echo=print):
+    """縮小版の無い行（rebuild なら全部）の縮小版を作って列に入れる → {名前: (作った数, 失敗数)}
+
+    アプリケーションコンテキスト内で呼ぶ。Pillow が無ければ {}。
+    """
+    if Image is None:
+        return {}
+    static_dir = current_app.static_folder
+    options = _options()
+    results = {}
+    with ProcessPoolExecutor(
+        max_workers=current_app.config.get("IMAGE_WORKERS", 2),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        for name in names:
+            spec = SPECS[name]
+            t = spec.table.c
+            query = select(spec.key, t.image_url).where(t.image_url.is_not(None), t.image_url != "")
+            if not rebuild:
+                query = query.where(t.image_srcset.is_(None))
+            rows = db.session.execute(query).all()
+
+            futures = {}  # 同じ画像を指す行は 1 回だけ縮める
+            jobs = []
+            skipped = 0
+            for key, image_url in rows:
+                src = static_path(image_url)
+                if src is None or not os.path.exists(os.path.join(static_dir, src)):
+                    echo(f"  skip {name} {key}: {image_url}")
+                    skipped += 1
+                    continue
+                stem = variant_stem(src)
+                if stem not in futures:
+                    futures[stem] = pool.submit(
+                        make_catalog_variants, static_dir, src, stem, rebuild=rebuild, **options
+                    )
+                jobs.append((key, futures[stem]))
+
+            values = []
+            for key, future in jobs:
+                try:
+                    values.append({"_key": key, **future.result()})
+                except Exception as e:
+                    echo(f"  skip {name} {key}: {e}")
+                    skipped += 1
+
+            if values:
+                # SET する列は values のキーから（executemany）
+                db.session.execute(update(spec.table).where(spec.key == bindparam("_key")), values)
+                # ORM を通らないので検索エンジン（utils.catalog_engine）の作り直し用の番号はここで上げる
+                bump_catalog_version(db.session.connection(), [spec.name])
+                db.session.commit()
+            results[name] = (len(values), skipped)
+    return results
+
+
+@click.command("build-catalog-images")
+@click.option("--rebuild", is_flag=True, help="作成済みのものも作り直す（幅・形式を変えたとき）")
+@click.option("--only", type=click.Choice(sorted(SPECS)), help="spots か events だけ")
+@with_appcontext
+def build_catalog_images_command(rebuild, only):
+    """観光地・イベントのカタログ画像の縮小版（srcset 用の幅違い + 極小画像）を作る"""
+    if Image is None:
+        raise click.ClickException("Pillow が入っていません（pip install pillow）")
+    names = (only,) if only else tuple(SPECS)
+    for name, (built, skipped) in build_catalog_images(names, rebuild=rebuild, echo=click.echo).items():
+        click.echo(f"✅ {name} images: built={built} skipped={skipped}")
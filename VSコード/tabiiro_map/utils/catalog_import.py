@@ -0,0 +1,239 @@
+# utils/catalog_import.py
+#
+# 観光地（spots）・イベント（events）カタログの一括取り込み
+#   - JSON は utils.json_stream で 1 件ずつ読む（件数が増えてもメモリはほぼ一定）
+#   - CHUNK_SIZE 件ごとに既存行をまとめて引いて差分（追加 / 変更 / 変化なし）を出し、
+#     追加・変更分だけ INSERT ... ON CONFLICT DO UPDATE（executemany）で書いてチャンクごとに commit
+#   - 読んだキーは一時テーブルに入れておき、最後に「JSON に無い行」（削除候補）を数える
+#   - dry_run=True なら本テーブルには書かず、差分だけを報告する
+#   - ORM を通らないので catalog_meta の更新番号はここで上げる
+
+import time
+
+from sqlalchemy import case, column, func, select, table
+from sqlalchemy.dialects.sqlite import insert
+
+from extensions import db
+from models import Spots, Event
+from utils.catalog_engine import bump_catalog_version
+from utils.event_timing import dekad_mask, parse_event_dekads, parse_event_month
+from utils.json_stream import iter_catalog
+
+CHUNK_SIZE = 500         # 1 文につき 500 行（SQLite の変数上限に収まる）
+PROGRESS_EVERY = 100000  # 途中経過を出す件数
+SAMPLE_SIZE = 10         # 差分レポートに載せるキーの数
+
+# JSON からではなく取り込み後に作る列（utils/catalog_images.py）
+IMAGE_COLUMNS = ("image_srcset", "image_width", "image_height", "image_placeholder")
+
+# 今回の JSON にあったキー（接続ごとの一時テーブル）
+SEEN_TABLE = "temp._catalog_import_seen"
+seen_keys = table("_catalog_import_seen", column("key"), schema="temp")
+
+
+# ====================================================
+# JSON → 行
+# ====================================================
+def _text(value):
+    return (value or "").strip()
+
+
+def spot_row(pref, s):
+    spot_id = _text(s.get("spot_id"))
+    if not spot_id:
+        return None
+    return {
+        "spot_id": spot_id,
+        "name": _text(s.get("spot_name")),
+        "city": _text(s.get("city")),
+        "category": _text(s.get("category")),
+        "description": _text(s.get("description")),
+        "image_url": _text(s.get("image_url")),
+        # pref情報（外側から）
+        "pref_code": pref.get("pref_code"),
+        "pref_name_ja": pref.get("pref_name_ja", ""),
+        "pref_name_en": pref.get("pref_name_en", ""),
+        "region": pref.get("region", ""),
+    }
+
+
+def event_row(pref, e):
+    event_code = e.get("event_id")
+    if not event_code:
+        return None
+    month_start, period_start, month_end, period_end = parse_event_month(e.get("month"))
+    return {
+        "event_code": event_code,
+        "title": e.get("event_name"),
+        "category": e.get("category"),
+        "description": e.get("description"),
+        "month": e.get("month"),  # "2月上旬"
+        "month_start": month_start,
+        "period_start": period_start,
+        "month_end": month_end,
+        "period_end": period_end,
+        "dekad_mask": dekad_mask(parse_event_dekads(e.get("month"))),
+        "city": e.get("city"),
+        "url": e.get("event_url"),
+        "image_url": e.get("image_url"),
+        "pref_code": str(pref.get("pref_code")),
+        "pref_name": pref.get("pref_name_ja"),
+    }
+
+
+def upsert_statement(spec):
+    # 値はバインド（executemany）で渡すので、文のコンパイルは 1 回だけでキャッシュされる
+    stmt = insert(spec.table)
+    t = spec.table.c
+    set_ = {c.name: stmt.excluded[c.name] for c in spec.table.columns if c is not spec.key}
+    # 縮小版（utils/catalog_images.py）は JSON に無いので残す。画像が差し替わったら空にして作り直させる
+    same_image = stmt.excluded.image_url.is_not_distinct_from(t.image_url)
+    for name in IMAGE_COLUMNS:
+        set_[name] = case((same_image, t[name]), else_=None)
+    return stmt.on_conflict_do_update(index_elements=[spec.key], set_=set_)
+
+
+class CatalogSpec:
+    def __init__(self, name, model, key, records_key, to_row):
+        self.name = name                # catalog_meta の名前
+        self.table = model.__table__
+        self.key = self.table.c[key]
+        self.records_key = records_key  # JSON の都道府県ごとのレコード配列
+        self.to_row = to_row
+        self.upsert = upsert_statement(self)
+
+
+SPOTS = CatalogSpec("spots", Spots, "spot_id", "spots", spot_row)
+EVENTS = CatalogSpec("events", Event, "event_code", "events", event_row)
+
+
+# ====================================================
+# 取り込み結果
+# ====================================================
+class ImportReport:
+    def __init__(self, name, dry_run):
+        self.name = name
+        self.dry_run = dry_run
+        self.rows = 0
+        self.added = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.pruned = 0
+        self.skipped = 0
+        self.samples = {"added": [], "changed": [], "removed": []}
+        self.seconds = 0.0
+
+    @property
+    def written(self):
+        return not self.dry_run and (self.added or self.changed or self.pruned)
+
+    def _sample(self, kind, value):
+        if len(self.samples[kind]) < SAMPLE_SIZE:
+            self.samples[kind].append(value)
+
+    def rate(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        mode = "DRY RUN " if self.dry_run else ""
+        lines = [
+            f"✅ {mode}{self.name} import: rows={self.rows:,} added={self.added:,} "
+            f"changed={self.changed:,} unchanged={self.unchanged:,} removed={self.removed:,} "
+            f"pruned={self.pruned:,} skipped={self.skipped:,}",
+            f"   {self.seconds:.2f}s ({self.rate():,.0f} rows/s)",
+        ]
+        for kind, keys in self.samples.items():
+            if keys:
+                lines.append(f"   {kind}: " + ", ".join(keys) + (" …" if len(keys) == SAMPLE_SIZE else ""))
+        return "\n".join(lines)
+
+
+# ====================================================
+# 取り込み本体
+# ====================================================
+def _apply_chunk(conn, spec, chunk, report, dry_run):
+    keys = list(chunk)
+    existing = {
+        row._mapping[spec.key.name]: row._mapping
+        for row in conn.execute(select(spec.table).where(spec.key.in_(keys)))
+    }
+
+    writes = []
+    for key, row in chunk.items():
+        old = existing.get(key)
+        if old is None:
+            report.added += 1
+            report._sample("added", key)
+            writes.append(row)
+            continue
+
+        diff = [c for c, v in row.items() if old[c] != v]
+        if diff:
+            report.changed += 1
+            report._sample("changed", f"{key}({', '.join(diff)})")
+            writes.append(row)
+        else:
+            report.unchanged += 1
+
+    conn.exec_driver_sql(
+        f"INSERT OR IGNORE INTO {SEEN_TABLE} (key) VALUES (?)",
+        [(k,) for k in keys],
+    )
+    if writes and not dry_run:
+        conn.execute(spec.upsert, writes)
+    # dry run でも一時テーブルだけのトランザクションを閉じて、ロックを持ち続けない
+    conn.commit()
+
+
+def import_catalog(spec, path, dry_run=False, prune=False, chunk_size=CHUNK_SIZE, progress=print):
+    """JSON カタログを取り込んで ImportReport を返す（アプリケーションコンテキスト内で呼ぶ）"""
+    report = ImportReport(spec.name, dry_run)
+    started = time.perf_counter()
+
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {SEEN_TABLE} (key TEXT PRIMARY KEY)")
+        conn.exec_driver_sql(f"DELETE FROM {SEEN_TABLE}")
+        conn.commit()
+
+        chunk = {}
+        for pref, record in iter_catalog(path, spec.records_key):
+            row = spec.to_row(pref, record)
+            if row is None:
+                report.skipped += 1
+                continue
+            report.rows += 1
+            chunk[row[spec.key.name]] = row  # 同じキーが続いたら後のものを使う
+
+            if len(chunk) >= chunk_size:
+                _apply_chunk(conn, spec, chunk, report, dry_run)
+                chunk = {}
+            if progress and report.rows % PROGRESS_EVERY == 0:
+                elapsed = time.perf_counter() - started
+                progress(f"   … {report.rows:,} rows ({report.rows / elapsed:,.0f} rows/s)")
+
+        if chunk:
+            _apply_chunk(conn, spec, chunk, report, dry_run)
+
+        # JSON に無くなった行
+        not_seen = spec.key.not_in(select(seen_keys.c.key))
+        missing = select(spec.key).where(not_seen)
+        for (key,) in conn.execute(missing.limit(SAMPLE_SIZE)):
+            report._sample("removed", key)
+        report.removed = conn.execute(
+            select(func.count()).select_from(missing.subquery())
+        ).scalar_one()
+
+        if prune and report.removed and not dry_run:
+            report.pruned = conn.execute(
+                spec.table.delete().where(not_seen)
+            ).rowcount
+
+        if report.written:
+            bump_catalog_version(conn, [spec.name])
+
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {SEEN_TABLE}")
+        conn.commit()
+
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,131 @@
+# utils/catalog_search.py
+#
+# 観光地（spots）・イベント（events）カタログのキーワード検索
+#   - FTS5 の trigram 索引（spots_fts / events_fts）があれば MATCH + bm25 で順位付け
+#   - trigram は 3 文字未満を引けないので、短いキーワードや FTS5 が無い環境は LIKE
+#   - 索引は元テーブルのトリガーで同期。flask rebuild-search-index で作り直し
+
+import threading
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import Float, Integer, column, literal_column, or_, text
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+from models import Spots, Event
+
+# モデル → (FTS テーブル, 元テーブル, 索引カラム, bm25 の重み)
+FTS_INDEXES = {
+    Spots: ("spots_fts", "spots", ("name", "description", "city", "category"), (10.0, 1.0, 3.0, 3.0)),
+    Event: ("events_fts", "events", ("title", "description", "city", "category"), (10.0, 1.0, 3.0, 3.0)),
+}
+
+MIN_FTS_LENGTH = 3  # trigram の最小長
+
+_ready = {}  # (engine url, FTS テーブル) → 使えるか
+_ready_lock = threading.Lock()
+
+
+def fts_ready(fts_table):
+    key = (str(db.engine.url), fts_table)
+    with _ready_lock:
+        if key in _ready:
+            return _ready[key]
+
+    found = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": fts_table},
+    ).first() is not None
+
+    with _ready_lock:
+        _ready[key] = found
+    return found
+
+
+def _match_expr(keyword):
+    # キーワード全体を 1 つのフレーズとして扱う（LIKE '%kw%' と同じ意味）
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+def keyword_filter(query, model, keyword):
+    """query にキーワード条件を付ける（FTS が使えれば関連度順に並べる）"""
+    if not keyword:
+        return query
+
+    fts_table, src_table, cols, weights = FTS_INDEXES[model]
+
+    if len(keyword) >= MIN_FTS_LENGTH and fts_ready(fts_table):
+        weight_args = ", ".join(str(w) for w in weights)
+        matched = (
+            text(
+                f"SELECT rowid AS rowid, bm25({fts_table}, {weight_args}) AS rank "
+                f"FROM {fts_table} WHERE {fts_table} MATCH :match"
+            )
+            .bindparams(match=_match_expr(keyword))
+            .columns(column("rowid", Integer), column("rank", Float))
+            .subquery("matched")
+        )
+        return (
+            query.join(matched, literal_column(f"{src_table}.rowid") == matched.c.rowid)
+            .order_by(matched.c.rank)
+        )
+
+    return query.filter(or_(*(getattr(model, c).contains(keyword) for c in cols)))
+
+
+# ====================================================
+# 索引の作成・作り直し
+# ====================================================
+def _ensure_fts(conn, fts_table, src_table, cols):
+    col_list = ", ".join(cols)
+    new_vals = ", ".join(f"new.{c}" for c in cols)
+    old_vals = ", ".join(f"old.{c}" for c in cols)
+
+    conn.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5({col_list}, "
+        f"content='{src_table}', content_rowid='rowid', tokenize='trigram')"
+    )
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {src_table} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+    )
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {src_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); END"
+    )
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {src_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {col_list}) VALUES ('delete', old.rowid, {old_vals}); "
+        f"INSERT INTO {fts_table}(rowid, {col_list}) VALUES (new.rowid, {new_vals}); END"
+    )
+
+
+def rebuild_search_index():
+    """FTS 索引を（無ければ作って）元テーブルから作り直す。使えなければ False"""
+    conn = db.session.connection()
+    try:
+        for fts_table, src_table, cols, _ in FTS_INDEXES.values():
+            _ensure_fts(conn, fts_table, src_table, cols)
+            # VACUUM で rowid が振り直されてもここで整合が戻る
+            conn.exec_driver_sql(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+    except OperationalError as e:
+        db.session.rollback()
+        print("FTS5 が使えないため LIKE 検索のままです:", e)
+        return False
+
+    db.session.commit()
+    with _ready_lock:
+        _ready.clear()
+    return True
+
+
+# ====================================================
+# flask rebuild-search-index
+# ====================================================
+@click.command("rebuild-search-index")
+@with_appcontext
+def rebuild_search_index_command():
+    """spots / events の全文検索索引を作り直す"""
+    if rebuild_search_index():
+        click.echo("✅ search index rebuilt")
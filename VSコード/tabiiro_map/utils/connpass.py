@@ -0,0 +1,264 @@
+# utils/connpass.py
+#
+# connpass のイベント検索（/connpass/results 用）
+#   - キーワード・日付はカンマ区切りで複数指定でき、(キーワード, 日付) の組ごとに connpass API を呼ぶ
+#     （組が複数あれば CONNPASS_WORKERS 本のスレッドで同時に。結果はどれかに当たったものの和）
+#   - (キーワード, 日付) ごとの応答は CONNPASS_CACHE_TTL 秒キャッシュ（utils.ttl_cache、同時の同じ検索は 1 回）
+#   - 観光カタログの Event（utils.catalog_engine）からも同じ条件で探し、1 つの一覧に並べる
+#     並び順：キーワードが題名に入っている > 本文に入っている、同点なら開催が近い順
+
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from flask import current_app
+
+from models import Event
+from utils.catalog_engine import catalog_engine
+from utils.catalog_search import keyword_filter
+from utils.event_timing import date_dekad, dekads_until, event_dekads, month_overlaps
+from utils.http_client import http
+from utils.ttl_cache import TTLCache
+
+CONNPASS_API_URL = "https://connpass.com/api/v2/event/"
+COUNT = 100        # 1 回の問い合わせで取る件数（connpass の上限）
+MAX_TERMS = 4      # キーワード・日付それぞれ何個まで受け付けるか
+MAX_RESULTS = 100  # 並べる件数
+
+_SPLIT_RE = re.compile(r"[,、，]")
+
+
+def parse_keywords(text):
+    """"Python, 機械学習" → ["Python", "機械学習"]（空白は 1 つの語の中として残す）"""
+    terms = []
+    for term in _SPLIT_RE.split(text or ""):
+        term = " ".join(term.split())
+        if term and term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def parse_days(text):
+    """"20250301, 2025-03-08" → ([date, date], [読めなかった文字列])"""
+    days, invalid = [], []
+    for term in re.split(r"[,、，\s]+", text or ""):
+        if not term:
+            continue
+        digits = unicodedata.normalize("NFKC", term).replace("-", "").replace("/", "")
+        try:
+            day = datetime.strptime(digits, "%Y%m%d").date()
+        except ValueError:
+            invalid.append(term)
+            continue
+        if day not in days:
+            days.append(day)
+    return days[:MAX_TERMS], invalid
+
+
+# ====================================================
+# connpass API
+# ====================================================
+def _slim(ev):
+    return {
+        "id": ev.get("id"),
+        "title": ev.get("title") or "",
+        "catch": ev.get("catch") or "",
+        "url": ev.get("url"),
+        "image_url": ev.get("image_url"),
+        "started_at": ev.get("started_at"),
+        "ended_at": ev.get("ended_at"),
+        "place": ev.get("place") or "",
+        "address": ev.get("address") or "",
+        "accepted": ev.get("accepted"),
+        "limit": ev.get("limit"),
+    }
+
+
+def fetch_events(keyword, day, api_key=None):
+    """connpass API を 1 回呼ぶ（必要な項目だけの dict のタプル）"""
+    params = {"count": COUNT, "order": 2}  # 開催日時の昇順
+    if keyword:
+        params["keyword"] = keyword
+    if day:
+        params["ymd"] = day.strftime("%Y%m%d")
+    headers = {"X-API-Key": api_key} if api_key else None
+    data = http.get_json(CONNPASS_API_URL, params=params, headers=headers)
+    return tuple(_slim(ev) for ev in data.get("events") or [])
+
+
+class ConnpassSearch:
+    def __init__(self):
+        self._cache = TTLCache(ttl=300, size=256)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.workers = 4
+        self.api_key = None
+
+    def init_app(self, app):
+        self._cache.ttl = app.config.get("CONNPASS_CACHE_TTL", self._cache.ttl)
+        self._cache.size = app.config.get("CONNPASS_CACHE_SIZE", self._cache.size)
+        self.workers = app.config.get("CONNPASS_WORKERS", self.workers)
+        self.api_key = app.config.get("CONNPASS_API_KEY")
+
+    def _pool(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="connpass"
+                    )
+        return self._executor
+
+    def fetch(self, keyword, day):
+        key = (keyword, day)
+        return self._cache.get(key, lambda: fetch_events(keyword, day, self.api_key))
+
+    def search(self, keywords, days):
+        """(キーワード, 日付) の組ごとに検索して合わせる → (イベント一覧, 失敗した組の数)
+
+        キーワードも日付も無ければ上流に問い合わせない（([], 0)）。
+        """
+        if not keywords and not days:
+            return [], 0
+        pairs = [(k, d) for k in (keywords or [None]) for d in (days or [None])]
+
+        if len(pairs) == 1:
+            outcomes = [self._try(*pairs[0])]
+        else:
+            # 上流の待ち時間を重ねる（同時に走るのは workers 本まで）
+            outcomes = list(self._pool().map(lambda pair: self._try(*pair), pairs))
+
+        events, seen, failed = [], set(), 0
+        for found in outcomes:
+            if found is None:
+                failed += 1
+                continue
+            for ev in found:
+                if ev["id"] not in seen:
+                    seen.add(ev["id"])
+                    events.append(ev)
+        return events, failed
+
+    def _try(self, keyword, day):
+        try:
+            return self.fetch(keyword, day)
+        except Exception as e:
+            print("connpass 検索失敗:", keyword, day, e)
+            return None
+
+    def stats(self):
+        return self._cache.stats()
+
+
+connpass_search = ConnpassSearch()
+
+
+# ====================================================
+# 観光カタログの Event
+# ====================================================
+def catalog_events(keywords, days):
+    """カタログの Event からキーワード（どれか）・日付（どれかの旬にかかる）で探す"""
+    if not keywords and not days:
+        return []
+    wanted = {date_dekad(d) for d in days}
+
+    if current_app.config.get("CATALOG_SEARCH_ENGINE", True):
+        found, seen = [], set()
+        for keyword in keywords or [""]:
+            for ev in catalog_engine.search("events", keyword).docs:
+                if ev.event_code not in seen:
+                    seen.add(ev.event_code)
+                    found.append(ev)
+    else:
+        found, seen = [], set()
+        for keyword in keywords or [""]:
+            query = Event.query
+            if days:
+                query = query.filter(month_overlaps({d.month for d in days}))
+            for ev in keyword_filter(query, Event, keyword).all():
+                if ev.event_code not in seen:
+                    seen.add(ev.event_code)
+                    found.append(ev)
+
+    if wanted:
+        found = [
+            ev for ev in found
+            if event_dekads(ev) & wanted
+        ]
+    return found
+
+
+# ====================================================
+# 並べる
+# ====================================================
+def _norm(text):
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def _text_score(keywords, title, body):
+    score = 0
+    for keyword in keywords:
+        k = _norm(keyword)
+        if k in _norm(title):
+            score += 3
+        elif k in _norm(body):
+            score += 1
+    return score
+
+
+def _connpass_item(ev, keywords, today):
+    started = None
+    if ev["started_at"]:
+        try:
+            started = datetime.fromisoformat(ev["started_at"]).date()
+        except ValueError:
+            pass
+    # 終わったものは後ろへ
+    distance = (started - today).days if started else 365
+    if distance < 0:
+        distance = 1000 - distance
+    return {
+        "source": "connpass",
+        "id": str(ev["id"]),
+        "title": ev["title"],
+        "url": ev["url"],
+        "image_url": ev["image_url"],
+        "when": started.strftime("%Y/%m/%d") if started else "",
+        "where": ev["place"] or ev["address"],
+        "description": ev["catch"],
+        "score": _text_score(keywords, ev["title"], ev["catch"] + " " + ev["place"]),
+        "distance": distance,
+    }
+
+
+def _catalog_item(ev, keywords, today):
+    # 毎年の開催：開催中なら 0、これから始まるなら何旬先か（×10 日）
+    until = dekads_until(event_dekads(ev), date_dekad(today))
+    distance = 365 if until is None else until * 10
+    return {
+        "source": "catalog",
+        "id": ev.event_code,
+        "title": ev.title,
+        "url": ev.url,
+        "image_url": ev.image_url,
+        "image_srcset": ev.image_srcset,  # 縮小版（utils/catalog_images.py）
+        "image_width": ev.image_width,
+        "image_height": ev.image_height,
+        "image_placeholder": ev.image_placeholder,
+        "when": ev.month or "",
+        "where": " / ".join(x for x in (ev.pref_name, ev.city) if x),
+        "description": ev.description or "",
+        "score": _text_score(keywords, ev.title, " ".join(x or "" for x in (ev.description, ev.city, ev.category))),
+        "distance": distance,
+    }
+
+
+def merge_results(keywords, connpass_events, local_events, today=None):
+    """connpass とカタログのイベントを 1 つの一覧に（関連度 → 開催が近い順）"""
+    today = today or date.today()
+    items = [_connpass_item(ev, keywords, today) for ev in connpass_events]
+    items += [_catalog_item(ev, keywords, today) for ev in local_events]
+    items.sort(key=lambda item: (-item["score"], item["distance"], item["title"]))
+    return items[:MAX_RESULTS]
@@ -0,0 +1,97 @@
+# utils/data_version.py
+#
+# ユーザーごとのデータ更新番号（USER.data_version）
+#   - Spot の書き込みがあるたびに同じトランザクション内で +1
+#   - 読み取り側はプロセス内の値を DATA_VERSION_TTL 秒だけ信用し、DB を読まない
+#   - 書き込んだブラウザには session["data_version"] で新しい番号を渡すので、
+#     別ワーカーに振られても自分の更新はすぐ反映される
+
+import threading
+import time
+
+from flask import current_app, has_request_context, session as flask_session
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import Spot, User
+
+user_table = User.__table__
+
+_lock = threading.Lock()
+_versions = {}  # user_id -> (version, 確認した時刻)
+
+
+def _remember(user_id, version):
+    with _lock:
+        _versions[user_id] = (version, time.monotonic())
+
+
+def bump_versions(conn, user_ids=None):
+    """更新番号を +1 して、新しい {user_id: version} を返す"""
+    stmt = user_table.update().values(
+        data_version=user_table.c.data_version + 1,
+        updated_at=user_table.c.updated_at,  # onupdate で更新日時を変えない
+    )
+    query = select(user_table.c.id, user_table.c.data_version)
+    if user_ids is not None:
+        stmt = stmt.where(user_table.c.id.in_(user_ids))
+        query = query.where(user_table.c.id.in_(user_ids))
+
+    conn.execute(stmt)
+    return dict(conn.execute(query).all())
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_spot_write(session, flush_context):
+    user_ids = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Spot):
+            user_ids.add(obj.user_id)
+    for obj in session.dirty:
+        if isinstance(obj, Spot) and session.is_modified(obj):
+            user_ids.add(obj.user_id)
+
+    if user_ids:
+        new_versions = bump_versions(session.connection(), user_ids)
+        session.info.setdefault("data_versions", {}).update(new_versions)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_versions(session):
+    new_versions = session.info.pop("data_versions", None)
+    if not new_versions:
+        return
+
+    for user_id, version in new_versions.items():
+        _remember(user_id, version)
+
+    # 書き込んだ本人のブラウザには新しい番号を持たせる
+    if has_request_context():
+        user_id = flask_session.get("user_id")
+        if user_id in new_versions:
+            flask_session["data_version"] = new_versions[user_id]
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_versions(session):
+    session.info.pop("data_versions", None)
+
+
+def get_data_version(user_id):
+    """現在の更新番号（TTL 内ならプロセス内の値を返し、DB を読まない）"""
+    ttl = current_app.config.get("DATA_VERSION_TTL", 10)
+    seen = flask_session.get("data_version") if has_request_context() else None
+
+    with _lock:
+        cached = _versions.get(user_id)
+
+    if cached:
+        version, checked_at = cached
+        fresh = time.monotonic() - checked_at < ttl
+        if fresh and (seen is None or seen <= version):
+            return version
+
+    version = db.session.scalar(select(User.data_version).where(User.id == user_id)) or 0
+    _remember(user_id, version)
+    return version
@@ -0,0 +1,222 @@
+# utils/event_timing.py
+#
+# イベントの開催時期（Event.month の自由記述）を構造化する
+#   "2月上旬"           → 2月上旬 〜 2月上旬
+#   "7月下旬〜8月上旬"   → 7月下旬 〜 8月上旬
+#   "8月上旬〜中旬"      → 8月上旬 〜 8月中旬
+#   "7〜8月" / "12月〜2月" → 月単位の範囲（年をまたぐものも可）
+#   "3月・9月" / "3月、9月" → 別々の期間（3月と 9 月だけ。範囲になるのは「〜」だけ）
+#   "通年"               → 1月 〜 12月
+# 旬は 上旬=1 / 中旬=2 / 下旬=3、書かれていなければ None（その月全体）
+#
+# month_start 〜 month_end は全部の期間を覆う範囲（索引で大まかに絞る用）、
+# dekad_mask は開催する旬のビット（1月上旬=bit0 〜 12月下旬=bit35）で、こちらが正確な開催時期
+
+import re
+import unicodedata
+from datetime import date, timedelta
+
+from sqlalchemy import and_, or_
+
+from models import Event
+
+PERIODS = {"上旬": 1, "初旬": 1, "中旬": 2, "下旬": 3, "末": 3}
+PERIOD_NAMES = {1: "上旬", 2: "中旬", 3: "下旬"}
+ALL_DEKADS = frozenset(range(36))
+
+_YEAR_ROUND = ("通年", "年中", "一年中", "オールシーズン")
+_RANGE_SEP = r"(?:[〜~\-−–ー]|から)"
+_LIST_SEP = re.compile(r"[・、,/]")
+# 「N月[旬]」、範囲の前側だけ月が省略された「N〜」、月の付かない旬
+_TOKEN_RE = re.compile(
+    r"(?<!\d)(\d{1,2})(?:\s*月\s*(上旬|初旬|中旬|下旬|末)?|(?=\s*" + _RANGE_SEP + r"\s*\d))"
+    r"|(上旬|初旬|中旬|下旬|末)"
+)
+
+
+def _spans(text):
+    """開催時期の文字列（NFKC 済み）→ [((開始月, 旬), (終了月, 旬))]。「・」「、」で並んだものは別々の期間"""
+    spans = []
+    last_month = None
+    for part in _LIST_SEP.split(text):
+        points = []  # [(month, period)]
+        for m in _TOKEN_RE.finditer(part):
+            month, period, bare_period = m.groups()
+            if month:
+                month = int(month)
+                if not 1 <= month <= 12:
+                    continue
+                points.append((month, PERIODS.get(period)))
+            elif points or last_month:
+                # "8月上旬〜中旬" / "3月上旬・下旬" の月の付かない旬は直前の月に付く
+                points.append((points[-1][0] if points else last_month, PERIODS[bare_period]))
+        if points:
+            spans.append((points[0], points[-1]))
+            last_month = points[-1][0]
+    return spans
+
+
+def _normalize(text):
+    return unicodedata.normalize("NFKC", text).strip()
+
+
+def parse_event_month(text):
+    """開催時期の文字列 → (month_start, period_start, month_end, period_end)（全部の期間を覆う範囲）"""
+    if not text:
+        return None, None, None, None
+
+    text = _normalize(text)
+    if any(word in text for word in _YEAR_ROUND):
+        return 1, None, 12, None
+
+    spans = _spans(text)
+    if not spans:
+        return None, None, None, None
+    if len(spans) == 1:
+        (ms, ps), (me, pe) = spans[0]
+        return ms, ps, me, pe
+
+    # 飛び飛びの開催：年をまたぐ期間が混ざっていれば 1 年全体、それ以外は一番早い旬 〜 一番遅い旬
+    def first(p):
+        return dekad(p[0], p[1] or 1)
+
+    def last(p):
+        return dekad(p[0], p[1] or 3)
+
+    if any(first(start) > last(end) for start, end in spans):
+        return 1, None, 12, None
+    ms, ps = min((start for start, _ in spans), key=first)
+    me, pe = max((end for _, end in spans), key=last)
+    return ms, ps, me, pe
+
+
+def parse_event_dekads(text):
+    """開催時期の文字列 → 開催する旬（0〜35）の集合"""
+    if not text:
+        return set()
+    text = _normalize(text)
+    if any(word in text for word in _YEAR_ROUND):
+        return set(ALL_DEKADS)
+    covered = set()
+    for (ms, ps), (me, pe) in _spans(text):
+        covered |= span_dekads(ms, ps, me, pe)
+    return covered
+
+
+def dekad_mask(dekads):
+    """旬の集合 → Event.dekad_mask（空なら None）"""
+    mask = 0
+    for d in dekads:
+        mask |= 1 << d
+    return mask or None
+
+
+def dekad(month, period):
+    """1月上旬=0 〜 12月下旬=35"""
+    return (month - 1) * 3 + (period - 1)
+
+
+def span_dekads(month_start, period_start, month_end, period_end):
+    """1 つの期間に含まれる旬（0〜35）の集合。年をまたぐ期間も扱う"""
+    if month_start is None or month_end is None:
+        return set()
+
+    start = dekad(month_start, period_start or 1)
+    end = dekad(month_end, period_end or 3)
+    if start <= end:
+        return set(range(start, end + 1))
+    return set(range(start, 36)) | set(range(0, end + 1))
+
+
+def event_dekads(ev):
+    """イベント（Event でもカタログ索引のスナップショットでも）の開催する旬の集合
+
+    dekad_mask が無い行（取り込み前のデータ）は month_start 〜 month_end の範囲で。
+    """
+    mask = getattr(ev, "dekad_mask", None)
+    if mask is not None:
+        return {d for d in ALL_DEKADS if mask >> d & 1}
+    return span_dekads(ev.month_start, ev.period_start, ev.month_end, ev.period_end)
+
+
+def event_months(ev):
+    return sorted({d // 3 + 1 for d in event_dekads(ev)})
+
+
+def dekads_until(covered, today):
+    """今の旬から開催まで何旬先か（開催中なら 0、開催時期が無ければ None）"""
+    if not covered:
+        return None
+    if today in covered:
+        return 0
+    return min((d - today) % 36 for d in covered)
+
+
+def date_dekad(d):
+    return dekad(d.month, 1 if d.day <= 10 else 2 if d.day <= 20 else 3)
+
+
+def window_dekads(start, days):
+    return {date_dekad(start + timedelta(days=i)) for i in range(days + 1)}
+
+
+def _month_runs(months):
+    """{7, 8, 9, 12} → [(7, 9), (12, 12)]（連続する月をまとめる）"""
+    runs = []
+    for m in sorted(set(months)):
+        if runs and runs[-1][1] == m - 1:
+            runs[-1] = (runs[-1][0], m)
+        else:
+            runs.append((m, m))
+    return runs
+
+
+def month_overlaps(months):
+    """開催期間がいずれかの月にかかるイベントの条件
+
+    連続する月ごとに 1 つの範囲条件にして、年をまたがない開催は ix_events_month_range、
+    年をまたぐ開催は ix_events_month_wrap で引けるようにしている（MULTI-INDEX OR）。
+    """
+    wraps = Event.month_start > Event.month_end
+    conds = []
+    bits = 0
+    for first, last in _month_runs(months):
+        conds.append(and_(Event.month_start <= last, Event.month_end >= first))
+        # 年をまたぐ期間（例：12月〜2月）は [開始月, 12] か [1, 終了月] のどちらかにかかればよい
+        conds.append(and_(wraps, Event.month_start <= last))
+        conds.append(and_(wraps, Event.month_end >= first))
+        for m in range(first, last + 1):
+            bits |= 0b111 << (m - 1) * 3
+    # 範囲で絞ったあと、飛び飛びの開催（"3月・9月" など）は旬のビットで間の月を外す
+    exact = or_(Event.dekad_mask.is_(None), Event.dekad_mask.op("&")(bits) != 0)
+    return and_(or_(*conds), exact)
+
+
+def apply_timing(event):
+    """Event.month から構造化カラムを埋める"""
+    event.month_start, event.period_start, event.month_end, event.period_end = parse_event_month(event.month)
+    event.dekad_mask = dekad_mask(parse_event_dekads(event.month))
+    return event
+
+
+def events_in_window(start=None, days=30, prefecture=None):
+    """start から days 日以内に開催時期がかかるイベント（開始が近い順）"""
+    start = start or date.today()
+    dekads = window_dekads(start, days)
+    months = {d // 3 + 1 for d in dekads}
+
+    query = Event.query.filter(month_overlaps(months))
+    if prefecture:
+        query = query.filter(Event.pref_name == prefecture)
+
+    # 月単位で絞ったあと、旬単位で正確に判定する
+    today = date_dekad(start)
+    results = []
+    for ev in query.all():
+        covered = event_dekads(ev)
+        if covered & dekads:
+            # 既に始まっているものは 0、これから始まるものは何旬先か
+            results.append((dekads_until(covered, today), ev))
+
+    results.sort(key=lambda x: x[0])
+    return [ev for _, ev in results]
@@ -0,0 +1,153 @@
+# utils/forecast_cache.py
+#
+# 47 都道府県の天気予報キャッシュ（/weather 用）
+#   - open-meteo forecast API に 47 地点をまとめて 1 回で問い合わせ、プロセス内に丸ごと保持
+#   - バックグラウンドのスレッドが FORECAST_REFRESH_INTERVAL 秒ごとに取り直す（最初のリクエストで起動）
+#   - 読む側は DB にも API にも行かない。FORECAST_TTL を過ぎていれば更新を起こしつつ古い値を返す
+#   - まだ一度も取れていないときは None（画面は「準備中」）
+
+import threading
+import time
+from datetime import datetime
+
+from utils.http_client import http
+from utils.prefectures import prefectures
+from utils.weather_utils import convert_weather_icon
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+TIMEOUT = 10  # 秒（47 地点ぶん）
+FORECAST_DAYS = 7
+RETRY_AFTER = 30  # 取得に失敗したあと、次に試すまでの秒数
+
+
+class ForecastSnapshot:
+    def __init__(self, forecasts, fetched_at):
+        self.forecasts = forecasts    # 短縮名 → {"current": {...}, "daily": [...]}
+        self.fetched_at = fetched_at  # 取得日時（表示用）
+        self.loaded = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.loaded
+
+    def get(self, prefecture):
+        p = prefectures().get(prefecture)
+        return self.forecasts.get(p.short) if p else None
+
+
+def _parse(res):
+    current = res.get("current_weather") or {}
+    daily = res.get("daily") or {}
+    days = []
+    for i, day in enumerate(daily.get("time") or []):
+        code = daily["weathercode"][i]
+        days.append({
+            "date": day,
+            "code": code,
+            "icon": convert_weather_icon(code),
+            "max": daily["temperature_2m_max"][i],
+            "min": daily["temperature_2m_min"][i],
+            "precip": daily["precipitation_probability_max"][i],
+        })
+    return {
+        "current": {
+            "code": current.get("weathercode"),
+            "icon": convert_weather_icon(current.get("weathercode")),
+            "temp": current.get("temperature"),
+        },
+        "daily": days,
+    }
+
+
+def fetch_all():
+    """全都道府県の予報を 1 回の API 呼び出しで取る（短縮名 → 予報）"""
+    prefs = list(prefectures())
+    data = http.get_json(
+        FORECAST_URL,
+        params={
+            "latitude": ",".join(str(p.lat) for p in prefs),
+            "longitude": ",".join(str(p.lon) for p in prefs),
+            "current_weather": "true",
+            "daily": "weathercode,temperature_2m_max,temperature_2m_min,precipitation_probability_max",
+            "forecast_days": FORECAST_DAYS,
+            "timezone": "Asia/Tokyo",
+        },
+        timeout=TIMEOUT,
+    )
+    if isinstance(data, dict):
+        # 1 地点だけのときは配列にならない
+        data = [data]
+    if len(data) != len(prefs):
+        raise ValueError(f"予報の地点数が合いません: {len(data)} / {len(prefs)}")
+    return {p.short: _parse(r) for p, r in zip(prefs, data)}
+
+
+class ForecastCache:
+    def __init__(self):
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._scheduler = None
+        self._failed_at = None  # 最後に取得に失敗した時刻（monotonic）
+        self._stop = threading.Event()
+        self.ttl = 1800
+        self.interval = 900
+
+    def init_app(self, app):
+        self.ttl = app.config.get("FORECAST_TTL", 1800)
+        self.interval = app.config.get("FORECAST_REFRESH_INTERVAL", 900)
+        if app.config.get("FORECAST_PREFETCH", True):
+            # CLI や import スクリプトでは動かさず、最初のリクエストで先読みを始める
+            app.before_request(self.start)
+
+    # ---------- 取得 ----------
+    def refresh(self):
+        """今すぐ取り直す（他のスレッドが取得中なら何もしない）。取れたら True"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            forecasts = fetch_all()
+            self._snapshot = ForecastSnapshot(forecasts, datetime.now())
+            self._failed_at = None
+            return True
+        except Exception as e:
+            print("天気予報の取得失敗:", e)
+            self._failed_at = time.monotonic()
+            return False
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_async(self):
+        if self._refresh_lock.locked():
+            return
+        if self._failed_at is not None and time.monotonic() - self._failed_at < RETRY_AFTER:
+            return
+        threading.Thread(target=self.refresh, name="forecast-refresh", daemon=True).start()
+
+    # ---------- 定期更新 ----------
+    def start(self):
+        if self._scheduler is not None:
+            return
+        with self._start_lock:
+            if self._scheduler is not None:
+                return
+            self._scheduler = threading.Thread(target=self._loop, name="forecast-prefetch", daemon=True)
+        self._scheduler.start()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- 読み取り ----------
+    def snapshot(self):
+        """今の予報（古ければ裏で更新を起こして、そのまま古い値を返す）"""
+        snap = self._snapshot
+        if snap is None or snap.age() > self.ttl:
+            self.refresh_async()
+        return snap
+
+
+forecast_cache = ForecastCache()
@@ -0,0 +1,108 @@
+# utils/hotel_cache.py
+#
+# 楽天トラベル検索結果のキャッシュ（/hotel/results 用）
+#   - キーは (キーワード, page, hits)。値は extract_hotel_info で必要な項目だけに絞ったホテル一覧と総ページ数
+#   - HOTEL_CACHE_TTL 秒で期限切れ、HOTEL_CACHE_SIZE 件を超えたら古く使われたものから捨てる（LRU）
+#   - 同じキーの検索が同時に来たら、上流への呼び出しは 1 回だけ（utils.ttl_cache）
+#   - ヒット・ミス・相乗り（取得中の結果を待った）の件数は GET /api/hotel-cache で確認（EXPOSE_UPSTREAM_STATS = True のとき）
+#   - prefetch() で次のページを裏で取っておける（同時に取りに行く数は HOTEL_PREFETCH_MAX まで、
+#     それを超えた分は捨てる。リクエストは待たない）
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from utils.hotel_utils import MAX_PAGE, extract_hotel_info, search_hotels
+from utils.ttl_cache import TTLCache
+
+
+def normalize_keyword(keyword):
+    """空白の違いで別のキーにならないようにする"""
+    return " ".join(keyword.split())
+
+
+class HotelPage(NamedTuple):
+    hotels: tuple      # extract_hotel_info の dict（共有なので書き換えないこと）
+    page: int
+    page_count: int    # 楽天側の総ページ数（MAX_PAGE で頭打ち）
+    record_count: int
+
+    @property
+    def has_next(self):
+        return self.page < self.page_count
+
+
+def _load(keyword, page, hits):
+    raw_hotels, paging = search_hotels(keyword, page=page, hits=hits)
+    return HotelPage(
+        hotels=tuple(extract_hotel_info(raw_hotels)),
+        page=page,
+        page_count=min(paging.get("pageCount") or 0, MAX_PAGE),
+        record_count=paging.get("recordCount") or 0,
+    )
+
+
+class HotelCache:
+    def __init__(self):
+        self._cache = TTLCache(ttl=600, size=512)
+        self._lock = threading.Lock()
+        self._executor = None
+        self.prefetch_max = 4
+        self._prefetching = 0
+        self.prefetched = 0
+        self.prefetch_dropped = 0
+
+    def init_app(self, app):
+        self._cache.ttl = app.config.get("HOTEL_CACHE_TTL", self._cache.ttl)
+        self._cache.size = app.config.get("HOTEL_CACHE_SIZE", self._cache.size)
+        self.prefetch_max = app.config.get("HOTEL_PREFETCH_MAX", self.prefetch_max)
+        if self.prefetch_max > 0 and self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.prefetch_max, thread_name_prefix="hotel-prefetch"
+            )
+
+    def search(self, keyword, page=1, hits=20):
+        """キャッシュ経由の検索 → HotelPage"""
+        key = (normalize_keyword(keyword), page, hits)
+        return self._cache.get(key, lambda: _load(*key))
+
+    # ---------- 先読み ----------
+    def prefetch(self, keyword, page=1, hits=20):
+        """裏で取ってキャッシュに入れておく（すぐ戻る）。積んだら True"""
+        key = (normalize_keyword(keyword), page, hits)
+        if self._executor is None or self._cache.has(key):
+            return False
+        with self._lock:
+            if self._prefetching >= self.prefetch_max:
+                # 上流が遅いときに先読みが溜まり続けないよう、上限を超えた分は捨てる
+                self.prefetch_dropped += 1
+                return False
+            self._prefetching += 1
+            self.prefetched += 1
+        self._executor.submit(self._prefetch, keyword, page, hits)
+        return True
+
+    def _prefetch(self, keyword, page, hits):
+        try:
+            self.search(keyword, page=page, hits=hits)
+        except Exception as e:
+            print("ホテル先読み失敗:", keyword, page, e)
+        finally:
+            with self._lock:
+                self._prefetching -= 1
+
+    def stats(self):
+        stats = self._cache.stats()
+        with self._lock:
+            stats.update({
+                "prefetched": self.prefetched,
+                "prefetch_dropped": self.prefetch_dropped,
+                "prefetching": self._prefetching,
+            })
+        return stats
+
+    def clear(self):
+        self._cache.clear()
+
+
+hotel_cache = HotelCache()
@@ -1,11 +1,24 @@
 # utils/hotel_utils.py
 
-import requests
+from utils.http_client import http
 
 APPLICATION_ID = "1002136947918553343"
+HOTEL_SEARCH_URL = "https://app.rakuten.co.jp/services/api/Travel/KeywordHotelSearch/20170426"
+
+# 画面（hotel_results.html・ブックマーク）で使う項目だけ残す
+HOTEL_FIELDS = (
+    "hotelNo", "hotelName", "hotelImageUrl", "hotelInformationUrl",
+    "address1", "address2", "nearestStation", "hotelMinCharge",
+)
+
+MAX_PAGE = 100  # 楽天トラベル API で取れる最後のページ
+
 
 def search_hotels(keyword, page=1, hits=20):
-    url = "https://app.rakuten.co.jp/services/api/Travel/KeywordHotelSearch/20170426"
+    """楽天トラベルのキーワード検索 → (ホテル一覧の生データ, pagingInfo)
+
+    上流に繋がらなければ utils.http_client.UpstreamError
+    """
     params = {
         "applicationId": APPLICATION_ID,
         "format": "json",
@@ -14,9 +27,10 @@ def search_hotels(keyword, page=1, hits=20):
         "hits": hits,
         "formatVersion": 2
     }
-    resp = requests.get(url, params=params)
+    # 該当なしは 404 + JSON で返ってくるので、ステータスでは弾かない
+    resp = http.get(HOTEL_SEARCH_URL, params=params)
     data = resp.json()
-    return data.get("hotels", [])
+    return data.get("hotels", []), data.get("pagingInfo") or {}
 
 
 def extract_hotel_info(raw_hotels):
@@ -24,5 +38,5 @@ def extract_hotel_info(raw_hotels):
     for wrapper in raw_hotels:
         if isinstance(wrapper, list) and len(wrapper) > 0:
             info = wrapper[0].get("hotelBasicInfo", {})
-            hotels.append(info)
+            hotels.append({k: info.get(k) for k in HOTEL_FIELDS})
     return hotels
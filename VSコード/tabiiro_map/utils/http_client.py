@@ -0,0 +1,348 @@
+# utils/http_client.py
+#
+# 外部 API（楽天トラベル・open-meteo・connpass）への呼び出しをまとめる共通クライアント
+#   - ホストごとに requests.Session を 1 つ持ち、接続を使い回す（HTTPAdapter のプール）
+#   - timeout を必ず付ける（指定が無ければ HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT）
+#   - 接続エラー・タイムアウト・5xx・429 は揺らぎ付きの指数バックオフで再試行
+#   - ホストごとのサーキットブレーカー：連続で失敗したらしばらく呼ばずに CircuitOpenError を投げる
+#     （一定時間後に 1 本だけ試し、成功すれば元に戻る）
+#   - 上流ごとにレイテンシのヒストグラムとエラー件数を記録（EXPOSE_UPSTREAM_STATS = True なら GET /api/upstreams で確認）
+#   - HTTP_UPSTREAM_OVERRIDES で上流の向き先を差し替えられる（bench/stub_upstreams.py の代役サーバー用）
+#
+#   from utils.http_client import http
+#   res = http.get(url, params={...})          # 4xx はそのまま返す（raise_for_status は呼び出し側で）
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# レイテンシのヒストグラムの区切り（ミリ秒、最後は上限なし）
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+MAX_RETRY_AFTER = 30  # Retry-After がこれより長ければ待たずにあきらめる（秒）
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamError(Exception):
+    """上流 API に繋がらない・再試行しても 5xx が返る"""
+
+    def __init__(self, host, message):
+        super().__init__(f"{host}: {message}")
+        self.host = host
+
+
+class CircuitOpenError(UpstreamError):
+    """サーキットブレーカーが開いている（上流が落ちているので呼ばずに失敗）"""
+
+
+# ====================================================
+# サーキットブレーカー（ホストごと）
+# ====================================================
+class CircuitBreaker:
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold      # これだけ続けて失敗したら開く
+        self.reset_after = reset_after  # 開いてから試しに 1 本通すまでの秒数
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """呼んでよければ True（half-open の間は 1 本だけ）"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_after:
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    def release(self):
+        """half-open の試しの 1 本を、成功とも失敗とも数えずに終える（次の呼び出しがまた試せる）"""
+        with self._lock:
+            self._probing = False
+
+    def retry_in(self):
+        """開いているとき、次に試すまでの秒数"""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_after - (time.monotonic() - self.opened_at))
+
+
+# ====================================================
+# 上流ごとの統計
+# ====================================================
+class UpstreamStats:
+    def __init__(self):
+        self.requests = 0
+        self.latency_counts = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0  # ミリ秒
+        self.status = {}        # "2xx" / "4xx" / "5xx" → 件数
+        self.errors = {}        # "timeout" / "connection" / "5xx" / "circuit_open" など → 件数
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed_ms, status=None, error=None):
+        with self._lock:
+            self.requests += 1
+            self.latency_sum += elapsed_ms
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if elapsed_ms <= bound:
+                    self.latency_counts[i] += 1
+                    break
+            if status is not None:
+                key = f"{status // 100}xx"
+                self.status[key] = self.status.get(key, 0) + 1
+            if error is not None:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    def count_error(self, error):
+        with self._lock:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def count_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def percentile(self, q):
+        """ヒストグラムからの概算（そのバケットの上限ミリ秒）"""
+        with self._lock:
+            counts = list(self.latency_counts)
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS, counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+    def as_dict(self):
+        p50, p95, p99 = self.percentile(0.5), self.percentile(0.95), self.percentile(0.99)
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "status": dict(self.status),
+                "errors": dict(self.errors),
+                "latency_ms": {
+                    "buckets": {
+                        ("+Inf" if bound == float("inf") else str(bound)): n
+                        for bound, n in zip(LATENCY_BUCKETS, self.latency_counts)
+                    },
+                    "sum": round(self.latency_sum, 1),
+                    "avg": round(self.latency_sum / self.requests, 1) if self.requests else None,
+                    "p50": p50, "p95": p95, "p99": p99,
+                },
+            }
+
+
+class _Upstream:
+    def __init__(self, client, host):
+        self.host = host
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=client.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.breaker = CircuitBreaker(client.breaker_threshold, client.breaker_reset)
+        self.stats = UpstreamStats()
+
+
+# ====================================================
+# クライアント本体
+# ====================================================
+class HttpClient:
+    def __init__(self):
+        self.connect_timeout = 3.05
+        self.read_timeout = 10.0
+        self.retries = 2            # 失敗したときの再試行回数（試行は retries + 1 回）
+        self.backoff = 0.5          # 最初の再試行までの秒数（以降 2 倍ずつ）
+        self.pool_size = 10
+        self.breaker_threshold = 5
+        self.breaker_reset = 30.0
+        self.overrides = {}         # "https://host" → 代わりに呼ぶ "http://127.0.0.1:port"
+        self._upstreams = {}        # "https://host" → _Upstream
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.connect_timeout = app.config.get("HTTP_CONNECT_TIMEOUT", self.connect_timeout)
+        self.read_timeout = app.config.get("HTTP_READ_TIMEOUT", self.read_timeout)
+        self.retries = app.config.get("HTTP_RETRIES", self.retries)
+        self.backoff = app.config.get("HTTP_RETRY_BACKOFF", self.backoff)
+        self.pool_size = app.config.get("HTTP_POOL_SIZE", self.pool_size)
+        self.breaker_threshold = app.config.get("HTTP_BREAKER_THRESHOLD", self.breaker_threshold)
+        self.breaker_reset = app.config.get("HTTP_BREAKER_RESET", self.breaker_reset)
+        self.overrides = {
+            base.rstrip("/"): target.rstrip("/")
+            for base, target in (app.config.get("HTTP_UPSTREAM_OVERRIDES") or {}).items()
+        }
+        # 設定を変えたら作り直す（プールの大きさ・しきい値は作成時に決まる）
+        self.close()
+
+    def _upstream(self, url):
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        upstream = self._upstreams.get(host)
+        if upstream is None:
+            with self._lock:
+                upstream = self._upstreams.get(host)
+                if upstream is None:
+                    upstream = self._upstreams[host] = _Upstream(self, host)
+        return upstream
+
+    def _wait(self, attempt, backoff, res=None):
+        """再試行までの秒数（Retry-After があればそれに従う）"""
+        if res is not None:
+            retry_after = res.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        # 同時に失敗した呼び出しが揃って再試行しないように揺らす
+        return backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _resolve(self, url):
+        if not self.overrides:
+            return url
+        parts = urlsplit(url)
+        target = self.overrides.get(f"{parts.scheme}://{parts.netloc}")
+        if target is None:
+            return url
+        return target + url[len(parts.scheme) + 3 + len(parts.netloc):]
+
+    def request(self, method, url, timeout=None, retries=None, backoff=None, **kwargs):
+        """1 回の論理的な呼び出し（必要なら再試行）。最後まで駄目なら UpstreamError"""
+        url = self._resolve(url)
+        upstream = self._upstream(url)
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        retries = self.retries if retries is None else retries
+        backoff = self.backoff if backoff is None else backoff
+
+        attempt = 0
+        while True:
+            if not upstream.breaker.allow():
+                upstream.stats.count_error("circuit_open")
+                raise CircuitOpenError(
+                    upstream.host, f"停止中（あと {upstream.breaker.retry_in():.1f} 秒）"
+                )
+
+            started = time.perf_counter()
+            res = None
+            try:
+                res = upstream.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.Timeout as e:
+                error, reason = "timeout", e
+            except requests.ConnectionError as e:
+                error, reason = "connection", e
+            except requests.RequestException as e:
+                # URL の誤り・途中で切れた応答など（再試行しない）。half-open の試しならここで終える
+                upstream.stats.observe((time.perf_counter() - started) * 1000, error="request")
+                upstream.breaker.record_failure()
+                raise UpstreamError(upstream.host, e) from e
+            except BaseException:
+                upstream.breaker.release()
+                raise
+            else:
+                if res.status_code in RETRY_STATUS:
+                    error, reason = f"{res.status_code // 100}xx", f"HTTP {res.status_code}"
+                    if res.status_code == 429:
+                        error = "429"
+                else:
+                    error = None
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            if error is None:
+                upstream.stats.observe(elapsed_ms, status=res.status_code)
+                upstream.breaker.record_success()
+                return res
+
+            upstream.stats.observe(
+                elapsed_ms, status=res.status_code if res is not None else None, error=error
+            )
+            # 429 は上流が生きている（こちらが速すぎる）ので、ブレーカーは数えない（試しの 1 本だけ終える）
+            if error != "429":
+                upstream.breaker.record_failure()
+            else:
+                upstream.breaker.release()
+
+            wait = self._wait(attempt, backoff, res)
+            if attempt >= retries or wait > MAX_RETRY_AFTER:
+                if res is not None:
+                    res.close()
+                raise UpstreamError(upstream.host, reason)
+            if res is not None:
+                res.close()
+            attempt += 1
+            upstream.stats.count_retry()
+            time.sleep(wait)
+
+    def get(self, url, params=None, **kwargs):
+        return self.request("GET", url, params=params, **kwargs)
+
+    def get_json(self, url, params=None, **kwargs):
+        """GET して JSON を返す（4xx も含めて 2xx 以外は requests.HTTPError）"""
+        res = self.get(url, params=params, **kwargs)
+        res.raise_for_status()
+        return res.json()
+
+    # ---------- 状態 ----------
+    def stats(self):
+        """上流ごとの統計とブレーカーの状態"""
+        with self._lock:
+            upstreams = list(self._upstreams.values())
+        result = {}
+        for u in upstreams:
+            result[u.host] = u.stats.as_dict()
+            result[u.host]["circuit"] = {
+                "state": u.breaker.state,
+                "failures": u.breaker.failures,
+                "retry_in": round(u.breaker.retry_in(), 1),
+            }
+        return result
+
+    def stats_for(self, url):
+        """url のホストの統計（まだ呼んでいなければ None）"""
+        parts = urlsplit(self._resolve(url))
+        return self.stats().get(f"{parts.scheme}://{parts.netloc}")
+
+    def close(self):
+        with self._lock:
+            upstreams = list(self._upstreams.values())
+            self._upstreams = {}
+        for u in upstreams:
+            u.session.close()
+
+
+http = HttpClient()
+
@@ -0,0 +1,261 @@
+# utils/image_pipeline.py
+#
+# アップロード写真の縮小版（一覧用 thumb・表示用 display）を作るバックグラウンド処理
+#   - request_variants() が session.info["image_jobs"] に積んだ写真を commit 後に受け取る
+#   - 縮小・再圧縮は CPU を食うのでプロセスプール（IMAGE_WORKERS 本）で。リクエストは待たない
+#     （アプリ側はスレッドが多いので fork ではなく spawn で子プロセスを作る。子は __main__ を読み直すので、
+#       アプリを起動するスクリプトは if __name__ == "__main__" で守ること）
+#   - できたら PHOTO.thumb_filename / display_filename に static/uploads からの相対パスを入れる
+#     まだ無い・作れなかった写真は元画像のまま表示する（Photo.thumb / Photo.display）
+#   - 縮小版の名前は中身のハッシュ（utils.photo_store）なので、同じ中身の写真は 1 回だけ縮める
+#     消すのも utils.photo_store（最後の 1 枚が消えたとき）
+#   - Pillow が入っていなければ何もしない（元画像を表示）
+#   - IMAGE_ASYNC=False ならその場で実行（テスト・CLI 用）
+#   - 既存の写真は flask build-image-variants でまとめて作る
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import Photo, PhotoBlob
+from utils.photo_store import VARIANT_DIR, blob_key, uploads_path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow が無い環境では縮小版を作らない
+    Image = None
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+def variant_names(stem, sizes, fmt):
+    """{"thumb": "variants/<stem>_thumb.webp", ...}（static/uploads からの相対パス）"""
+    return {name: f"{VARIANT_DIR}/{stem}_{name}.{EXTENSIONS[fmt]}" for name in sizes}
+
+
+# ====================================================
+# 縮小（子プロセスで動く。引数・戻り値は pickle できるものだけ）
+# ====================================================
+def make_variants(src, out_dir, stem, sizes, fmt="WEBP", quality=80):
+    """src を sizes（{"thumb": 320, ...} 長辺の px）に縮めて保存 → variant_names(stem, sizes, fmt)"""
+    names = variant_names(stem, sizes, fmt)
+    os.makedirs(os.path.join(out_dir, VARIANT_DIR), exist_ok=True)
+
+    with Image.open(src) as im:
+        im.draft("RGB", (max(sizes.values()),) * 2)  # JPEG は縮小しながら読む
+        im = ImageOps.exif_transpose(im)
+        alpha = fmt == "WEBP" and ("A" in im.getbands() or "transparency" in im.info)
+        mode = "RGBA" if alpha else "RGB"
+        if im.mode != mode:
+            im = im.convert(mode)
+
+        # 大きい方から順に縮める（小さい方は縮めたものからさらに縮める）
+        for name, size in sorted(sizes.items(), key=lambda kv: -kv[1]):
+            im.thumbnail((size, size), Image.LANCZOS)
+            path = os.path.join(out_dir, names[name])
+            tmp = f"{path}.{os.getpid()}.tmp"  # 同じ中身の写真を同時に縮めても、書きかけは見せない
+            if fmt == "WEBP":
+                im.save(tmp, fmt, quality=quality, method=4)
+            else:
+                im.save(tmp, fmt, quality=quality, optimize=True, progressive=True)
+            os.replace(tmp, path)
+    return names
+
+
+# ====================================================
+# プール
+# ====================================================
+class ImagePipeline:
+    def __init__(self):
+        self.app = None
+        self._threads = None    # 子プロセスの完了を待って DB に書くスレッド
+        self._processes = None  # 縮小する子プロセス（最初の 1 枚で起動）
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def init_app(self, app):
+        self.app = app
+        if Image is None or not app.config.get("IMAGE_ASYNC", True):
+            self.shutdown(wait=False)
+        elif self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=app.config.get("IMAGE_WORKERS", 2),
+                thread_name_prefix="image",
+            )
+
+    @property
+    def enabled(self):
+        return Image is not None and self.app is not None
+
+    def _options(self):
+        config = self.app.config
+        return {
+            "sizes": {
+                "thumb": config.get("IMAGE_THUMB_SIZE", 320),
+                "display": config.get("IMAGE_DISPLAY_SIZE", 1280),
+            },
+            "fmt": config.get("IMAGE_FORMAT", "WEBP"),
+            "quality": config.get("IMAGE_QUALITY", 80),
+        }
+
+    def _pool(self):
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.app.config.get("IMAGE_WORKERS", 2),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._processes
+
+    def submit(self, photo_id, filename):
+        if not self.enabled:
+            return
+        if self._threads is None:
+            self._run(photo_id, filename, inline=True)
+            return
+        with self._lock:
+            self._pending += 1
+        self._threads.submit(self._run, photo_id, filename)
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def _run(self, photo_id, filename, inline=False):
+        base = uploads_path(self.app)
+        options = self._options()
+        # 縮小版は中身ごと（同じ中身の写真は共有）。以前の形式の写真は Photo ごと
+        stem = blob_key(filename) or str(photo_id)
+        args = (os.path.join(base, filename), base, stem)
+        try:
+            made = variant_names(stem, options["sizes"], options["fmt"])
+            if all(os.path.exists(os.path.join(base, rel)) for rel in made.values()):
+                pass  # 同じ中身の写真でもう作ってある
+            elif inline:
+                made = make_variants(*args, **options)
+            else:
+                made = self._pool().submit(make_variants, *args, **options).result()
+        except Exception as e:
+            print("縮小版の作成失敗:", photo_id, filename, e)
+            made = None
+        finally:
+            if not inline:
+                with self._lock:
+                    self._pending -= 1
+
+        if made:
+            self._store(photo_id, filename, made)
+        return made
+
+    def _store(self, photo_id, filename, made):
+        with self.app.app_context():
+            result = db.session.execute(
+                update(Photo)
+                .where(Photo.photo_id == photo_id)
+                .values(thumb_filename=made["thumb"], display_filename=made["display"])
+            )
+            key = blob_key(filename)
+            # 作っている間に写真が消された（同じ中身の写真がまだあれば縮小版は残す）
+            orphaned = result.rowcount == 0 and (key is None or db.session.get(PhotoBlob, key) is None)
+            db.session.commit()
+            db.session.remove()
+
+        if orphaned:
+            for rel in made.values():
+                path = os.path.join(uploads_path(self.app), rel)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def shutdown(self, wait=True):
+        if self._threads is not None:
+            self._threads.shutdown(wait=wait)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait)
+            self._processes = None
+
+
+image_pipeline = ImagePipeline()
+
+
+def request_variants(photo):
+    """写真の縮小版作成を commit 後に回す（photo は session に add 済みのもの）"""
+    if not image_pipeline.enabled:
+        return
+    if photo.photo_id is None:
+        db.session.flush()
+    db.session.info.setdefault("image_jobs", []).append((photo.photo_id, photo.filename))
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_image_jobs(session):
+    jobs = session.info.pop("image_jobs", None)
+    if not jobs:
+        return
+    for photo_id, filename in jobs:
+        image_pipeline.submit(photo_id, filename)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_image_jobs(session):
+    session.info.pop("image_jobs", None)
+
+
+# ====================================================
+# flask build-image-variants
+# ====================================================
+def build_missing(rebuild=False, echo=print):
+    """縮小版の無い写真（rebuild なら全部）をプロセスプールでまとめて作る → (作った数, 失敗数)"""
+    query = select(Photo.photo_id, Photo.filename).order_by(Photo.photo_id)
+    if not rebuild:
+        query = query.where(Photo.thumb_filename.is_(None))
+    rows = db.session.execute(query).all()
+
+    base = uploads_path(current_app)
+    options = image_pipeline._options()
+    built = failed = 0
+    with ProcessPoolExecutor(
+        max_workers=current_app.config.get("IMAGE_WORKERS", 2),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        futures = {}  # 縮小版の名前 → Future（同じ中身は 1 回だけ）
+        jobs = []
+        for photo_id, filename in rows:
+            stem = blob_key(filename) or str(photo_id)
+            if stem not in futures:
+                futures[stem] = pool.submit(make_variants, os.path.join(base, filename), base, stem, **options)
+            jobs.append((photo_id, filename, futures[stem]))
+        for photo_id, filename, future in jobs:
+            try:
+                made = future.result()
+            except Exception as e:
+                echo(f"  skip photo {photo_id} ({filename}): {e}")
+                failed += 1
+                continue
+            db.session.execute(
+                update(Photo)
+                .where(Photo.photo_id == photo_id)
+                .values(thumb_filename=made["thumb"], display_filename=made["display"])
+            )
+            built += 1
+    db.session.commit()
+    return built, failed
+
+
+@click.command("build-image-variants")
+@click.option("--rebuild", is_flag=True, help="作成済みのものも作り直す（サイズ・形式を変えたとき）")
+@with_appcontext
+def build_image_variants_command(rebuild):
+    """アップロード済み写真の縮小版（thumb / display）を作る"""
+    if Image is None:
+        raise click.ClickException("Pillow が入っていません（pip install pillow）")
+    built, failed = build_missing(rebuild=rebuild, echo=click.echo)
+    click.echo(f"✅ image variants: built={built} failed={failed}")
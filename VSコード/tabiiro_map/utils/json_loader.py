@@ -1,6 +1,7 @@
 import json
 import os
 from config import Config
+from utils.prefectures import prefectures
 
 def load_spots_json():
     path = Config.SPOTS_JSON_PATH
@@ -13,5 +14,5 @@ def load_events_json():
         return json.load(f)
 
 def get_prefecture_list():
-    data = load_spots_json()
-    return [p["pref_name_ja"] for p in data]
+    # 都道府県は utils.prefectures の registry から（毎回 JSON を読まない）
+    return list(prefectures().names)
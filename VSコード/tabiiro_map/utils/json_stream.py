@@ -0,0 +1,107 @@
+# utils/json_stream.py
+#
+# カタログ JSON を 1 件ずつ読み出す（ファイル全体を json.load しない）
+#   [ {"pref_code": 1, ..., "spots": [ {...}, {...} ]}, ... ]
+# のような「都道府県の配列 → その中のレコード配列」を、(都道府県の情報, レコード) の順に返す。
+# 都道府県の項目はレコード配列より前に書かれているものだけが見える（今の spots.json / events.json はそうなっている）。
+
+import json
+
+CHUNK_CHARS = 64 * 1024
+_WHITESPACE = " \t\r\n"
+
+
+class _Reader:
+    def __init__(self, f):
+        self._f = f
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = self._f.read(CHUNK_CHARS)
+        if not chunk:
+            self._eof = True
+            return False
+        # 読み終わった部分は捨てる（バッファが大きくならないように）
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("JSON が途中で終わっています")
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"JSON の {ch!r} が必要な位置です: {self._buf[self._pos:self._pos + 20]!r}")
+        self._pos += 1
+
+    def value(self):
+        """値を 1 つ読む（足りなければ読み足す）"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # バッファ末尾で終わった数値などは続きがあるかもしれない
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array(self):
+        """配列の要素ごとに 1 回 yield する（要素そのものは呼び出し側が読む）"""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def object_keys(self):
+        """オブジェクトのキーを yield する（値は呼び出し側が読む）"""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def iter_catalog(path, records_key):
+    """(都道府県の dict, レコードの dict) を順に返す（レコードは読んだそばから）"""
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _Reader(f)
+        for _ in reader.array():
+            pref = {}
+            for key in reader.object_keys():
+                if key == records_key:
+                    seen = dict(pref)  # ここまでに読んだ都道府県の項目
+                    for _ in reader.array():
+                        yield seen, reader.value()
+                else:
+                    pref[key] = reader.value()
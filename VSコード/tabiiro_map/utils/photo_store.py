@@ -0,0 +1,313 @@
+# utils/photo_store.py
+#
+# アップロード写真の保存先（static/uploads）
+#   - 中身の SHA-256 をファイル名にして 1 つだけ置く（ab/ab…cd.jpg）。同じ中身の写真は PHOTO_BLOB を共有し、
+#     ref_count で何枚の Photo が指しているかを数える
+#   - ハッシュは一時ファイル（SpoolFile）へ書きながら計算し、置くときは os.replace（途中の状態が見えない）
+#     アップロードの受け取り・制限は utils.uploads
+#   - Photo が消えたら（写真削除・観光地 / グルメ記録ごとの削除どちらでも）ref_count を減らし、
+#     0 になったらファイルと縮小版を消す。消すのは commit 後（rollback なら元に戻す）
+#   - 以前の {user_id}_{時刻}_{元の名前} の写真はそのまま表示できる。flask dedupe-uploads でこちらへ移す
+#     （--prune でどの写真からも指されていないファイルも消す。ハッシュ名のものは PHOTO_BLOB と比べる）
+
+import glob
+import hashlib
+import os
+import re
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, object_session
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from extensions import db
+from models import Photo, PhotoBlob
+
+CHUNK = 64 * 1024
+VARIANT_DIR = "variants"  # 縮小版（utils/image_pipeline.py）
+TMP_DIR = ".tmp"
+PRUNE_MIN_AGE = 3600  # これより新しいハッシュ名のファイルは prune しない（commit 前のアップロード中かもしれない）
+
+_KEY_RE = re.compile(r"^[0-9a-f]{2}/([0-9a-f]{64})\.[a-z0-9]*$")
+_EXT_RE = re.compile(r"^\.[a-z0-9]{1,5}$")
+
+photo_blob = PhotoBlob.__table__
+
+
+def uploads_path(app):
+    return os.path.join(app.static_folder, "uploads")
+
+
+def blob_key(filename):
+    """PHOTO_BLOB のファイル名ならハッシュ、以前の形式のファイル名なら None"""
+    m = _KEY_RE.match(filename or "")
+    return m.group(1) if m else None
+
+
+# ====================================================
+# 保存
+# ====================================================
+class SpoolFile:
+    """static/uploads/.tmp の一時ファイル。書きながら SHA-256・バイト数・先頭バイトを取る
+
+    limit を超えて書かれたら RequestEntityTooLarge。claim() せずに close() したら消える。
+    """
+
+    HEAD = 16  # 形式の判定に使う先頭バイト数
+
+    def __init__(self, base, limit=None):
+        tmp_dir = os.path.join(base, TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=tmp_dir)
+        self._file = os.fdopen(fd, "w+b")
+        self._digest = hashlib.sha256()
+        self.limit = limit
+        self.size = 0
+        self.head = b""
+        self.claimed = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.limit is not None and self.size > self.limit:
+            raise RequestEntityTooLarge()
+        if len(self.head) < self.HEAD:
+            self.head += data[:self.HEAD - len(self.head)]
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        # read / readline / seek / tell など（werkzeug の FileStorage から使われる）
+        return getattr(self._file, name)
+
+    @property
+    def sha256(self):
+        return self._digest.hexdigest()
+
+    def claim(self):
+        """書き終えたファイルを引き取る（close しても消えなくなる）→ パス"""
+        self._file.close()
+        self.claimed = True
+        return self.path
+
+    def close(self):
+        self._file.close()
+        if not self.claimed and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def spool(stream, base, limit=None):
+    """stream を SpoolFile へ書き写す（CHUNK ずつ。メモリはファイルの大きさによらない）"""
+    out = SpoolFile(base, limit)
+    try:
+        while True:
+            chunk = stream.read(CHUNK)
+            if not chunk:
+                break
+            out.write(chunk)
+    except BaseException:
+        out.close()
+        raise
+    return out
+
+
+def extension(name):
+    ext = os.path.splitext(name or "")[1].lower()
+    return ext if _EXT_RE.match(ext) else ""
+
+
+def place(tmp, key, size, ext):
+    """一時ファイルを PHOTO_BLOB に入れる（ref_count +1）→ static/uploads からのファイル名
+
+    先に PHOTO_BLOB を書いて（SQLite の書き込みロックを取って）からファイルを置くので、
+    同じ中身の写真が同時に消されても、消す側は ref_count を見てから消す。
+    いまのトランザクションで増やすので、同じトランザクションでそれを指す Photo を add すること。
+    rollback されたら、このトランザクションで作った PHOTO_BLOB の分のファイルは消す。
+    """
+    stmt = insert(photo_blob).values(
+        sha256=key, filename=f"{key[:2]}/{key}{ext}", size=size, ref_count=1, created_at=datetime.now()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["sha256"], set_={"ref_count": photo_blob.c.ref_count + 1}
+    ).returning(photo_blob.c.filename, photo_blob.c.ref_count)
+    filename, ref_count = db.session.execute(stmt).one()
+
+    path = os.path.join(uploads_path(current_app), filename)
+    if os.path.exists(path):
+        os.remove(tmp)  # 同じ中身がもうある
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp, path)
+    if ref_count == 1:
+        # 行を作ったのはこのトランザクション（rollback なら行ごと無くなる）
+        db.session.info.setdefault("photo_placed", []).append(path)
+    return filename
+
+
+# ====================================================
+# 削除（Photo の削除に合わせて）
+# ====================================================
+def _trash(session, base, names):
+    """ファイルを退避しておき、commit 後に消す（rollback なら戻す）"""
+    moved = session.info.setdefault("photo_trash", [])
+    for name in names:
+        path = os.path.join(base, name)
+        if os.path.exists(path):
+            trashed = f"{path}.trash-{uuid.uuid4().hex}"
+            os.replace(path, trashed)
+            moved.append((path, trashed))
+
+
+def _variant_files(base, stem):
+    return [os.path.relpath(p, base) for p in glob.glob(os.path.join(base, VARIANT_DIR, f"{stem}_*"))]
+
+
+@event.listens_for(Photo, "after_delete")
+def _release_blob(mapper, connection, photo):
+    session = object_session(photo)
+    base = uploads_path(current_app)
+    key = blob_key(photo.filename)
+
+    if key is None:
+        # 以前の形式：Photo ごとのファイル
+        _trash(session, base, [n for n in (photo.filename, photo.thumb_filename, photo.display_filename) if n])
+        return
+
+    ref_count = connection.execute(
+        update(photo_blob)
+        .where(photo_blob.c.sha256 == key)
+        .values(ref_count=photo_blob.c.ref_count - 1)
+        .returning(photo_blob.c.ref_count)
+    ).scalar()
+    if ref_count is not None and ref_count <= 0:
+        # 最後の 1 枚：書き込みロックを持っている間に消す（同じ中身のアップロードは ref_count が戻るのを待つ）
+        connection.execute(photo_blob.delete().where(photo_blob.c.sha256 == key))
+        _trash(session, base, [photo.filename] + _variant_files(base, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _empty_trash(session):
+    session.info.pop("photo_placed", None)
+    for _path, trashed in session.info.pop("photo_trash", []):
+        try:
+            os.remove(trashed)
+        except OSError as e:
+            print("写真の削除失敗:", trashed, e)
+
+
+@event.listens_for(Session, "after_rollback")
+def _restore_trash(session):
+    # place で置いたファイル（PHOTO_BLOB の行は rollback で消えた）
+    for path in session.info.pop("photo_placed", []):
+        if os.path.exists(path):
+            os.remove(path)
+    for path, trashed in session.info.pop("photo_trash", []):
+        os.replace(trashed, path)
+
+
+# ====================================================
+# flask dedupe-uploads
+# ====================================================
+def dedupe_uploads(dry_run=False, echo=print):
+    """以前の形式の写真をハッシュ名へ移す（同じ中身は 1 つに）→ (移した Photo 数, 浮いたバイト数, 無かった数)"""
+    base = uploads_path(current_app)
+    names = db.session.scalars(select(Photo.filename).distinct().order_by(Photo.filename)).all()
+
+    moved = freed = missing = 0
+    seen = set()
+    for name in names:
+        if blob_key(name) is not None:
+            continue
+        path = os.path.join(base, name)
+        if not os.path.exists(path):
+            echo(f"  missing: {name}")
+            missing += 1
+            continue
+
+        photos = db.session.scalars(select(Photo).where(Photo.filename == name)).all()
+        with open(path, "rb") as f:
+            copy = spool(f, base)
+        key, size = copy.sha256, copy.size
+        exists = key in seen or db.session.get(PhotoBlob, key) is not None
+        seen.add(key)
+        if dry_run:
+            copy.close()
+            echo(f"  {name} → {key[:12]}…{' (duplicate)' if exists else ''}")
+        else:
+            filename = place(copy.claim(), key, size, extension(name))
+            # place で +1 済み。残りの Photo の分を足す
+            db.session.execute(
+                update(photo_blob).where(photo_blob.c.sha256 == key)
+                .values(ref_count=photo_blob.c.ref_count + len(photos) - 1)
+            )
+            stale = [n for p in photos for n in (p.thumb_filename, p.display_filename) if n]
+            for p in photos:
+                # 縮小版は Photo ごとの名前だったので作り直す（flask build-image-variants）
+                p.filename, p.thumb_filename, p.display_filename = filename, None, None
+            db.session.commit()
+            for n in [name] + stale:
+                if os.path.exists(os.path.join(base, n)):
+                    os.remove(os.path.join(base, n))
+        moved += len(photos)
+        if exists:
+            freed += size
+    return moved, freed, missing
+
+
+def _unreferenced(base):
+    """どこからも指されていないファイル → [(static/uploads からの相対パス, DirEntry)]
+
+    以前の形式（直下）は Photo.filename と、ハッシュ名（ab/ab…cd.jpg）は PHOTO_BLOB と比べる。
+    """
+    referenced = set(db.session.scalars(select(Photo.filename)))
+    blobs = set(db.session.scalars(select(PhotoBlob.filename)))
+    cutoff = time.time() - PRUNE_MIN_AGE
+    found = []
+    for entry in os.scandir(base):
+        if entry.name.startswith("."):
+            continue
+        if entry.is_file() and entry.name not in referenced:
+            found.append((entry.name, entry))
+        elif entry.is_dir() and re.fullmatch(r"[0-9a-f]{2}", entry.name):
+            for blob in os.scandir(entry.path):
+                rel = f"{entry.name}/{blob.name}"
+                if (blob.is_file() and blob_key(rel) is not None and rel not in blobs
+                        and blob.stat().st_mtime < cutoff):
+                    found.append((rel, blob))
+    return found
+
+
+def prune_unreferenced(dry_run=False, echo=print):
+    """どの Photo / PHOTO_BLOB からも指されていないファイルを消す → (ファイル数, バイト数)"""
+    base = uploads_path(current_app)
+    if not os.path.isdir(base):
+        return 0, 0
+    count = size = 0
+    for rel, entry in _unreferenced(base):
+        echo(f"  unreferenced: {rel}")
+        count += 1
+        size += entry.stat().st_size
+        if not dry_run:
+            os.remove(entry.path)
+    return count, size
+
+
+@click.command("dedupe-uploads")
+@click.option("--prune", is_flag=True, help="どの写真からも指されていないファイルも消す")
+@click.option("--dry-run", is_flag=True, help="移す予定だけ表示")
+@with_appcontext
+def dedupe_uploads_command(prune, dry_run):
+    """以前の形式（{user_id}_{時刻}_{名前}）の写真を中身のハッシュ名へ移し、重複を 1 つにする"""
+    moved, freed, missing = dedupe_uploads(dry_run=dry_run, echo=click.echo)
+    click.echo(f"✅ dedupe uploads: photos={moved} freed={freed / 1e6:.1f}MB missing={missing}")
+    if prune:
+        count, size = prune_unreferenced(dry_run=dry_run, echo=click.echo)
+        click.echo(f"   pruned: files={count} freed={size / 1e6:.1f}MB")
+    if moved and not dry_run:
+        click.echo("   縮小版は flask build-image-variants で作り直してください")
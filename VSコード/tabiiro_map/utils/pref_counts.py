@@ -0,0 +1,156 @@
+# utils/pref_counts.py
+#
+# 都道府県別訪問回数（TRAVEL_RECORD.visit_count）の管理
+#   - Spot の追加/削除/都道府県変更をセッションイベントで拾って差分更新
+#   - カウンタ未作成のユーザーは SPOT を GROUP BY して集計（フォールバック）
+#   - flask rebuild-pref-counts で全件作り直し
+
+from collections import Counter
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from extensions import db
+from utils.data_version import bump_versions
+from models import Spot, TravelRecord
+
+travel_record = TravelRecord.__table__
+
+
+def _committed(obj, attr):
+    """flush 前（DB 上）の値"""
+    hist = inspect(obj).attrs[attr].history
+    if hist.deleted:
+        return hist.deleted[0]
+    if hist.unchanged:
+        return hist.unchanged[0]
+    return getattr(obj, attr)
+
+
+def _key(user_id, prefecture):
+    return user_id, (prefecture or "").strip()
+
+
+def _spot_deltas(session):
+    """この flush で発生する (user_id, prefecture) ごとの増減"""
+    deltas = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, Spot):
+            deltas[_key(obj.user_id, obj.prefecture)] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Spot):
+            deltas[_key(_committed(obj, "user_id"), _committed(obj, "prefecture"))] -= 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Spot) and obj not in session.deleted:
+            old = _key(_committed(obj, "user_id"), _committed(obj, "prefecture"))
+            new = _key(obj.user_id, obj.prefecture)
+            if old != new:
+                deltas[old] -= 1
+                deltas[new] += 1
+
+    return {k: v for k, v in deltas.items() if v}
+
+
+def _group_by_select(user_ids=None):
+    """SPOT から (user_id, prefecture, 件数) を集計する SELECT"""
+    pref = func.trim(Spot.prefecture)
+    stmt = select(Spot.user_id, pref, func.count(Spot.spot_id)).group_by(Spot.user_id, pref)
+    if user_ids is not None:
+        stmt = stmt.where(Spot.user_id.in_(user_ids))
+    return stmt
+
+
+def _rebuild(conn, user_ids=None):
+    delete = travel_record.delete()
+    if user_ids is not None:
+        delete = delete.where(travel_record.c.user_id.in_(user_ids))
+    conn.execute(delete)
+
+    conn.execute(
+        travel_record.insert().from_select(
+            ["user_id", "prefecture", "visit_count"], _group_by_select(user_ids)
+        )
+    )
+
+
+# 期限切れ（commit 後）の Spot に代入されたときも旧値を履歴に残すため
+@event.listens_for(Spot.user_id, "set", active_history=True)
+@event.listens_for(Spot.prefecture, "set", active_history=True)
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+@event.listens_for(Session, "after_flush")
+def _update_pref_counts(session, flush_context):
+    # after_flush 時点でも new/dirty/deleted と属性履歴は flush 前の状態のまま
+    deltas = _spot_deltas(session)
+    if not deltas:
+        return
+
+    conn = session.connection()
+    user_ids = {user_id for user_id, _ in deltas}
+
+    # まだカウンタが無いユーザーは、flush 済みの SPOT から作り直す
+    initialized = set(conn.scalars(
+        select(travel_record.c.user_id).where(travel_record.c.user_id.in_(user_ids)).distinct()
+    ))
+    missing = user_ids - initialized
+    if missing:
+        _rebuild(conn, missing)
+
+    for (user_id, prefecture), delta in deltas.items():
+        if user_id in missing:
+            continue
+        stmt = insert(travel_record).values(user_id=user_id, prefecture=prefecture, visit_count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "prefecture"],
+            set_={"visit_count": travel_record.c.visit_count + stmt.excluded.visit_count},
+        )
+        conn.execute(stmt)
+
+
+def count_by_group(user_id):
+    """フォールバック：SPOT を直接 GROUP BY して集計"""
+    rows = db.session.execute(_group_by_select([user_id])).all()
+    return {pref: count for _, pref, count in rows if count > 0}
+
+
+def get_pref_counts(user_id):
+    """都道府県（短縮名）→ 訪問回数"""
+    rows = db.session.execute(
+        select(TravelRecord.prefecture, TravelRecord.visit_count)
+        .where(TravelRecord.user_id == user_id)
+    ).all()
+
+    if not rows:
+        return count_by_group(user_id)
+
+    return {pref: count for pref, count in rows if count > 0}
+
+
+def rebuild_pref_counts(user_id=None):
+    user_ids = None if user_id is None else [user_id]
+    conn = db.session.connection()
+    _rebuild(conn, user_ids)
+    # キャッシュ済みの JSON を使わせないよう更新番号も進める
+    bump_versions(conn, user_ids)
+    db.session.commit()
+
+
+# ====================================================
+# flask rebuild-pref-counts [--user-id N]
+# ====================================================
+@click.command("rebuild-pref-counts")
+@click.option("--user-id", type=int, default=None, help="指定ユーザーだけ作り直す")
+@with_appcontext
+def rebuild_pref_counts_command(user_id):
+    """TRAVEL_RECORD の訪問回数を SPOT から作り直す"""
+    rebuild_pref_counts(user_id)
+    total = db.session.query(func.count(TravelRecord.id)).scalar()
+    click.echo(f"✅ pref counts rebuilt: rows={total}")
@@ -0,0 +1,130 @@
+# utils/prefectures.py
+#
+# 都道府県の参照データ（コード・正式名・短縮名・英語名・地方・県庁所在地の緯度経度）
+#   - static/json/prefectures.json を 1 度だけ読み、変更できない PrefectureRegistry にする
+#   - ファイルの mtime が変わったら読み直して丸ごと差し替える（使用中の側は古いまま）
+#   - 各 Blueprint は prefectures() で今の registry を取り出して使う
+
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple
+
+from config import Config
+
+CHECK_INTERVAL = 2.0  # mtime を確かめる間隔（秒）
+
+
+class Prefecture(NamedTuple):
+    code: int     # 1〜47
+    name: str     # 正式名（"青森県"）
+    short: str    # 短縮名（"青森"。Spot.prefecture はこちらで保存）
+    name_en: str
+    region: str   # 地方（"東北" など）
+    lat: float
+    lon: float
+
+
+class PrefectureRegistry:
+    """読み取り専用の都道府県一覧"""
+
+    def __init__(self, prefs):
+        self.all = tuple(sorted(prefs, key=lambda p: p.code))
+        self.names = tuple(p.name for p in self.all)
+        self.short_names = tuple(p.short for p in self.all)
+
+        lookup = {}
+        for p in self.all:
+            lookup[p.name] = p
+            lookup[p.short] = p
+        self._lookup = MappingProxyType(lookup)
+        self._by_code = MappingProxyType({p.code: p for p in self.all})
+
+        regions = {}
+        for p in self.all:
+            regions.setdefault(p.region, []).append(p)
+        self.regions = MappingProxyType({r: tuple(ps) for r, ps in regions.items()})
+
+    def __iter__(self):
+        return iter(self.all)
+
+    def __len__(self):
+        return len(self.all)
+
+    def get(self, name):
+        """正式名・短縮名のどちらでも引ける"""
+        return self._lookup.get((name or "").strip())
+
+    def by_code(self, code):
+        return self._by_code.get(code)
+
+    def short_name(self, name):
+        # 一覧に無い名前はそのまま返す
+        p = self.get(name)
+        return p.short if p else (name or "").strip()
+
+    def latlon(self, name):
+        p = self.get(name)
+        return (p.lat, p.lon) if p else (None, None)
+
+
+def _load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return PrefectureRegistry(
+        Prefecture(
+            code=p["pref_code"],
+            name=p["pref_name_ja"],
+            short=p["pref_short"],
+            name_en=p["pref_name_en"],
+            region=p["region"],
+            lat=p["lat"],
+            lon=p["lon"],
+        )
+        for p in data
+    )
+
+
+class _Holder:
+    def __init__(self, path):
+        self.path = path
+        self._registry = None
+        self._mtime = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if self._registry is not None and now - self._checked_at < CHECK_INTERVAL:
+            return self._registry
+
+        with self._lock:
+            if self._registry is not None and now - self._checked_at < CHECK_INTERVAL:
+                return self._registry
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                if self._registry is None:
+                    raise
+                mtime = self._mtime  # 一時的に読めないときは今のものを使い続ける
+
+            if self._registry is None or mtime != self._mtime:
+                try:
+                    self._registry = _load(self.path)
+                    self._mtime = mtime
+                except (OSError, ValueError, KeyError):
+                    # 書き換え途中などで読めなければ、次の確認まで今のものを使う
+                    if self._registry is None:
+                        raise
+            self._checked_at = now
+            return self._registry
+
+
+_holder = _Holder(Config.PREFECTURES_JSON_PATH)
+
+
+def prefectures():
+    """今の PrefectureRegistry"""
+    return _holder.get()
@@ -0,0 +1,93 @@
+# utils/ttl_cache.py
+#
+# 外部 API の結果を持っておくプロセス内キャッシュ（ホテル検索・connpass 検索で共用）
+#   - ttl 秒で期限切れ、size 件を超えたら古く使われたものから捨てる（LRU）
+#   - 同じキーの取得が同時に来たら、loader を呼ぶのは 1 回だけ（後から来た側は結果を待つ）
+#   - loader の例外はキャッシュしない（待っていた側にも同じ例外を投げる）
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """取得中の 1 件（同じキーの後続はこれの完了を待つ）"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    def __init__(self, ttl=600, size=512):
+        self.ttl = ttl
+        self.size = size
+        self._entries = OrderedDict()  # キー → (期限 monotonic, 値)
+        self._inflight = {}            # キー → _Flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key, loader):
+        """キャッシュにあればそれを、無ければ loader() の結果を入れて返す"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+            flight.value = value
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def has(self, key):
+        """期限内の値がある、または取得中なら True（先読みの要否の判定用）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return (entry is not None and entry[0] > time.monotonic()) or key in self._inflight
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else None,
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,113 @@
+# utils/uploads.py
+#
+# 写真アップロードの受け取り（観光地・グルメの登録 / 編集の photos[]）
+#   - multipart の解析中に、ファイル部分を CHUNK ずつ static/uploads/.tmp の一時ファイル（utils.photo_store.SpoolFile）へ
+#     直接書く。書きながら SHA-256 と先頭バイトを取るので、メモリはファイルの大きさによらず一定・ディスクへの書き込みは 1 回
+#   - 制限：1 リクエスト MAX_CONTENT_LENGTH、1 枚 UPLOAD_MAX_FILE_SIZE（どちらも超えたら 413 → 元の画面へ戻してメッセージ）、
+#     1 回 UPLOAD_MAX_FILES 枚（超えた分は保存しない）
+#   - 形式は拡張子ではなく中身の先頭バイトで判定し（JPEG / PNG / GIF / WebP）、それ以外は保存しない
+#   - 受け取ったら utils.photo_store.place で中身のハッシュ名へ os.replace（置き換えは一瞬、途中の状態は見えない）
+
+from flask import Request, current_app, flash, redirect, request, url_for
+
+from models import Photo, db
+from utils.image_pipeline import request_variants
+from utils.photo_store import SpoolFile, place, spool, uploads_path
+
+SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+def sniff(head):
+    """先頭バイト → 拡張子（受け付けない形式なら None）"""
+    for magic, ext in SIGNATURES:
+        if head.startswith(magic):
+            return ext
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+class UploadRequest(Request):
+    """ファイル部分を SpoolFile に受ける Request（app.request_class に設定）"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not filename:
+            # 空のファイル欄
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        out = SpoolFile(
+            uploads_path(current_app),
+            limit=current_app.config.get("UPLOAD_MAX_FILE_SIZE"),
+        )
+        # 途中で 413 になったファイルは request.files に入らないので、ここで覚えておいて close() で消す
+        self.__dict__.setdefault("_spools", []).append(out)
+        return out
+
+    def close(self):
+        super().close()
+        for out in self.__dict__.pop("_spools", []):
+            out.close()
+
+
+def upload_too_large(e):
+    """413（1 枚 / 1 回の上限超え）→ 元の画面へ"""
+    config = current_app.config
+    flash(
+        f"写真が大きすぎます（1 枚 {config['UPLOAD_MAX_FILE_SIZE'] // 2**20}MB・"
+        f"1 回 {config['MAX_CONTENT_LENGTH'] // 2**20}MB まで）",
+        "error",
+    )
+    return redirect(request.referrer or url_for("home"))
+
+
+# ====================================================
+# 保存
+# ====================================================
+def ingest(file):
+    """アップロード 1 枚を保存して Photo.filename に入れる名前を返す（受け付けない形式なら UploadRejected）"""
+    out = file.stream
+    if not isinstance(out, SpoolFile):
+        # UploadRequest 以外で受けたもの（小さいファイルの BytesIO など）は書き写す
+        out = spool(out, uploads_path(current_app), current_app.config.get("UPLOAD_MAX_FILE_SIZE"))
+    try:
+        ext = sniff(out.head)
+        if ext is None:
+            raise UploadRejected(f"{file.filename}：画像（JPEG / PNG / GIF / WebP）ではありません")
+        return place(out.claim(), out.sha256, out.size, ext)
+    finally:
+        out.close()
+
+
+def save_photos(files, **owner):
+    """photos[] を保存して Photo を add する → 保存しなかったファイルの理由のリスト
+
+    owner は Photo の user_id / spot_id / food_id。縮小版は commit 後に裏で作る（utils.image_pipeline）。
+    """
+    max_files = current_app.config.get("UPLOAD_MAX_FILES", 10)
+    rejected = []
+    saved = 0
+    for file in files:
+        if not file or not file.filename:
+            continue
+        if saved >= max_files:
+            rejected.append(f"{file.filename}：1 回に {max_files} 枚までです")
+            continue
+        try:
+            filename = ingest(file)
+        except UploadRejected as e:
+            rejected.append(str(e))
+            continue
+
+        photo = Photo(filename=filename, **owner)
+        db.session.add(photo)
+        request_variants(photo)
+        saved += 1
+    return rejected
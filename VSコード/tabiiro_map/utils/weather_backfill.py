@@ -0,0 +1,148 @@
+# utils/weather_backfill.py
+#
+# 天気が入っていない観光地（API が落ちていた間に登録されたもの）をまとめて埋める
+#   flask backfill-weather [--max-gap 7] [--max-days 366] [--rate 1.0] [--dry-run]
+#
+#   - weather_daily に ok の行が無い (都道府県, 訪問日) を集め、都道府県ごとに日付を連続した範囲にまとめる
+#     （max-gap 日以内のすき間はつなげて 1 回で取る）
+#   - 範囲ごとに archive API を 1 回（start_date / end_date）呼び、取れた日をまとめて upsert
+#   - 範囲ごとに commit するので、途中で止めても次回は残りから（ok になった日は対象外）
+#   - 呼び出しは --rate 回/秒まで
+
+import time
+from datetime import date, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, select
+
+from extensions import db
+from models import Spot, WeatherDaily
+from utils.http_client import CircuitOpenError, http
+from utils.weather_daily import ARCHIVE_URL, STATUS_OK, fetch_archive, mark_failed, store
+
+ARCHIVE_LAG_DAYS = 5  # archive API に値が出るまでの日数（これより新しい日は取りに行かない）
+
+
+def missing_days(prefecture=None):
+    """天気が無い (都道府県, 日付) を都道府県・日付順に"""
+    query = (
+        select(Spot.prefecture, Spot.visit_date)
+        .outerjoin(
+            WeatherDaily,
+            and_(WeatherDaily.prefecture == Spot.prefecture, WeatherDaily.date == Spot.visit_date),
+        )
+        .where((WeatherDaily.status.is_(None)) | (WeatherDaily.status != STATUS_OK))
+        .where(Spot.visit_date <= date.today() - timedelta(days=ARCHIVE_LAG_DAYS))
+        .distinct()
+        .order_by(Spot.prefecture, Spot.visit_date)
+    )
+    if prefecture:
+        query = query.where(Spot.prefecture == prefecture)
+    return db.session.execute(query).all()
+
+
+def plan_ranges(days, max_gap=7, max_days=366):
+    """[(都道府県, 日付)] → [(都道府県, 開始日, 終了日, [必要な日付])]
+
+    同じ都道府県で max_gap 日以内に続く日付は 1 つの範囲にまとめる（範囲は max_days 日まで）。
+    """
+    ranges = []
+    for prefecture, day in days:
+        last = ranges[-1] if ranges else None
+        if (
+            last is not None
+            and last[0] == prefecture
+            and (day - last[2]).days <= max_gap
+            and (day - last[1]).days < max_days
+        ):
+            last[2] = day
+            last[3].append(day)
+        else:
+            ranges.append([prefecture, day, day, [day]])
+    return [tuple(r) for r in ranges]
+
+
+def backfill(max_gap=7, max_days=366, rate=1.0, prefecture=None, dry_run=False, echo=print):
+    """天気の無い日を範囲ごとに取り直す。(呼び出し回数, 埋まった日数, 失敗した日数) を返す"""
+    days = missing_days(prefecture)
+    ranges = plan_ranges(days, max_gap=max_gap, max_days=max_days)
+    echo(f"天気の無い日: {len(days)} 件 → API 呼び出し {len(ranges)} 回")
+    if dry_run:
+        for pref, start, end, needed in ranges:
+            echo(f"  {pref} {start}〜{end}（{len(needed)} 日）")
+        return 0, 0, 0
+
+    attempts = current_app.config.get("WEATHER_RETRY_ATTEMPTS", 4)
+    backoff = current_app.config.get("WEATHER_RETRY_BACKOFF", 1.0)
+    interval = 1.0 / rate if rate > 0 else 0.0
+
+    calls = filled = failed = 0
+    started = time.monotonic()
+    next_call = started
+    for i, (pref, start, end, needed) in enumerate(ranges, 1):
+        # 呼び出しの間隔を守る
+        wait = next_call - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        next_call = time.monotonic() + interval
+
+        calls += 1
+        try:
+            rows = fetch_archive(pref, start, end, retries=attempts - 1, backoff=backoff)
+        except CircuitOpenError as e:
+            # 上流が落ちている：残りを failed にして回っても無駄なので、ここで止める（次回は残りから）
+            echo(f"⚠ 天気 API が停止中のため中断します: {e}")
+            break
+        except Exception as e:
+            echo(f"  天気取得失敗: {pref} {start}〜{end}: {e}")
+            rows = []
+
+        # 範囲の途中の日（観光地の無い日）も保存しておく：他のユーザーが後で登録したときにそのまま使える
+        got = {r["date"] for r in rows}
+        lost = [d for d in needed if d not in got]
+        conn = db.session.connection()
+        store(conn, rows)
+        if lost:
+            mark_failed(conn, pref, lost)
+        db.session.commit()
+
+        filled += len(needed) - len(lost)
+        failed += len(lost)
+        elapsed = time.monotonic() - started
+        echo(
+            f"[{i}/{len(ranges)}] {pref} {start}〜{end}: {len(needed) - len(lost)}/{len(needed)} 日 "
+            f"（計 {filled} 日, {elapsed:.0f}s）"
+        )
+
+    return calls, filled, failed
+
+
+# ====================================================
+# flask backfill-weather
+# ====================================================
+@click.command("backfill-weather")
+@click.option("--max-gap", default=7, show_default=True, help="この日数以内のすき間はつなげて 1 回で取る")
+@click.option("--max-days", default=366, show_default=True, help="1 回で取る最大日数")
+@click.option("--rate", type=float, default=None, help="1 秒あたりの API 呼び出し回数（既定は WEATHER_BACKFILL_RATE）")
+@click.option("--prefecture", default=None, help="この都道府県（短縮名）だけ")
+@click.option("--dry-run", is_flag=True, help="呼び出し計画だけ表示")
+@with_appcontext
+def backfill_weather_command(max_gap, max_days, rate, prefecture, dry_run):
+    """天気の入っていない観光地の天気をまとめて取得する"""
+    if rate is None:
+        rate = current_app.config.get("WEATHER_BACKFILL_RATE", 1.0)
+    calls, filled, failed = backfill(
+        max_gap=max_gap, max_days=max_days, rate=rate,
+        prefecture=prefecture, dry_run=dry_run, echo=click.echo,
+    )
+    if not dry_run:
+        click.echo(f"✅ weather backfill: calls={calls} filled={filled} failed={failed}")
+        stats = http.stats_for(ARCHIVE_URL)
+        if stats:
+            lat = stats["latency_ms"]
+            click.echo(
+                f"   archive API: requests={stats['requests']} retries={stats['retries']} "
+                f"errors={stats['errors']} avg={lat['avg']}ms p95<={lat['p95']}ms"
+            )
@@ -0,0 +1,124 @@
+# utils/weather_daily.py
+#
+# 過去の天気（open-meteo archive API）の読み込みキャッシュ
+#   - (都道府県, 日付) の天気は一度確定すれば変わらないので weather_daily に保存して全ユーザーで共有
+#   - Spot は天気を持たず、spot.weather_daily で参照する
+#   - 観光地の登録・編集では API を待たない：status="pending" の行だけ入れて、
+#     commit 後に utils.weather_worker がバックグラウンドで埋める
+#   - 値がまだ出ていない日（直近数日）や取得に失敗した日は status="failed"（次の登録・編集で再取得）
+
+from datetime import datetime
+
+from sqlalchemy.dialects.sqlite import insert
+
+from extensions import db
+from models import WeatherDaily
+from utils.http_client import http
+from utils.prefectures import prefectures
+from utils.weather_utils import convert_weather_icon
+
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+TIMEOUT = 5  # 秒
+
+STATUS_OK = "ok"
+STATUS_PENDING = "pending"
+STATUS_FAILED = "failed"
+
+weather_daily = WeatherDaily.__table__
+
+
+def fetch_archive(prefecture, start_date, end_date, retries=None, backoff=None):
+    """API から start_date〜end_date の日ごとの値を取る（取れた日だけの dict のリスト）
+
+    再試行・サーキットブレーカーは utils.http_client に任せる（retries / backoff で回数と間隔を上書き）。
+    最後まで取れなければ例外をそのまま投げる。
+    """
+    lat, lon = prefectures().latlon(prefecture)
+    if lat is None:
+        print("lat/lon が見つからない prefecture:", prefecture)
+        return []
+
+    data = http.get_json(
+        ARCHIVE_URL,
+        params={
+            "latitude": lat,
+            "longitude": lon,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "daily": "weathercode,temperature_2m_max,temperature_2m_min,precipitation_sum",
+            "timezone": "Asia/Tokyo",
+        },
+        timeout=TIMEOUT,
+        retries=retries,
+        backoff=backoff,
+    )
+
+    daily = data.get("daily") or {}
+    rows = []
+    for i, day in enumerate(daily.get("time") or []):
+        code = daily["weathercode"][i]
+        if code is None:
+            # まだ値が出ていない日（保存すると確定後も None のままになる）
+            continue
+        rows.append({
+            "prefecture": prefecture,
+            "date": datetime.strptime(day, "%Y-%m-%d").date(),
+            "status": STATUS_OK,
+            "weather_code": code,
+            "weather": convert_weather_icon(code),
+            "temp_max": daily["temperature_2m_max"][i],
+            "temp_min": daily["temperature_2m_min"][i],
+            "precipitation": daily["precipitation_sum"][i],
+            "fetched_at": datetime.now(),
+        })
+    return rows
+
+
+def store(conn, rows):
+    """取れた値を保存（pending / failed の行は上書き、ok の行はそのまま）"""
+    if not rows:
+        return
+    stmt = insert(weather_daily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["prefecture", "date"],
+        set_={c.name: stmt.excluded[c.name] for c in weather_daily.columns if not c.primary_key},
+        where=weather_daily.c.status != STATUS_OK,
+    )
+    conn.execute(stmt, rows)
+
+
+def mark_failed(conn, prefecture, days):
+    """取れなかった日を status="failed" に（行が無ければ作る。ok の行はそのまま）"""
+    stmt = insert(weather_daily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["prefecture", "date"],
+        set_={"status": STATUS_FAILED, "fetched_at": stmt.excluded.fetched_at},
+        where=weather_daily.c.status != STATUS_OK,
+    )
+    now = datetime.now()
+    conn.execute(stmt, [
+        {"prefecture": prefecture, "date": day, "status": STATUS_FAILED, "fetched_at": now}
+        for day in days
+    ])
+
+
+def request_weather(prefecture, day):
+    """(都道府県, 日付) の天気をバックグラウンド取得に回す（キャッシュ済みなら何もしない）
+
+    いまのトランザクションに status="pending" の行を入れ、commit されたら
+    utils.weather_worker が session.info["weather_jobs"] を拾って取得する。
+    """
+    cached = db.session.get(WeatherDaily, (prefecture, day))
+    if cached is not None and cached.status == STATUS_OK:
+        return cached
+
+    stmt = insert(weather_daily).values(
+        prefecture=prefecture, date=day, status=STATUS_PENDING, fetched_at=datetime.now()
+    )
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=["prefecture", "date"],
+        set_={"status": STATUS_PENDING},
+        where=weather_daily.c.status != STATUS_OK,
+    ))
+    db.session.info.setdefault("weather_jobs", set()).add((prefecture, day))
+    return None
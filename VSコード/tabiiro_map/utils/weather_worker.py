@@ -0,0 +1,110 @@
+# utils/weather_worker.py
+#
+# 過去の天気を埋めるバックグラウンドワーカー（スレッドプール）
+#   - request_weather() が session.info["weather_jobs"] に積んだ (都道府県, 日付) を commit 後に受け取る
+#   - 同じ (都道府県, 日付) が取得中・待ち行列にあれば新しいジョブは作らない（上流への呼び出しは 1 回）
+#   - 失敗したら指数バックオフで再試行し（utils.http_client）、最後まで駄目なら status="failed"
+#     上流が落ちていてサーキットブレーカーが開いていれば、待たずにすぐ failed になる
+#   - WEATHER_ASYNC=False ならその場で実行（テスト・CLI 用）
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from extensions import db
+from utils.weather_daily import fetch_archive, mark_failed, store
+
+
+class WeatherWorker:
+    def __init__(self):
+        self.app = None
+        self._executor = None
+        self._inflight = {}  # (都道府県, 日付) → Future
+        self._lock = threading.RLock()  # 完了済みの Future に add_done_callback すると即座に _forget が呼ばれる
+
+    def init_app(self, app):
+        self.app = app
+        if not app.config.get("WEATHER_ASYNC", True):
+            self.shutdown(wait=False)
+        elif self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=app.config.get("WEATHER_WORKERS", 2),
+                thread_name_prefix="weather",
+            )
+
+    def submit(self, prefecture, day):
+        """ジョブを積む（同じキーが取得中ならその Future を返す）"""
+        key = (prefecture, day)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+
+            if self._executor is None:
+                future = Future()
+            else:
+                future = self._executor.submit(self._run, key)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _f: self._forget(key))
+
+        if self._executor is None:
+            # 同期モード：その場で実行
+            try:
+                future.set_result(self._run(key))
+            except Exception as e:
+                future.set_exception(e)
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def pending(self):
+        with self._lock:
+            return len(self._inflight)
+
+    def _run(self, key):
+        prefecture, day = key
+        try:
+            rows = fetch_archive(
+                prefecture, day, day,
+                retries=self.app.config.get("WEATHER_RETRY_ATTEMPTS", 4) - 1,
+                backoff=self.app.config.get("WEATHER_RETRY_BACKOFF", 1.0),
+            )
+        except Exception as e:
+            print("天気取得失敗:", prefecture, day, e)
+            rows = []
+
+        with self.app.app_context():
+            conn = db.session.connection()
+            if rows:
+                store(conn, rows)
+            else:
+                mark_failed(conn, prefecture, [day])
+            db.session.commit()
+            db.session.remove()
+        return bool(rows)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+weather_worker = WeatherWorker()
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_weather_jobs(session):
+    jobs = session.info.pop("weather_jobs", None)
+    if not jobs or weather_worker.app is None:
+        return
+    for prefecture, day in sorted(jobs):
+        weather_worker.submit(prefecture, day)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_weather_jobs(session):
+    session.info.pop("weather_jobs", None)